@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from . import models
 from .database import get_db
+from .services.token_cache import CurrentUser, TokenEntry, cache as token_cache
 
 SECRET_KEY = os.getenv("JWT_SECRET", "supersecretkey")
 ALGORITHM = "HS256"
@@ -35,28 +36,45 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    key, entry = token_cache.lookup(token)
+    if entry is not None and entry.user is not None:
+        return entry.user
+    claims = entry.claims if entry is not None else _decode(token)
+    row = (
+        db.query(models.User.id, models.User.email, models.User.name, models.User.role)
+        .filter(models.User.email == claims["sub"])
+        .first()
+    )
+    if row is None:
+        raise _credentials_exception()
+    user = CurrentUser(*row)
+    token_cache.store(key, TokenEntry(claims, user))
     return user
 
 
 def require_role(*allowed_roles: str):
-    def role_checker(user: models.User = Depends(get_current_user)):
+    # The cached identity is dropped whenever a user changes, so a demoted or
+    # deleted account loses access on its next request without a lookup per call.
+    def role_checker(user: CurrentUser = Depends(get_current_user)):
         if user.role not in allowed_roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
         return user
@@ -0,0 +1,45 @@
+"""Render every report card of a class into a ZIP file.
+
+    python -m backend.batch_reports --class-id 1 --term "Term 1" --output reports.zip
+"""
+from __future__ import annotations
+import argparse
+import pathlib
+import sys
+import time
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
+    __package__ = "backend"
+
+from .database import SessionLocal
+from .services.report_cards import REPORT_WORKERS, class_report_data, render_many, report_filename, stream_zip
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Batch-render class report cards.")
+    parser.add_argument("--class-id", type=int, required=True)
+    parser.add_argument("--term", default="Term 1")
+    parser.add_argument("--output", default=None, help="ZIP path (default: reports_class_<id>.zip)")
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS)
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        reports = class_report_data(db, args.class_id, args.term)
+    if not reports:
+        print(f"No students found for class {args.class_id}.")
+        return 1
+
+    output = pathlib.Path(args.output or f"reports_class_{args.class_id}.zip")
+    started = time.perf_counter()
+    files = ((report_filename(report), pdf) for report, pdf in render_many(reports, workers=args.workers))
+    with output.open("wb") as handle:
+        for chunk in stream_zip(files):
+            handle.write(chunk)
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {len(reports)} report cards to {output} in {elapsed:.2f}s using {args.workers} workers.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
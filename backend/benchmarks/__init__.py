@@ -0,0 +1,15 @@
+"""Standalone performance benchmarks.
+
+Each module is runnable with ``python -m backend.benchmarks.<name>`` and points
+``DATABASE_URL`` at a throwaway SQLite file unless one is already set.
+"""
+import os
+import tempfile
+
+
+def use_scratch_database(name: str) -> str:
+    """Point the app at a fresh SQLite file; must run before importing ``backend.database``."""
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="srt-bench-"), f"{name}.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return os.environ["DATABASE_URL"]
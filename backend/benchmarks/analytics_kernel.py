@@ -0,0 +1,101 @@
+"""Per-object Python statistics vs the NumPy kernel on synthetic marks.
+
+    python -m backend.benchmarks.analytics_kernel --students 20000 --marks-per-student 50
+
+No database is involved: both sides start from the same in-memory rows and
+compute per-mark percentages, per-student averages, the grade distribution,
+mean, spread and percentiles.
+"""
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from ..services.analytics import (
+    PASS_PERCENTAGE,
+    calculate_percentage,
+    grade_from_percentage,
+    mean_percentage,
+)
+from ..services import stats_kernel
+
+
+def _rows(students: int, per_student: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    maximum = rng.choice([20, 25, 50, 100], size=students * per_student).astype(np.float64)
+    obtained = np.round(rng.uniform(0, 1, size=maximum.size) * maximum * 2) / 2
+    student_id = np.repeat(np.arange(students, dtype=np.int64), per_student)
+    return student_id, obtained, maximum
+
+
+def per_object(marks) -> dict:
+    by_student = {}
+    for mark in marks:
+        by_student.setdefault(mark.student_id, []).append(calculate_percentage(mark.marks_obtained, mark.maximum_marks))
+    averages = [mean_percentage(values) for values in by_student.values()]
+    distribution = {"A": 0, "B": 0, "C": 0, "D": 0, "E": 0}
+    for average in averages:
+        distribution[grade_from_percentage(average)] += 1
+    quartiles = statistics.quantiles(averages, n=4, method="inclusive")
+    return {
+        "averages": averages,
+        "distribution": distribution,
+        "mean": mean_percentage(averages),
+        "std_dev": round(statistics.pstdev(averages), 2),
+        "median": round(quartiles[1], 2),
+        "pass_rate": round(len([a for a in averages if a >= PASS_PERCENTAGE]) / len(averages) * 100, 2),
+    }
+
+
+def vectorised(student_id, obtained, maximum) -> dict:
+    mark_percentages = stats_kernel.percentages(obtained, maximum)
+    _, averages, _ = stats_kernel.group_means(student_id, mark_percentages)
+    summary = stats_kernel.describe(averages)
+    return {
+        "averages": averages,
+        "distribution": {row["grade"]: row["count"] for row in stats_kernel.grade_distribution(averages)},
+        "mean": summary["average"],
+        "std_dev": summary["std_dev"],
+        "median": summary["percentiles"]["p50"],
+        "pass_rate": summary["pass_rate"],
+    }
+
+
+def _best_of(repeat: int, fn, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--marks-per-student", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    student_id, obtained, maximum = _rows(args.students, args.marks_per_student)
+    marks = [
+        SimpleNamespace(student_id=s, marks_obtained=o, maximum_marks=m)
+        for s, o, m in zip(student_id.tolist(), obtained.tolist(), maximum.tolist())
+    ]
+
+    python_time, expected = _best_of(args.repeat, per_object, marks)
+    numpy_time, actual = _best_of(args.repeat, vectorised, student_id, obtained, maximum)
+
+    assert actual["averages"].tolist() == expected["averages"]
+    for key in ("distribution", "mean", "std_dev", "median", "pass_rate"):
+        assert actual[key] == expected[key], (key, actual[key], expected[key])
+
+    print(f"{len(marks):,} marks, {args.students:,} students")
+    print(f"per-object python: {python_time * 1000:9.1f} ms")
+    print(f"numpy kernel:      {numpy_time * 1000:9.1f} ms  ({python_time / numpy_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Authentication overhead per request with and without the token cache.
+
+    python -m backend.benchmarks.auth_overhead --requests 2000
+
+Times the auth dependencies on their own (``get_current_user`` and a
+``require_role`` check) and a protected list endpoint end to end, first with
+the token cache disabled and then enabled, and counts ``users`` lookups per
+request.
+"""
+import argparse
+import statistics
+import time
+
+from . import use_scratch_database
+
+
+def _per_call(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    use_scratch_database("auth_overhead")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from ..auth import AdminOnly, create_access_token, get_current_user
+    from ..database import SessionLocal, engine
+    from ..main import app
+    from ..seed_data import ensure_default_admin
+    from ..services.token_cache import cache
+
+    with SessionLocal() as db:
+        admin = ensure_default_admin(db)
+        token = create_access_token({"sub": admin.email, "role": admin.role})
+    headers = {"Authorization": f"Bearer {token}"}
+    client = TestClient(app)
+
+    lookups = []
+
+    def count_user_lookups(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            lookups.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_user_lookups)
+    ttl = cache.ttl
+    results = {}
+    for label, cache_ttl in (("uncached", 0), ("cached", ttl)):
+        cache.ttl = cache_ttl
+        with SessionLocal() as db:
+            user_us = _per_call(lambda: get_current_user(db, token), args.requests)
+            role_us = _per_call(lambda: AdminOnly(get_current_user(db, token)), args.requests)
+
+        lookups.clear()
+        samples = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            assert client.get("/students/?limit=1", headers=headers).status_code == 200
+            samples.append((time.perf_counter() - started) * 1000)
+        results[label] = (user_us, role_us, statistics.median(samples), len(lookups) / args.requests)
+    cache.ttl = ttl
+    event.remove(engine, "before_cursor_execute", count_user_lookups)
+
+    print(f"{'':<10} {'get_current_user':>17} {'require_role':>13} {'GET /students/':>15} {'user queries/req':>17}")
+    for label, (user_us, role_us, request_ms, queries) in results.items():
+        print(f"{label:<10} {user_us:>15.1f}us {role_us:>11.1f}us {request_ms:>13.2f}ms {queries:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Concurrent mark entry against each engine profile.
+
+    python -m backend.benchmarks.concurrent_writes --writers 16 --readers 4 --seconds 10
+
+Writer threads mimic teachers saving marks (read the existing mark, upsert it,
+commit) while reader threads hit the class overview. Each profile gets its own
+fresh SQLite file; the report shows committed writes per second, write latency
+percentiles and how many transactions failed with "database is locked" (or
+lost an insert race on the unique mark index).
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from . import use_scratch_database
+
+use_scratch_database("concurrent_writes")
+
+from .. import models  # noqa: E402
+from ..database import Base, build_engine  # noqa: E402
+from ..services import analytics  # noqa: E402
+
+STUDENTS = 200
+ASSESSMENTS = 20
+
+
+def _setup(Session) -> int:
+    with Session() as db:
+        school_class = models.Class(name="Bench Class")
+        db.add(school_class)
+        db.flush()
+        subject = models.Subject(name="Mathematics", code="MATH", class_id=school_class.id)
+        db.add(subject)
+        db.flush()
+        db.add_all(
+            models.Assessment(
+                name=f"Quiz {a}", type="Quiz", maximum_marks=100, term="Term 1", subject_id=subject.id, date=date(2024, 1, 1)
+            )
+            for a in range(ASSESSMENTS)
+        )
+        db.add_all(
+            models.Student(name=f"Student {s}", roll_number=f"BENCH-{s}", class_id=school_class.id) for s in range(STUDENTS)
+        )
+        db.commit()
+        return school_class.id
+
+
+def _percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_profile(profile: str, writers: int, readers: int, seconds: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="srt-bench-"), f"{profile}.db")
+    engine = build_engine(f"sqlite:///{path}", profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    class_id = _setup(Session)
+    with Session() as db:
+        student_ids = [s for (s,) in db.query(models.Student.id)]
+        assessment_ids = [a for (a,) in db.query(models.Assessment.id)]
+
+    deadline = time.perf_counter() + seconds
+    lock = threading.Lock()
+    write_latencies, read_latencies = [], []
+    failures = {"locked": 0, "conflicts": 0}
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            student_id, assessment_id = rng.choice(student_ids), rng.choice(assessment_ids)
+            started = time.perf_counter()
+            try:
+                with Session() as db:
+                    mark = (
+                        db.query(models.Mark)
+                        .filter(models.Mark.student_id == student_id, models.Mark.assessment_id == assessment_id)
+                        .first()
+                    )
+                    if mark is None:
+                        db.add(models.Mark(student_id=student_id, assessment_id=assessment_id, marks_obtained=rng.randint(0, 100)))
+                    else:
+                        mark.marks_obtained = rng.randint(0, 100)
+                    db.commit()
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                with lock:
+                    failures["locked"] += 1
+                continue
+            except IntegrityError:
+                # Two writers inserted the same (student, assessment) first.
+                with lock:
+                    failures["conflicts"] += 1
+                continue
+            with lock:
+                write_latencies.append((time.perf_counter() - started) * 1000)
+
+    def reader() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            with Session() as db:
+                analytics.class_overview(db, class_id)
+            with lock:
+                read_latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes_per_s": len(write_latencies) / seconds,
+        "write_p50_ms": statistics.median(write_latencies) if write_latencies else 0.0,
+        "write_p99_ms": _percentile(write_latencies, 0.99),
+        "reads_per_s": len(read_latencies) / seconds,
+        "locked": failures["locked"],
+        "conflicts": failures["conflicts"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profiles", default="basic,tuned")
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'reads/s':>9} {'locked':>7} {'conflicts':>9}")
+    for profile in args.profiles.split(","):
+        result = run_profile(profile, args.writers, args.readers, args.seconds)
+        print(
+            f"{result['profile']:<8} {result['writes_per_s']:>9.1f} {result['write_p50_ms']:>8.1f} "
+            f"{result['write_p99_ms']:>8.1f} {result['reads_per_s']:>9.1f} {result['locked']:>7} {result['conflicts']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure CSV mark-import throughput (rows/second) against the seed schema.
+
+    python -m backend.benchmarks.import_throughput --rows 50000 --batch-size 1000
+"""
+import argparse
+import csv
+import io
+import time
+import tracemalloc
+
+from . import use_scratch_database
+
+
+def _build_csv(db, rows: int) -> bytes:
+    """One row per (student, assessment) pair, adding students until ``rows`` pairs exist."""
+    from sqlalchemy import insert
+
+    from .. import models
+
+    classes = [class_id for (class_id,) in db.query(models.Class.id).order_by(models.Class.id)]
+    per_class = db.query(models.Assessment).count() // max(len(classes), 1) or 1
+    needed = rows // per_class + 1 - db.query(models.Student).count()
+    if needed > 0:
+        db.execute(
+            insert(models.Student),
+            [
+                {"name": f"Bench Student {i}", "roll_number": f"BENCH-{i:07d}", "class_id": classes[i % len(classes)]}
+                for i in range(needed)
+            ],
+        )
+        db.commit()
+
+    students = db.query(models.Student.roll_number, models.Student.class_id).all()
+    assessments = (
+        db.query(models.Assessment.name, models.Subject.class_id, models.Assessment.maximum_marks)
+        .join(models.Subject, models.Assessment.subject_id == models.Subject.id)
+        .all()
+    )
+    pairs = [
+        (roll, name, maximum)
+        for roll, class_id in students
+        for name, subject_class, maximum in assessments
+        if subject_class == class_id
+    ]
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["roll_number", "assessment", "marks_obtained"])
+    for index in range(rows):
+        roll, name, maximum = pairs[index]
+        writer.writerow([roll, name, round(maximum * ((index * 37) % 100) / 100, 1)])
+    return out.getvalue().encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    use_scratch_database("import_throughput")
+    from ..database import SessionLocal
+    from ..seed_data import seed
+    from ..services.imports import iter_csv_rows, run_import
+
+    seed(reset=True)
+    with SessionLocal() as db:
+        payload = _build_csv(db, args.rows)
+
+    with SessionLocal() as db:
+        tracemalloc.start()
+        started = time.perf_counter()
+        summary = run_import(db, iter_csv_rows(io.BytesIO(payload)), batch_size=args.batch_size, dry_run=args.dry_run)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"rows={summary['processed']} created={summary['created']} updated={summary['updated']} "
+          f"errors={summary['error_count']}")
+    print(f"elapsed={elapsed:.2f}s throughput={summary['processed'] / elapsed:,.0f} rows/s "
+          f"peak_python_memory={peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
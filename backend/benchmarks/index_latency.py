@@ -0,0 +1,150 @@
+"""Per-endpoint latency with and without the hot foreign-key indexes.
+
+    python -m backend.benchmarks.index_latency --marks 1000000 --repeat 5
+
+Builds a synthetic school on a scratch SQLite file, drops every secondary index,
+times each endpoint, then recreates the indexes with ``ensure_indexes`` and
+times them again.
+"""
+import argparse
+import statistics
+import time
+from datetime import date
+
+from . import use_scratch_database
+
+SUBJECTS_PER_CLASS = 8
+ASSESSMENTS_PER_SUBJECT = 10
+STUDENTS_PER_CLASS = 40
+
+
+def _populate(db, marks: int) -> None:
+    from sqlalchemy import insert
+
+    from .. import models
+    from ..services import aggregates
+
+    per_student = SUBJECTS_PER_CLASS * ASSESSMENTS_PER_SUBJECT
+    class_count = max(marks // (per_student * STUDENTS_PER_CLASS), 1)
+    db.execute(insert(models.Class), [{"name": f"Bench Class {c}"} for c in range(class_count)])
+    class_ids = [c for (c,) in db.query(models.Class.id).filter(models.Class.name.like("Bench Class %"))]
+    db.execute(
+        insert(models.Subject),
+        [{"name": f"Subject {s}", "code": f"S{c}-{s}", "class_id": c} for c in class_ids for s in range(SUBJECTS_PER_CLASS)],
+    )
+    subjects = db.query(models.Subject.id, models.Subject.class_id).filter(models.Subject.class_id.in_(class_ids)).all()
+    db.execute(
+        insert(models.Assessment),
+        [
+            {
+                "name": f"Assessment {a}",
+                "type": "Exam",
+                "maximum_marks": 100,
+                "term": f"Term {a % 3 + 1}",
+                "subject_id": subject_id,
+                "date": date(2024, a % 12 + 1, 1),
+            }
+            for subject_id, _ in subjects
+            for a in range(ASSESSMENTS_PER_SUBJECT)
+        ],
+    )
+    db.execute(
+        insert(models.Student),
+        [
+            {"name": f"Student {c}-{s}", "roll_number": f"BENCH-{c}-{s}", "class_id": c}
+            for c in class_ids
+            for s in range(STUDENTS_PER_CLASS)
+        ],
+    )
+    assessments_by_class = {}
+    for assessment_id, class_id in (
+        db.query(models.Assessment.id, models.Subject.class_id)
+        .join(models.Subject, models.Assessment.subject_id == models.Subject.id)
+        .filter(models.Subject.class_id.in_(class_ids))
+    ):
+        assessments_by_class.setdefault(class_id, []).append(assessment_id)
+    students = db.query(models.Student.id, models.Student.class_id).filter(models.Student.class_id.in_(class_ids)).all()
+    batch = []
+    for student_id, class_id in students:
+        for assessment_id in assessments_by_class[class_id]:
+            batch.append(
+                {"student_id": student_id, "assessment_id": assessment_id, "marks_obtained": (student_id * 7 + assessment_id * 13) % 101}
+            )
+            if len(batch) >= 50_000:
+                db.execute(insert(models.Mark), batch)
+                batch.clear()
+    if batch:
+        db.execute(insert(models.Mark), batch)
+    aggregates.rebuild(db)
+    db.commit()
+
+
+def _time(client, path: str, repeat: int, headers=None) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        resp = client.get(path, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert resp.status_code == 200, (path, resp.status_code)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--marks", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    use_scratch_database("index_latency")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+
+    from .. import models
+    from ..auth import create_access_token
+    from ..database import SessionLocal, engine
+    from ..main import app
+    from ..migrations import ensure_indexes
+
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        _populate(db, args.marks)
+        print(f"populated {db.query(models.Mark).count():,} marks in {time.perf_counter() - started:.1f}s")
+        class_id = db.query(models.Class.id).filter(models.Class.name.like("Bench Class %")).first()[0]
+        student_id = db.query(models.Student.id).filter(models.Student.class_id == class_id).first()[0]
+        assessment_id = db.query(models.Mark.assessment_id).filter(models.Mark.student_id == student_id).first()[0]
+        admin = db.query(models.User).first()
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": admin.email, "role": admin.role})}
+
+    paths = [
+        f"/analytics/class/{class_id}/overview",
+        f"/analytics/class/{class_id}/grades",
+        f"/analytics/class/{class_id}/subjects-summary",
+        "/analytics/dashboard-summary",
+        f"/analytics/student/{student_id}/trend",
+        f"/students/{student_id}/detail",
+        f"/marks/?assessment_id={assessment_id}",
+        f"/marks/?class_id={class_id}&term=Term%201",
+    ]
+    client = TestClient(app)
+
+    with engine.begin() as conn:
+        names = [
+            row[0]
+            for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))
+        ]
+        for name in names:
+            conn.execute(text(f'DROP INDEX "{name}"'))
+    before = {path: _time(client, path, args.repeat, headers) for path in paths}
+
+    ensure_indexes(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    after = {path: _time(client, path, args.repeat, headers) for path in paths}
+
+    print(f"{'endpoint':<48} {'no index':>12} {'indexed':>12} {'speedup':>9}")
+    for path in paths:
+        print(f"{path:<48} {before[path]:>10.1f}ms {after[path]:>10.1f}ms {before[path] / after[path]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Compare requests/second and latency of the sync and async database modes.
+
+    python -m backend.benchmarks.load_test --clients 500 --seconds 20
+
+Starts ``uvicorn backend.main:app`` once per ``DB_MODE`` against the same
+seeded scratch database, then drives the analytics and list endpoints with
+``--clients`` concurrent httpx clients and reports throughput and percentiles.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from . import use_scratch_database
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start in time")
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+async def _drive(base_url: str, paths, clients: int, seconds: float) -> dict:
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        login = await http.post(
+            "/auth/login",
+            data={
+                "username": os.getenv("DEFAULT_ADMIN_EMAIL", "admin@gmail.com"),
+                "password": os.getenv("DEFAULT_ADMIN_PASSWORD", "admin123"),
+            },
+        )
+        login.raise_for_status()
+        http.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        deadline = time.perf_counter() + seconds
+
+        async def client(seed: int) -> None:
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    resp = await http.get(rng.choice(paths))
+                    ok = resp.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p99_ms": _percentile(latencies, 0.99),
+        "errors": errors,
+    }
+
+
+def _paths(base_url: str) -> list:
+    classes = httpx.get(base_url + "/classes/?fields=id").json()
+    assessments = httpx.get(base_url + "/assessments/?fields=id&limit=20").json()
+    paths = ["/analytics/dashboard-summary", "/classes/", "/subjects/"]
+    for row in classes:
+        paths += [
+            f"/analytics/class/{row['id']}/overview",
+            f"/analytics/class/{row['id']}/grades",
+            f"/analytics/class/{row['id']}/subjects-summary",
+            f"/students/?class_id={row['id']}",
+        ]
+    paths += [f"/marks/?assessment_id={row['id']}" for row in assessments]
+    return paths
+
+
+def run_mode(mode: str, clients: int, seconds: float) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, DB_MODE=mode)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        _wait_until_up(base_url, process)
+        result = asyncio.run(_drive(base_url, _paths(base_url), clients, seconds))
+    finally:
+        process.terminate()
+        process.wait()
+    return dict(result, mode=mode)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--modes", default="sync,async")
+    args = parser.parse_args()
+
+    use_scratch_database("load_test")
+    print(f"{'mode':<6} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode in args.modes.split(","):
+        result = run_mode(mode, args.clients, args.seconds)
+        print(f"{mode:<6} {result['rps']:>8.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
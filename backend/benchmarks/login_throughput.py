@@ -0,0 +1,105 @@
+"""Login throughput and API latency during a login burst.
+
+    python -m backend.benchmarks.login_throughput --logins 200 --api-clients 20 --seconds 15
+
+Starts ``uvicorn backend.main:app`` once per ``PASSWORD_VERIFY_WORKERS`` value.
+Each run first measures ``/classes/`` latency on its own, then again while
+``--logins`` clients sign in back to back, and reports sign-ins per second,
+sign-ins refused with 503 and the API percentiles in both phases.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from . import use_scratch_database
+from .load_test import _free_port, _percentile, _wait_until_up
+
+FORM = {
+    "username": os.getenv("DEFAULT_ADMIN_EMAIL", "admin@gmail.com"),
+    "password": os.getenv("DEFAULT_ADMIN_PASSWORD", "admin123"),
+}
+
+
+async def _phase(base_url: str, logins: int, api_clients: int, seconds: float) -> dict:
+    api_latencies, signed_in, refused = [], 0, 0
+    limits = httpx.Limits(max_connections=logins + api_clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        deadline = time.perf_counter() + seconds
+
+        async def api_client() -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if (await http.get("/classes/")).status_code == 200:
+                    api_latencies.append((time.perf_counter() - started) * 1000)
+
+        async def login_client() -> None:
+            nonlocal signed_in, refused
+            while time.perf_counter() < deadline:
+                resp = await http.post("/auth/login", data=FORM)
+                if resp.status_code == 200:
+                    signed_in += 1
+                elif resp.status_code == 503:
+                    refused += 1
+                    await asyncio.sleep(float(resp.headers.get("Retry-After", "1")))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(api_client() for _ in range(api_clients)), *(login_client() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        token = (await http.post("/auth/login", data=FORM)).json()["access_token"]
+        stats = await http.get("/auth/pool-stats", headers={"Authorization": f"Bearer {token}"})
+        peak = stats.json()["peak_pending"]
+    return {
+        "logins_per_s": signed_in / elapsed,
+        "refused": refused,
+        "peak_pending": peak,
+        "api_p50_ms": _percentile(api_latencies, 0.50),
+        "api_p99_ms": _percentile(api_latencies, 0.99),
+    }
+
+
+def run(workers: int, logins: int, api_clients: int, seconds: float):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, PASSWORD_VERIFY_WORKERS=str(workers))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        _wait_until_up(base_url, process)
+        # Start the verify workers so spawn time is not counted against the burst.
+        httpx.post(base_url + "/auth/login", data=FORM, timeout=120).raise_for_status()
+        quiet = asyncio.run(_phase(base_url, 0, api_clients, seconds))
+        burst = asyncio.run(_phase(base_url, logins, api_clients, seconds))
+    finally:
+        process.terminate()
+        process.wait()
+    return quiet, burst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--api-clients", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated PASSWORD_VERIFY_WORKERS values")
+    args = parser.parse_args()
+
+    use_scratch_database("login_throughput")
+    print(f"{'workers':>7} {'logins/s':>9} {'503s':>6} {'peak queue':>11} {'api p50 quiet/burst':>22} {'api p99 quiet/burst':>22}")
+    for workers in (int(value) for value in args.workers.split(",")):
+        quiet, burst = run(workers, args.logins, args.api_clients, args.seconds)
+        print(
+            f"{workers:>7} {burst['logins_per_s']:>9.1f} {burst['refused']:>6} {burst['peak_pending']:>11} "
+            f"{quiet['api_p50_ms']:>10.1f}/{burst['api_p50_ms']:<8.1f}ms "
+            f"{quiet['api_p99_ms']:>10.1f}/{burst['api_p99_ms']:<8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
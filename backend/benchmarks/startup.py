@@ -0,0 +1,84 @@
+"""Import time and time to first request for ``backend.main``.
+
+    python -m backend.benchmarks.startup --repeat 5
+
+Each sample is a fresh interpreter. ``first boot`` starts on an empty database,
+``bootstrap`` clears the schema marker so every table, index and backfill check
+runs again (what each start used to cost), and ``warm`` starts with the marker
+in place. Time to first request starts uvicorn and polls ``/`` until it answers.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .load_test import _free_port, _wait_until_up
+
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+import backend.main
+print(time.perf_counter() - started, "reportlab" in sys.modules)
+"""
+
+
+def _import_seconds(env: dict) -> tuple:
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, capture_output=True, text=True, check=True)
+    seconds, reportlab = output.stdout.split()
+    return float(seconds), reportlab == "True"
+
+
+def _first_request_seconds(env: dict) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"], env=env
+    )
+    try:
+        _wait_until_up(f"http://127.0.0.1:{port}", process)
+        return time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _clear_marker(env: dict) -> None:
+    subprocess.run(
+        [sys.executable, "-c", "from backend.database import engine; from sqlalchemy import text\n"
+         "with engine.begin() as conn: conn.execute(text('DELETE FROM schema_version'))"],
+        env=env,
+        check=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="srt-bench-")
+    print(f"{'start':<11} {'import s':>9} {'first request s':>16} {'reportlab loaded':>17}")
+    for label in ("first boot", "bootstrap", "warm"):
+        imports, requests, reportlab = [], [], False
+        for run in range(args.repeat):
+            path = os.path.join(scratch, f"{label.replace(' ', '_')}-{run}.db")
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}")
+            if label != "first boot":
+                _import_seconds(env)
+            if label == "bootstrap":
+                _clear_marker(env)
+            seconds, reportlab = _import_seconds(env)
+            imports.append(seconds)
+            if label == "bootstrap":
+                _clear_marker(env)
+            elif label == "first boot":
+                os.remove(path)
+            requests.append(_first_request_seconds(env))
+        print(f"{label:<11} {statistics.median(imports):>9.3f} {statistics.median(requests):>16.3f} {str(reportlab):>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Per-endpoint benchmark suite with a tracked JSON baseline.
+
+    python -m backend.benchmarks.suite --size small
+    python -m backend.benchmarks.suite --size medium --update-baseline
+
+Generates a deterministic synthetic school with ``seed_data.generate`` on a
+scratch database, then drives every router through the TestClient, recording
+p50/p95/p99 latency, SQL statements per request and peak traced memory per
+request. A short HTTP load run against uvicorn (``load_test``) adds
+throughput and percentiles under concurrency.
+
+Results are compared with the baseline for the same size. A p50 latency or
+peak memory figure regresses when it exceeds ``--threshold`` times the
+baseline and grows by more than ``--min-delta-ms`` (or 64 KiB), HTTP
+throughput regresses when it falls below the baseline divided by the
+threshold, and any increase in statements per request is a regression. Tail
+percentiles from a few dozen samples are noisy, so p95/p99 are recorded but
+only gated with ``--gate-tails``. The exit status is 1 when anything regressed.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import use_scratch_database
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+SIZES = {
+    "small": dict(classes=20, students_per_class=30, subjects_per_class=6, assessments_per_term=2, terms=3),
+    "medium": dict(classes=250, students_per_class=40, subjects_per_class=8, assessments_per_term=2, terms=3),
+    # 100k students, 4.8M marks.
+    "large": dict(classes=2500, students_per_class=40, subjects_per_class=8, assessments_per_term=2, terms=3),
+}
+MEMORY_SLACK_KIB = 64
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 2)
+
+
+def _endpoints(ids: dict) -> list:
+    """``(name, method, path, body)``; a body factory takes the iteration number."""
+    class_id, student_id, subject_id, assessment_id = ids["class"], ids["student"], ids["subject"], ids["assessment"]
+    gets = [
+        ("classes list", "/classes/"),
+        ("subjects list", f"/subjects/?class_id={class_id}"),
+        ("assessments list", f"/assessments/?subject_id={subject_id}"),
+        ("students list", f"/students/?class_id={class_id}"),
+        ("student", f"/students/{student_id}"),
+        ("student profile", f"/students/{student_id}/profile"),
+        ("student detail", f"/students/{student_id}/detail"),
+        ("marks by assessment", f"/marks/?assessment_id={assessment_id}"),
+        ("marks by class/term", f"/marks/?class_id={class_id}&term=Term%201"),
+        ("student trend", f"/analytics/student/{student_id}/trend"),
+        ("student rank", f"/analytics/student/{student_id}/rank"),
+        ("class subjects summary", f"/analytics/class/{class_id}/subjects-summary"),
+        ("class overview", f"/analytics/class/{class_id}/overview"),
+        ("class grades", f"/analytics/class/{class_id}/grades"),
+        ("class histogram", f"/analytics/class/{class_id}/histogram"),
+        ("class grades what-if", f"/analytics/class/{class_id}/grades/what-if?boundaries=50&labels=F&labels=P"),
+        ("class trends", f"/analytics/class/{class_id}/trends"),
+        ("class rankings", f"/analytics/class/{class_id}/rankings"),
+        ("dashboard summary", "/analytics/dashboard-summary"),
+        ("school statistics", "/analytics/school/statistics"),
+        ("school cohorts", "/analytics/school/cohorts"),
+        ("student report pdf", f"/reports/student/{student_id}"),
+        ("class reports zip", f"/reports/class/{class_id}"),
+    ]
+    endpoints = [(name, "GET", path, None) for name, path in gets]
+    students, empty = ids["class_students"], ids["empty_assessments"]
+
+    def new_mark(iteration: int) -> dict:
+        # Walk every student of one fresh assessment before moving to the next, so each call inserts.
+        assessment_id = empty[iteration // len(students)]
+        return {"student_id": students[iteration % len(students)], "assessment_id": assessment_id, "marks_obtained": 10}
+
+    endpoints.append(("mark create", "POST", "/marks/", new_mark))
+    return endpoints
+
+
+def _prepare(client, headers, size: dict, calls: int) -> dict:
+    from .. import models
+    from ..database import SessionLocal
+    from ..seed_data import generate
+
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        counts = generate(db, **size)
+        print(f"generated {counts['marks']:,} marks for {counts['students']:,} students in {time.perf_counter() - started:.1f}s")
+        class_id = db.query(models.Class.id).order_by(models.Class.id).first()[0]
+        in_class = db.query(models.Student.id).filter(models.Student.class_id == class_id)
+        students = [row[0] for row in in_class.order_by(models.Student.id)]
+        subjects = db.query(models.Subject.id).filter(models.Subject.class_id == class_id)
+        subject_id = subjects.order_by(models.Subject.id).first()[0]
+        assessment_id = db.query(models.Assessment.id).filter(models.Assessment.subject_id == subject_id).first()[0]
+    # Re-posting a (student, assessment) pair updates it, so ``calls`` creates need
+    # enough fresh assessments to give every call a pair of its own.
+    empty = []
+    for number in range(-(-calls // len(students))):
+        assessment = {"name": f"Benchmark {number}", "type": "Quiz", "maximum_marks": 20, "term": "Term 1"}
+        resp = client.post("/assessments/", json=dict(assessment, subject_id=subject_id), headers=headers)
+        resp.raise_for_status()
+        empty.append(resp.json()["id"])
+    return {
+        "class": class_id,
+        "student": students[0],
+        "class_students": students,
+        "subject": subject_id,
+        "assessment": assessment_id,
+        "empty_assessments": empty,
+    }
+
+
+def measure(client, headers, endpoints, repeat: int) -> dict:
+    from sqlalchemy import event
+
+    from ..database import engine
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    results = {}
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for name, method, path, body in endpoints:
+            iteration = 0
+
+            def call():
+                nonlocal iteration
+                payload = body(iteration) if body else None
+                iteration += 1
+                resp = client.request(method, path, json=payload, headers=headers)
+                assert resp.status_code == 200, (name, resp.status_code, resp.text[:200])
+
+            call()  # warm up: worker processes, imports, statement caches
+            samples, queries = [], []
+            for _ in range(repeat):
+                statements.clear()
+                started = time.perf_counter()
+                call()
+                samples.append((time.perf_counter() - started) * 1000)
+                queries.append(len(statements))
+            tracemalloc.start()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {
+                "p50_ms": _percentile(samples, 0.50),
+                "p95_ms": _percentile(samples, 0.95),
+                "p99_ms": _percentile(samples, 0.99),
+                "queries": max(queries),
+                "peak_kib": round(peak / 1024, 1),
+            }
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta_ms: float, tails: bool = False) -> list:
+    """Regressions of ``current`` against ``baseline`` as readable strings."""
+    regressions = []
+    for name, figures in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for key, value in figures.items():
+            if key not in before:
+                continue
+            old = before[key]
+            if key == "queries":
+                regressed = value > old
+            elif key == "p50_ms" or (tails and key.endswith("_ms")):
+                regressed = value > old * threshold and value - old > min_delta_ms
+            elif key == "peak_kib":
+                regressed = value > old * threshold and value - old > MEMORY_SLACK_KIB
+            elif key == "rps":
+                regressed = value * threshold < old
+            else:
+                regressed = False
+            if regressed:
+                regressions.append(f"{name}: {key} {old} -> {value}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed ratio over the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore smaller latency increases")
+    parser.add_argument("--gate-tails", action="store_true", help="also fail on p95/p99 regressions")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline for --size")
+    parser.add_argument("--http-clients", type=int, default=20, help="0 skips the HTTP load run")
+    parser.add_argument("--http-seconds", type=float, default=5)
+    parser.add_argument("--cache", action="store_true", help="keep the analytics cache on (measures cache hits)")
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ.setdefault("ANALYTICS_CACHE_TTL", "0")
+    os.environ.setdefault("REPORT_CACHE_DIR", tempfile.mkdtemp(prefix="srt-bench-reports-"))
+    use_scratch_database(f"suite_{args.size}")
+    from fastapi.testclient import TestClient
+
+    from ..auth import create_access_token
+    from ..database import SessionLocal
+    from ..main import app
+    from ..seed_data import ensure_default_admin
+    from .load_test import run_mode
+
+    with SessionLocal() as db:
+        admin = ensure_default_admin(db)
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": admin.email, "role": admin.role})}
+    with TestClient(app) as client:
+        # Each endpoint is called once to warm up, ``repeat`` times, then once under tracemalloc.
+        ids = _prepare(client, headers, SIZES[args.size], args.repeat + 2)
+        current = measure(client, headers, _endpoints(ids), args.repeat)
+    if args.http_clients:
+        http = run_mode("sync", args.http_clients, args.http_seconds)
+        current["http load"] = {key: round(http[key], 2) for key in ("rps", "p50_ms", "p99_ms")}
+
+    print(f"{'endpoint':<24} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'peak KiB':>9}")
+    for name, figures in current.items():
+        if name == "http load":
+            print(f"{name:<24} {figures['p50_ms']:>8.2f} {'':>8} {figures['p99_ms']:>8.2f}   {figures['rps']:.1f} req/s")
+            continue
+        print(
+            f"{name:<24} {figures['p50_ms']:>8.2f} {figures['p95_ms']:>8.2f} {figures['p99_ms']:>8.2f} "
+            f"{figures['queries']:>8} {figures['peak_kib']:>9.1f}"
+        )
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baselines = json.load(handle)
+    if args.update_baseline:
+        baselines[args.size] = {
+            "recorded": {"repeat": args.repeat, "python": platform.python_version(), "machine": platform.machine()},
+            "results": current,
+        }
+        with open(args.baseline, "w") as handle:
+            json.dump(baselines, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"baseline for {args.size!r} written to {args.baseline}")
+        return
+
+    if args.size not in baselines:
+        print(f"no {args.size!r} baseline in {args.baseline}; run with --update-baseline to record one")
+        return
+    regressions = compare(current, baselines[args.size]["results"], args.threshold, args.min_delta_ms, args.gate_tails)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions against the {args.size!r} baseline (threshold {args.threshold}x)")
+
+
+if __name__ == "__main__":
+    main()
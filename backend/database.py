@@ -1,16 +1,117 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./school.db")
+# "tuned" applies the pragmas / pool settings below; "basic" keeps driver defaults.
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+# "async" serves the read-heavy endpoints from an AsyncSession on the event loop;
+# "sync" runs them on the request threadpool with a regular Session.
+DB_MODE = os.getenv("DB_MODE", "sync")
+
+SQLITE_PRAGMAS = {
+    # WAL lets readers keep going while a teacher's write commits.
+    "journal_mode": "WAL",
+    # Safe with WAL: a crash can lose the last commit but never corrupts the file.
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "16384")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_BYTES", str(128 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
+
+# Sized above the request threadpool so handlers never queue for a connection.
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+}
+# Server databases drop idle connections, so check and recycle them.
+SERVER_POOL_OPTIONS = {
+    **POOL_OPTIONS,
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": True,
+}
+
+# Async drivers used when ASYNC_DATABASE_URL is not given explicitly.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _engine_options(url: str, profile: str) -> dict:
+    if profile not in ("tuned", "basic"):
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}; expected 'tuned' or 'basic'")
+    if profile == "basic":
+        return {}
+    if url.startswith("sqlite"):
+        return POOL_OPTIONS if ":memory:" not in url else {}
+    return SERVER_POOL_OPTIONS
+
+
+def build_engine(url: str, profile: str = DB_PROFILE) -> Engine:
+    """Create an engine for ``url`` configured by the named profile."""
+    options = _engine_options(url, profile)
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, **options)
+        if profile == "tuned":
+            event.listen(engine, "connect", _apply_sqlite_pragmas)
+        return engine
+    return create_engine(url, **options)
+
+
+def async_database_url(url: str) -> str:
+    """Swap the driver in ``url`` for its asyncio counterpart."""
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+def build_async_engine(url: str, profile: str = DB_PROFILE):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(url, **_engine_options(url, profile))
+    if url.startswith("sqlite") and profile == "tuned":
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+# Created on first use so the async driver is only needed when DB_MODE=async.
+async_engine = None
+_async_session_factory = None
+
+
+def AsyncSessionLocal():
+    global async_engine, _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        async_engine = build_async_engine(ASYNC_DATABASE_URL)
+        _async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return _async_session_factory()
+
+
+async def dispose_async_engine() -> None:
+    global async_engine, _async_session_factory
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = _async_session_factory = None
+
 
 def get_db():
     db = SessionLocal()
@@ -18,3 +119,41 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+T = TypeVar("T")
+
+
+class ReadSession:
+    """Runs sync query code for an ``async def`` endpoint without blocking the loop.
+
+    With an AsyncSession the function runs through ``run_sync`` on the event
+    loop; otherwise it runs on the threadpool with a regular Session. Either way
+    the service functions stay plain ``def fn(db, ...)``.
+    """
+
+    def __init__(self, session: Session = None, async_session=None):
+        self.session = session
+        self.async_session = async_session
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.async_session is not None:
+            return await self.async_session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_read_db():
+    if DB_MODE == "async":
+        async with AsyncSessionLocal() as db:
+            yield ReadSession(async_session=db)
+    else:
+        db = SessionLocal()
+        try:
+            yield ReadSession(session=db)
+        finally:
+            await run_in_threadpool(db.close)
@@ -1,6 +1,7 @@
 import os
 import pathlib
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -11,14 +12,40 @@ if __package__ in (None, ""):
     sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
     __package__ = "backend"
 
-from .database import Base, engine
-from .seed_data import ensure_seed_data
+from .database import Base, SessionLocal, dispose_async_engine, engine
+from .migrations import ensure_indexes, record_schema, schema_current
+from .seed_data import ensure_default_admin, ensure_seed_data
+from .services.aggregates import ensure_aggregates
+from .services.conditional import ensure_versions
+from .services.pagination import NEXT_CURSOR_HEADER
+from .services.password_pool import pool as password_pool
+from .services.render_pool import pool as render_pool
 from .routers import auth, students, classes, subjects, assessments, marks, analytics, reports
 
-Base.metadata.create_all(bind=engine)
-ensure_seed_data()
+# Demo data is only loaded on request; `python -m backend.seed_data` seeds explicitly.
+SEED_ON_STARTUP = os.getenv("SEED_ON_STARTUP", "false").lower() == "true"
 
-app = FastAPI(title="Student Result Tracking & Analytics")
+if not schema_current(engine):
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+    with SessionLocal() as db:
+        ensure_aggregates(db)
+        ensure_versions(db)
+        ensure_default_admin(db)
+    record_schema(engine)
+if SEED_ON_STARTUP:
+    ensure_seed_data()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    password_pool.shutdown()
+    render_pool.shutdown()
+    await dispose_async_engine()
+
+
+app = FastAPI(title="Student Result Tracking & Analytics", lifespan=lifespan)
 
 # Browsers will reject credentialed requests when the server responds with
 # `Access-Control-Allow-Origin: *`. That resulted in the frontend failing with a
@@ -34,6 +61,7 @@ app.add_middleware(
     allow_credentials=allow_credentials,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 app.include_router(auth.router)
@@ -0,0 +1,62 @@
+"""Bring existing databases up to the tables and indexes declared on the models.
+
+``Base.metadata.create_all`` only creates missing tables, so indexes added to a
+model later never reach an existing ``school.db``. :func:`ensure_indexes` creates
+any that are missing and is safe to run on every startup.
+
+Both walk every table, so startup first compares :func:`schema_fingerprint`
+with the marker stored by :func:`record_schema` and skips the bootstrap when
+the models have not changed since the database was last brought up to date.
+"""
+import hashlib
+import logging
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from . import models
+from .database import Base
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_indexes(engine: Engine) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with engine.begin() as conn:
+                    index.create(bind=conn, checkfirst=True)
+            except IntegrityError:
+                # Existing duplicate rows; leave the data alone and keep serving.
+                logger.warning("Skipping unique index %s: table %s has duplicate rows", index.name, table.name)
+
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column and index declared on the models."""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        parts += [f"{column.name}:{column.type}:{column.nullable}" for column in table.columns]
+        parts += sorted(
+            f"{index.name}:{index.unique}:{','.join(column.name for column in index.columns)}" for index in table.indexes
+        )
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def schema_current(engine: Engine) -> bool:
+    marker = models.SchemaVersion.__table__
+    try:
+        with engine.connect() as conn:
+            stored = conn.execute(select(marker.c.fingerprint).where(marker.c.id == 1)).scalar()
+    except DBAPIError:
+        # No marker table yet: a new database or one from before the marker existed.
+        return False
+    return stored == schema_fingerprint()
+
+
+def record_schema(engine: Engine) -> None:
+    marker = models.SchemaVersion.__table__
+    with engine.begin() as conn:
+        conn.execute(delete(marker))
+        conn.execute(insert(marker), {"id": 1, "fingerprint": schema_fingerprint()})
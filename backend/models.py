@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -36,7 +36,7 @@ class Student(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     roll_number = Column(String, unique=True, nullable=False)
-    class_id = Column(Integer, ForeignKey("classes.id"))
+    class_id = Column(Integer, ForeignKey("classes.id"), index=True)
     extra_info = Column(String, nullable=True)
 
     class_obj = relationship("Class", back_populates="students")
@@ -49,7 +49,7 @@ class Subject(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     code = Column(String, nullable=False)
-    class_id = Column(Integer, ForeignKey("classes.id"), nullable=True)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=True, index=True)
 
     class_obj = relationship("Class", back_populates="subjects")
     assessments = relationship("Assessment", back_populates="subject", cascade="all, delete")
@@ -63,7 +63,7 @@ class Assessment(Base):
     type = Column(String, nullable=False)
     maximum_marks = Column(Integer, nullable=False)
     term = Column(String, nullable=False)
-    subject_id = Column(Integer, ForeignKey("subjects.id"))
+    subject_id = Column(Integer, ForeignKey("subjects.id"), index=True)
     date = Column(Date, nullable=True)
 
     subject = relationship("Subject", back_populates="assessments")
@@ -72,6 +72,12 @@ class Assessment(Base):
 
 class Mark(Base):
     __tablename__ = "marks"
+    # Unique indexes rather than constraints so they can be added to existing
+    # SQLite tables; the leading columns also serve student/assessment lookups.
+    __table_args__ = (
+        Index("uq_marks_student_assessment", "student_id", "assessment_id", unique=True),
+        Index("ix_marks_assessment_score", "assessment_id", "marks_obtained"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"))
@@ -80,3 +86,71 @@ class Mark(Base):
 
     student = relationship("Student", back_populates="marks")
     assessment = relationship("Assessment", back_populates="marks")
+
+
+class StudentSubjectTermAggregate(Base):
+    """Rollup of one student's marks for a subject and term.
+
+    Rows are derived data: ``services.aggregates`` rewrites them whenever the
+    underlying marks or assessments change, so analytics can read sums instead of
+    scanning ``marks``.
+    """
+
+    __tablename__ = "student_subject_term_aggregates"
+    __table_args__ = (UniqueConstraint("student_id", "subject_id", "term"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False, index=True)
+    term = Column(String, nullable=False)
+    # Sum of per-mark percentages in hundredths, kept integral so sums are exact.
+    percentage_sum = Column(Integer, nullable=False, default=0)
+    mark_count = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+
+
+class StudentSubjectMonthAggregate(Base):
+    """Rollup of one student's marks for a subject, term and calendar month.
+
+    Maintained alongside ``StudentSubjectTermAggregate`` for trend analytics;
+    ``month`` is ``YYYY-MM`` of the assessment date, or null for undated ones.
+    """
+
+    __tablename__ = "student_subject_month_aggregates"
+    __table_args__ = (UniqueConstraint("student_id", "subject_id", "term", "month"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False, index=True)
+    term = Column(String, nullable=False)
+    month = Column(String, nullable=True)
+    percentage_sum = Column(Integer, nullable=False, default=0)
+    mark_count = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped in the same transaction as each write.
+
+    ``services.conditional`` derives ETags from these rows so unchanged list and
+    analytics responses can be answered with 304 without running their queries.
+    """
+
+    __tablename__ = "table_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class SchemaVersion(Base):
+    """Fingerprint of the schema this database was last bootstrapped with.
+
+    ``backend.migrations`` compares it on startup and skips table, index and
+    backfill checks when nothing in the models has changed.
+    """
+
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
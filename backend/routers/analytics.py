@@ -1,39 +1,176 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from .. import schemas
-from ..database import get_db
-from ..services import analytics as analytics_service
+from ..auth import AdminOnly
+from ..database import ReadSession, get_read_db
+from ..services import analytics as analytics_service, histograms, rankings, stats_kernel, trends
+from ..services.analytics_cache import cache
+from ..services.conditional import ALL_TABLES, not_modified
+from ..services.pagination import MAX_LIMIT, NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 
 @router.get("/student/{student_id}/trend", response_model=schemas.StudentTrendResponse)
-def student_trend(student_id: int, db: Session = Depends(get_db)):
-    result = analytics_service.student_trend(db, student_id)
+async def student_trend(student_id: int, request: Request, response: Response, db: ReadSession = Depends(get_read_db)):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    result = await db.run(analytics_service.student_trend, student_id)
     if not result:
         raise HTTPException(status_code=404, detail="Student not found")
     return result
 
 
 @router.get("/class/{class_id}/subjects-summary")
-def subject_summary(class_id: int, db: Session = Depends(get_db)):
-    return analytics_service.class_subject_summary(db, class_id)
+async def subject_summary(class_id: int, request: Request, response: Response, db: ReadSession = Depends(get_read_db)):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    return await cache.fetch(db, analytics_service.class_subject_summary, class_id, class_id=class_id)
 
 
 @router.get("/class/{class_id}/overview", response_model=schemas.ClassOverviewResponse)
-def class_overview(class_id: int, db: Session = Depends(get_db)):
-    result = analytics_service.class_overview(db, class_id)
+async def class_overview(class_id: int, request: Request, response: Response, db: ReadSession = Depends(get_read_db)):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    result = await cache.fetch(db, analytics_service.class_overview, class_id, class_id=class_id)
     if not result:
         raise HTTPException(status_code=404, detail="Class not found")
     return result
 
 
 @router.get("/class/{class_id}/grades")
-def class_grades(class_id: int, db: Session = Depends(get_db)):
-    return analytics_service.class_grade_distribution(db, class_id)
+async def class_grades(class_id: int, request: Request, response: Response, db: ReadSession = Depends(get_read_db)):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    return await cache.fetch(db, analytics_service.class_grade_distribution, class_id, class_id=class_id)
+
+
+@router.get("/class/{class_id}/histogram", response_model=schemas.GradeHistogram)
+async def class_histogram(
+    class_id: int,
+    request: Request,
+    response: Response,
+    subject_id: Optional[int] = None,
+    term: Optional[str] = None,
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    return await cache.fetch(db, histograms.class_histogram, class_id, subject_id, term, class_id=class_id)
+
+
+@router.get("/class/{class_id}/grades/what-if", response_model=List[schemas.GradeShare])
+async def class_grades_what_if(
+    class_id: int,
+    request: Request,
+    response: Response,
+    boundaries: List[float] = Query(list(analytics_service.GRADE_BOUNDARIES)),
+    labels: Optional[List[str]] = Query(None),
+    subject_id: Optional[int] = None,
+    term: Optional[str] = None,
+    db: ReadSession = Depends(get_read_db),
+):
+    try:
+        boundaries, labels = histograms.parse_boundaries(boundaries, labels)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    histogram = await cache.fetch(db, histograms.class_histogram, class_id, subject_id, term, class_id=class_id)
+    return histograms.what_if(histogram, boundaries, labels)
+
+
+@router.get("/class/{class_id}/trends", response_model=schemas.ClassTrendsResponse)
+async def class_trends(
+    class_id: int,
+    request: Request,
+    response: Response,
+    period: str = Query("term", pattern="^(" + "|".join(trends.PERIODS) + ")$"),
+    window: int = Query(trends.DEFAULT_WINDOW, ge=1, le=12),
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    result = await cache.fetch(db, trends.class_trends, class_id, period, window, class_id=class_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Class not found")
+    return result
+
+
+@router.get("/class/{class_id}/rankings", response_model=List[schemas.ClassRankingEntry])
+async def class_rankings(
+    class_id: int,
+    request: Request,
+    response: Response,
+    term: Optional[str] = None,
+    subject_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=MAX_LIMIT),
+    cursor: Optional[int] = Query(None, ge=0, description="Leaderboard position of the last entry already seen"),
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    entries, next_cursor = await cache.fetch(
+        db, rankings.class_rankings, class_id, term, subject_id, limit, cursor, class_id=class_id
+    )
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return entries
+
+
+@router.get("/student/{student_id}/rank", response_model=schemas.StudentRankResponse)
+async def student_rank(student_id: int, request: Request, response: Response, db: ReadSession = Depends(get_read_db)):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    result = await cache.fetch(db, rankings.student_rank, student_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return result
 
 
 @router.get("/dashboard-summary", response_model=schemas.DashboardSummary)
-def dashboard_summary(db: Session = Depends(get_db)):
-    return analytics_service.dashboard_summary(db)
+async def dashboard_summary(request: Request, response: Response, db: ReadSession = Depends(get_read_db)):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    return await cache.fetch(db, analytics_service.dashboard_summary)
+
+
+@router.get("/school/statistics")
+async def school_statistics(
+    request: Request, response: Response, term: Optional[str] = None, db: ReadSession = Depends(get_read_db)
+):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    return await cache.fetch(db, stats_kernel.school_statistics, term)
+
+
+@router.get("/school/cohorts", response_model=List[schemas.ClassCohort])
+async def school_cohorts(
+    request: Request,
+    response: Response,
+    term: Optional[str] = None,
+    subject_code: Optional[str] = None,
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ALL_TABLES)
+    if unchanged is not None:
+        return unchanged
+    return await cache.fetch(db, analytics_service.school_cohorts, term, subject_code)
+
+
+@router.get("/cache-stats", dependencies=[Depends(AdminOnly)])
+def cache_stats():
+    return cache.stats()
@@ -1,17 +1,50 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..auth import TeacherOnly
-from ..database import get_db
+from ..database import ReadSession, get_db, get_read_db
+from ..services.conditional import not_modified
+from ..services.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/assessments", tags=["Assessments"])
 
 
+def _list_assessments(
+    db: Session,
+    subject_id: Optional[int],
+    class_id: Optional[int],
+    term: Optional[str],
+    page: PageParams,
+    response: Response,
+):
+    query = db.query(models.Assessment)
+    if subject_id is not None:
+        query = query.filter(models.Assessment.subject_id == subject_id)
+    if class_id is not None:
+        query = query.join(models.Subject, models.Assessment.subject_id == models.Subject.id).filter(
+            models.Subject.class_id == class_id
+        )
+    if term is not None:
+        query = query.filter(models.Assessment.term == term)
+    return paginate(query, models.Assessment, page, response)
+
+
 @router.get("/", response_model=List[schemas.AssessmentOut])
-def list_assessments(db: Session = Depends(get_db)):
-    return db.query(models.Assessment).all()
+async def list_assessments(
+    request: Request,
+    response: Response,
+    subject_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    term: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ["assessments", "subjects"])
+    if unchanged is not None:
+        return unchanged
+    return await db.run(_list_assessments, subject_id, class_id, term, page, response)
 
 
 @router.post("/", response_model=schemas.AssessmentOut, dependencies=[Depends(TeacherOnly)])
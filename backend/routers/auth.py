@@ -1,11 +1,13 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..auth import create_access_token, get_password_hash, verify_password, ACCESS_TOKEN_EXPIRE_MINUTES
-from ..database import get_db
+from ..auth import AdminOnly, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..database import SessionLocal, get_db
+from ..services import password_pool
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -16,10 +18,29 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Registration is disabled. Use the admin account.")
 
 
+def _find_user(email: str):
+    # A session of its own, closed before verification, so sign-ins waiting on
+    # the verify pool do not hold database connections.
+    with SessionLocal() as db:
+        return (
+            db.query(models.User.id, models.User.name, models.User.email, models.User.role, models.User.hashed_password)
+            .filter(models.User.email == email)
+            .first()
+        )
+
+
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await run_in_threadpool(_find_user, form_data.username)
+    try:
+        verified = user is not None and await password_pool.pool.verify(form_data.password, user.hashed_password)
+    except password_pool.VerifyQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins at once, please retry shortly",
+            headers={"Retry-After": str(password_pool.PASSWORD_VERIFY_RETRY_AFTER)},
+        )
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
     if user.role != "ADMIN":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the admin account can sign in.")
@@ -28,3 +49,8 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         data={"sub": user.email, "role": user.role, "user_id": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer", "role": user.role, "name": user.name}
+
+
+@router.get("/pool-stats", dependencies=[Depends(AdminOnly)])
+def pool_stats():
+    return password_pool.pool.stats()
@@ -1,17 +1,35 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..auth import AdminOnly, TeacherOnly
-from ..database import get_db
+from ..database import ReadSession, get_db, get_read_db
+from ..services.conditional import not_modified
+from ..services.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/classes", tags=["Classes"])
 
 
+def _list_classes(db: Session, teacher_id: Optional[int], page: PageParams, response: Response):
+    query = db.query(models.Class)
+    if teacher_id is not None:
+        query = query.filter(models.Class.teacher_id == teacher_id)
+    return paginate(query, models.Class, page, response)
+
+
 @router.get("/", response_model=List[schemas.ClassOut])
-def list_classes(db: Session = Depends(get_db)):
-    return db.query(models.Class).all()
+async def list_classes(
+    request: Request,
+    response: Response,
+    teacher_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ["classes"])
+    if unchanged is not None:
+        return unchanged
+    return await db.run(_list_classes, teacher_id, page, response)
 
 
 @router.post("/", response_model=schemas.ClassOut, dependencies=[Depends(AdminOnly)])
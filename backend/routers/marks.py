@@ -1,30 +1,122 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..auth import TeacherOnly
-from ..database import get_db
+from ..database import ReadSession, SessionLocal, get_db, get_read_db
+from ..services.conditional import not_modified
+from ..services.imports import DEFAULT_BATCH_SIZE, ImportFileError, import_marks, open_rows, run_import
+from ..services.marks import upsert_marks
+from ..services.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/marks", tags=["Marks"])
 
 
+def _list_marks(
+    db: Session,
+    student_id: Optional[int],
+    assessment_id: Optional[int],
+    class_id: Optional[int],
+    term: Optional[str],
+    page: PageParams,
+    response: Response,
+):
+    query = db.query(models.Mark)
+    if student_id is not None:
+        query = query.filter(models.Mark.student_id == student_id)
+    if assessment_id is not None:
+        query = query.filter(models.Mark.assessment_id == assessment_id)
+    if class_id is not None:
+        query = query.join(models.Student, models.Mark.student_id == models.Student.id).filter(
+            models.Student.class_id == class_id
+        )
+    if term is not None:
+        query = query.join(models.Assessment, models.Mark.assessment_id == models.Assessment.id).filter(
+            models.Assessment.term == term
+        )
+    return paginate(query, models.Mark, page, response)
+
+
 @router.get("/", response_model=List[schemas.MarkOut])
-def list_marks(db: Session = Depends(get_db)):
-    return db.query(models.Mark).all()
+async def list_marks(
+    request: Request,
+    response: Response,
+    student_id: Optional[int] = None,
+    assessment_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    term: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ["marks", "students", "assessments"])
+    if unchanged is not None:
+        return unchanged
+    return await db.run(_list_marks, student_id, assessment_id, class_id, term, page, response)
 
 
 @router.post("/", response_model=schemas.MarkOut, dependencies=[Depends(TeacherOnly)])
 def create_mark(payload: schemas.MarkCreate, db: Session = Depends(get_db)):
-    assessment = db.query(models.Assessment).filter(models.Assessment.id == payload.assessment_id).first()
-    student = db.query(models.Student).filter(models.Student.id == payload.student_id).first()
-    if not assessment or not student:
-        raise HTTPException(status_code=400, detail="Invalid student or assessment")
-    mark = models.Mark(**payload.dict())
-    db.add(mark)
+    # Re-entering a mark for the same student and assessment updates it in place.
+    # upsert_marks also checks the student, the assessment and the score range.
+    result = upsert_marks(db, [payload.dict()])
+    if result["errors"]:
+        detail = result["errors"][0]["detail"]
+        if detail.startswith("Unknown"):
+            detail = "Invalid student or assessment"
+        raise HTTPException(status_code=400, detail=detail)
     db.commit()
-    db.refresh(mark)
-    return mark
+    return (
+        db.query(models.Mark)
+        .filter(models.Mark.student_id == payload.student_id, models.Mark.assessment_id == payload.assessment_id)
+        .one()
+    )
+
+
+@router.post("/bulk", response_model=schemas.MarkBulkResult, dependencies=[Depends(TeacherOnly)])
+def create_marks_bulk(payload: schemas.MarkBulkCreate, db: Session = Depends(get_db)):
+    entries = [
+        {
+            "student_id": entry.student_id,
+            "assessment_id": entry.assessment_id if entry.assessment_id is not None else payload.assessment_id,
+            "marks_obtained": entry.marks_obtained,
+        }
+        for entry in payload.marks
+    ]
+    result = upsert_marks(db, entries)
+    db.commit()
+    return result
+
+
+@router.post("/import", dependencies=[Depends(TeacherOnly)])
+def import_marks_file(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    stream: bool = Query(False, description="Stream one NDJSON progress line per batch"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10_000),
+    db: Session = Depends(get_db),
+):
+    try:
+        rows = open_rows(file.filename or "", file.file)
+        if not stream:
+            return run_import(db, rows, batch_size=batch_size, dry_run=dry_run)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    def progress_lines():
+        # The request-scoped session may be closed before streaming finishes.
+        with SessionLocal() as session:
+            try:
+                for event in import_marks(session, rows, batch_size=batch_size, dry_run=dry_run):
+                    yield json.dumps(event) + "\n"
+            except ImportFileError as exc:
+                # Headers are already sent, so a late decode error ends the stream with an error line.
+                yield json.dumps({"error": str(exc)}) + "\n"
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
 
 
 @router.put("/{mark_id}", response_model=schemas.MarkOut, dependencies=[Depends(TeacherOnly)])
@@ -32,9 +124,18 @@ def update_mark(mark_id: int, payload: schemas.MarkCreate, db: Session = Depends
     mark = db.query(models.Mark).filter(models.Mark.id == mark_id).first()
     if not mark:
         raise HTTPException(status_code=404, detail="Mark not found")
+    maximum = db.query(models.Assessment.maximum_marks).filter(models.Assessment.id == payload.assessment_id).scalar()
+    if maximum is None:
+        raise HTTPException(status_code=400, detail="Invalid student or assessment")
+    if not 0 <= payload.marks_obtained <= maximum:
+        raise HTTPException(status_code=400, detail=f"Marks must be between 0 and {maximum}")
     for key, value in payload.dict().items():
         setattr(mark, key, value)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A mark for this student and assessment already exists")
     db.refresh(mark)
     return mark
 
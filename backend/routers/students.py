@@ -1,18 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .. import models, schemas
 from ..auth import AdminOnly, TeacherOnly, get_current_user
-from ..database import get_db
-from ..services.analytics import calculate_percentage
+from ..database import ReadSession, get_db, get_read_db
+from ..services.analytics import calculate_percentage, trend_from_history
+from ..services.conditional import not_modified
+from ..services.pagination import PageParams, paginate
+from ..services.student_history import load_student_history
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
 
+def _list_students(db: Session, class_id: Optional[int], page: PageParams, response: Response):
+    query = db.query(models.Student)
+    if class_id is not None:
+        query = query.filter(models.Student.class_id == class_id)
+    return paginate(query, models.Student, page, response)
+
+
 @router.get("/", response_model=List[schemas.StudentOut])
-def list_students(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return db.query(models.Student).all()
+async def list_students(
+    request: Request,
+    response: Response,
+    class_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: ReadSession = Depends(get_read_db),
+    user=Depends(get_current_user),
+):
+    unchanged = await not_modified(request, response, db, ["students"])
+    if unchanged is not None:
+        return unchanged
+    return await db.run(_list_students, class_id, page, response)
 
 
 @router.post("/", response_model=schemas.StudentOut, dependencies=[Depends(TeacherOnly)])
@@ -32,12 +52,7 @@ def get_student(student_id: int, db: Session = Depends(get_db), user=Depends(get
     return student
 
 
-@router.get("/{student_id}/profile", response_model=schemas.StudentProfileResponse)
-def get_student_profile(student_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-
+def _profile_from_history(student: models.Student) -> dict:
     marks = []
     for mark in student.marks:
         percentage = calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks)
@@ -62,6 +77,25 @@ def get_student_profile(student_id: int, db: Session = Depends(get_db), user=Dep
     }
 
 
+def _load_history(db: Session, student_id: int) -> models.Student:
+    student = load_student_history(db, student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return student
+
+
+@router.get("/{student_id}/profile", response_model=schemas.StudentProfileResponse)
+def get_student_profile(student_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return _profile_from_history(_load_history(db, student_id))
+
+
+@router.get("/{student_id}/detail", response_model=schemas.StudentDetailResponse)
+def get_student_detail(student_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """Profile and trend for the student page, built from one history query."""
+    student = _load_history(db, student_id)
+    return {"profile": _profile_from_history(student), "trend": trend_from_history(student)}
+
+
 @router.put("/{student_id}", response_model=schemas.StudentOut, dependencies=[Depends(TeacherOnly)])
 def update_student(student_id: int, payload: schemas.StudentUpdate, db: Session = Depends(get_db)):
     student = db.query(models.Student).filter(models.Student.id == student_id).first()
@@ -1,17 +1,35 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..auth import TeacherOnly
-from ..database import get_db
+from ..database import ReadSession, get_db, get_read_db
+from ..services.conditional import not_modified
+from ..services.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/subjects", tags=["Subjects"])
 
 
+def _list_subjects(db: Session, class_id: Optional[int], page: PageParams, response: Response):
+    query = db.query(models.Subject)
+    if class_id is not None:
+        query = query.filter(models.Subject.class_id == class_id)
+    return paginate(query, models.Subject, page, response)
+
+
 @router.get("/", response_model=List[schemas.SubjectOut])
-def list_subjects(db: Session = Depends(get_db)):
-    return db.query(models.Subject).all()
+async def list_subjects(
+    request: Request,
+    response: Response,
+    class_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: ReadSession = Depends(get_read_db),
+):
+    unchanged = await not_modified(request, response, db, ["subjects"])
+    if unchanged is not None:
+        return unchanged
+    return await db.run(_list_subjects, class_id, page, response)
 
 
 @router.post("/", response_model=schemas.SubjectOut, dependencies=[Depends(TeacherOnly)])
@@ -120,6 +120,29 @@ class MarkOut(MarkBase):
         orm_mode = True
 
 
+class MarkBulkEntry(BaseModel):
+    student_id: int
+    # Optional when the whole request targets one assessment.
+    assessment_id: Optional[int] = None
+    marks_obtained: float
+
+
+class MarkBulkCreate(BaseModel):
+    assessment_id: Optional[int] = None
+    marks: List[MarkBulkEntry]
+
+
+class MarkBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class MarkBulkResult(BaseModel):
+    created: int
+    updated: int
+    errors: List[MarkBulkError]
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -145,6 +168,40 @@ class StudentTrendResponse(BaseModel):
     trend: List[StudentTrendPoint]
 
 
+class TrendPoint(BaseModel):
+    period: str
+    average: float
+    marks: int
+    moving_average: float
+
+
+class TrendSummary(BaseModel):
+    series: List[TrendPoint]
+    slope: float
+    delta: float
+    direction: str
+
+
+class SubjectTrend(TrendSummary):
+    subject_id: int
+    subject: str
+
+
+class StudentTrendSummary(TrendSummary):
+    student_id: int
+    student_name: str
+
+
+class ClassTrendsResponse(BaseModel):
+    class_id: int
+    period: str
+    window: int
+    periods: List[str]
+    overall: TrendSummary
+    subjects: List[SubjectTrend]
+    students: List[StudentTrendSummary]
+
+
 class SubjectSummary(BaseModel):
     subject: str
     average: float
@@ -168,6 +225,32 @@ class ClassOverviewResponse(BaseModel):
     top_students: List[TopStudent]
 
 
+class GradeShare(BaseModel):
+    grade: str
+    count: int
+    percentage: float
+
+
+class HistogramBin(BaseModel):
+    lower: float
+    count: int
+
+
+class GradeHistogram(BaseModel):
+    class_id: int
+    subject_id: Optional[int] = None
+    term: Optional[str] = None
+    bin_width: float
+    students: int
+    bins: List[HistogramBin]
+
+
+class ClassCohort(ClassOverviewResponse):
+    class_id: int
+    grades: List[GradeShare]
+    subjects: List[SubjectSummary]
+
+
 class DashboardSummary(BaseModel):
     total_students: int
     total_classes: int
@@ -178,6 +261,38 @@ class DashboardSummary(BaseModel):
     recent_assessments: List[str]
 
 
+class RankStanding(BaseModel):
+    average: float
+    rank: int
+    dense_rank: int
+    percentile: float
+    out_of: int
+
+
+class ClassRankingEntry(RankStanding):
+    student_id: int
+    student_name: str
+    position: int
+
+
+class TermRankStanding(RankStanding):
+    term: str
+
+
+class SubjectRankStanding(RankStanding):
+    subject_id: int
+    subject: str
+
+
+class StudentRankResponse(BaseModel):
+    student_id: int
+    student_name: str
+    class_id: Optional[int] = None
+    overall: Optional[RankStanding] = None
+    terms: List[TermRankStanding]
+    subjects: List[SubjectRankStanding]
+
+
 class StudentMarkDetail(BaseModel):
     assessment: str
     subject: str
@@ -194,3 +309,8 @@ class StudentProfileResponse(BaseModel):
     class_id: int
     class_name: Optional[str] = None
     marks: List[StudentMarkDetail]
+
+
+class StudentDetailResponse(BaseModel):
+    profile: StudentProfileResponse
+    trend: StudentTrendResponse
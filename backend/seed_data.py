@@ -1,60 +1,70 @@
 """Seed script to populate rich demo data into SQLite."""
 from __future__ import annotations
+import argparse
 import os
 import pathlib
 import sys
-from datetime import date
+import time
+from datetime import date, timedelta
 from random import Random
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 if __package__ in (None, ""):
     sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
     __package__ = "backend"
 
+from sqlalchemy import func, insert
+
 from .database import Base, SessionLocal, engine
+from .migrations import ensure_indexes
 from . import models
-from .auth import get_password_hash
+from .services import aggregates, conditional  # aggregates also keeps mark rollups in sync while seeding
+from .auth import get_password_hash, pwd_context
 
 
 DEFAULT_ADMIN_EMAIL = os.getenv("DEFAULT_ADMIN_EMAIL", "admin@gmail.com")
 DEFAULT_ADMIN_PASSWORD = os.getenv("DEFAULT_ADMIN_PASSWORD", "admin123")
 DEFAULT_ADMIN_NAME = os.getenv("DEFAULT_ADMIN_NAME", "Admin User")
 
-
-# Ensure tables exist before attempting to seed
-Base.metadata.create_all(bind=engine)
+SYNTHETIC_SUBJECTS = (
+    "Mathematics", "English", "Science", "History", "Geography", "Biology",
+    "Chemistry", "Physics", "Computer Science", "Economics", "Art", "Music",
+)
+SYNTHETIC_ASSESSMENTS = (("Quiz", 25), ("Assignment", 50), ("Exam", 100), ("Project", 50))
+SYNTHETIC_BATCH_SIZE = 100_000
+MARK_COLUMNS = ("id", "student_id", "assessment_id", "marks_obtained")
+TERM_ROLLUP_COLUMNS = ("student_id", "subject_id", "term", "percentage_sum", "mark_count", "pass_count")
+MONTH_ROLLUP_COLUMNS = ("student_id", "subject_id", "term", "month", "percentage_sum", "mark_count", "pass_count")
 
 
-def _create_users(db) -> models.User:
-    admin_user = models.User(
-        name=DEFAULT_ADMIN_NAME,
-        email=DEFAULT_ADMIN_EMAIL,
-        hashed_password=get_password_hash(DEFAULT_ADMIN_PASSWORD),
-        role="ADMIN",
-    )
-    db.add(admin_user)
-    db.commit()
-    db.refresh(admin_user)
-    return admin_user
+def _password_current(password: str, hashed_password: str) -> bool:
+    try:
+        verified, replacement = pwd_context.verify_and_update(password, hashed_password)
+    except ValueError:
+        # Not a hash this context recognises.
+        return False
+    return verified and replacement is None
 
 
 def ensure_default_admin(db):
     """Create or refresh the default admin account for quick logins."""
     default_admin = db.query(models.User).filter(models.User.email == DEFAULT_ADMIN_EMAIL).first()
-    hashed_password = get_password_hash(DEFAULT_ADMIN_PASSWORD)
 
     if default_admin:
         default_admin.role = "ADMIN"
         default_admin.name = default_admin.name or DEFAULT_ADMIN_NAME
-        default_admin.hashed_password = hashed_password
-        db.commit()
-        db.refresh(default_admin)
+        # Only hash again when the password changed or the hash scheme is outdated.
+        if not _password_current(DEFAULT_ADMIN_PASSWORD, default_admin.hashed_password):
+            default_admin.hashed_password = get_password_hash(DEFAULT_ADMIN_PASSWORD)
+        if db.is_modified(default_admin):
+            db.commit()
+            db.refresh(default_admin)
         return default_admin
 
     admin_user = models.User(
         name=DEFAULT_ADMIN_NAME,
         email=DEFAULT_ADMIN_EMAIL,
-        hashed_password=hashed_password,
+        hashed_password=get_password_hash(DEFAULT_ADMIN_PASSWORD),
         role="ADMIN",
     )
     db.add(admin_user)
@@ -174,12 +184,13 @@ def _create_marks(db, students: List[models.Student], assessments: List[models.A
     assessments_by_subject: Dict[int, List[models.Assessment]] = {}
     for assessment in assessments:
         assessments_by_subject.setdefault(assessment.subject_id, []).append(assessment)
+    subjects_by_class: Dict[int, List[models.Subject]] = {}
+    for subject in db.query(models.Subject).order_by(models.Subject.id):
+        subjects_by_class.setdefault(subject.class_id, []).append(subject)
 
     marks: List[models.Mark] = []
     for student in students:
-        # Determine subjects for the student's class
-        class_subjects = [s for s in db.query(models.Subject).filter(models.Subject.class_id == student.class_id).all()]
-        for subject in class_subjects:
+        for subject in subjects_by_class.get(student.class_id, []):
             for assessment in assessments_by_subject.get(subject.id, []):
                 base_pct = rng.randint(55, 95) if student.roll_number.endswith("1") else rng.randint(45, 90)
                 adjustment = rng.randint(-8, 8)
@@ -192,6 +203,198 @@ def _create_marks(db, students: List[models.Student], assessments: List[models.A
     return marks
 
 
+def _next_id(db, model) -> int:
+    return (db.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _insert(db, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), SYNTHETIC_BATCH_SIZE):
+        db.execute(insert(table), rows[start : start + SYNTHETIC_BATCH_SIZE])
+
+
+def _insert_tuples(db, table, columns: Tuple[str, ...], rows: List[tuple]) -> None:
+    """Insert plain int/float/str tuples with the driver's ``executemany``.
+
+    Skips SQLAlchemy's per-row parameter processing, which costs more than the
+    insert itself at millions of rows; only use it for columns needing no type
+    conversion.
+    """
+    if not rows:
+        return
+    compiled = insert(table).compile(dialect=db.get_bind().dialect, column_keys=list(columns))
+    if compiled.positional:
+        order = [columns.index(name) for name in compiled.positiontup]
+        if order != list(range(len(columns))):
+            rows = [tuple(row[idx] for idx in order) for row in rows]
+    else:
+        rows = [dict(zip(columns, row)) for row in rows]
+    db.connection().exec_driver_sql(str(compiled), rows)
+
+
+def generate(
+    db,
+    classes: int = 100,
+    students_per_class: int = 40,
+    subjects_per_class: int = 8,
+    assessments_per_term: int = 3,
+    terms: int = 3,
+    years: int = 1,
+    seed: int = 7,
+    start_year: int = 2024,
+) -> Dict[str, int]:
+    """Bulk-insert a synthetic school with its rollups; returns row counts.
+
+    Rows are written with Core ``executemany`` inserts and explicit ids, so nothing
+    is read back while generating, and the rollups are summed from the generated
+    scores instead of re-reading the marks. The same arguments on an empty
+    database always produce the same rows.
+    """
+    import numpy as np
+
+    from .services.analytics import PASS_PERCENTAGE
+    from .services.stats_kernel import percentages
+
+    rng = np.random.default_rng(seed)
+    class_start, student_start, subject_start, assessment_start, mark_start = (
+        _next_id(db, model) for model in (models.Class, models.Student, models.Subject, models.Assessment, models.Mark)
+    )
+
+    # One subject's assessments: every term of every year, in date order.
+    schedule = []
+    for year in range(start_year, start_year + years):
+        for term in range(terms):
+            label = f"Term {term + 1}" if years == 1 else f"{year} Term {term + 1}"
+            for k in range(assessments_per_term):
+                kind, maximum_marks = SYNTHETIC_ASSESSMENTS[k % len(SYNTHETIC_ASSESSMENTS)]
+                # Spread each term's assessments evenly through its share of the year.
+                offset = int((term + (k + 1) / (assessments_per_term + 1)) * 365 / terms)
+                day = date(year, 1, 1) + timedelta(days=offset)
+                schedule.append((len(schedule) // assessments_per_term, label, kind, k, maximum_marks, day))
+    per_subject = len(schedule)
+    period = np.array([entry[0] for entry in schedule])
+    maximum = np.array([entry[4] for entry in schedule], dtype=np.float64)
+    terms_of = [schedule[idx * assessments_per_term][1] for idx in range(per_subject // assessments_per_term)]
+    month_of = [(entry[0], entry[5].strftime("%Y-%m")) for entry in schedule]
+    months = sorted(set(month_of))
+    # in_month[a, m] is 1 when assessment a falls in months[m]; scores @ in_month sums per month.
+    in_month = np.array([[key == month for month in months] for key in month_of], dtype=np.int64)
+
+    _insert(db, models.Class.__table__, [{"id": class_start + c, "name": f"Class {c + 1:04d}"} for c in range(classes)])
+    _insert(
+        db,
+        models.Student.__table__,
+        [
+            {
+                "id": student_start + n,
+                "name": f"Student {n + 1:06d}",
+                "roll_number": f"GEN-{student_start + n}",
+                "class_id": class_start + n // students_per_class,
+            }
+            for n in range(classes * students_per_class)
+        ],
+    )
+    _insert(
+        db,
+        models.Subject.__table__,
+        [
+            {
+                "id": subject_start + n,
+                "name": SYNTHETIC_SUBJECTS[n % subjects_per_class % len(SYNTHETIC_SUBJECTS)],
+                "code": f"GEN{subject_start + n}",
+                "class_id": class_start + n // subjects_per_class,
+            }
+            for n in range(classes * subjects_per_class)
+        ],
+    )
+    _insert(
+        db,
+        models.Assessment.__table__,
+        [
+            {
+                "id": assessment_start + n * per_subject + idx,
+                "name": f"{kind} {k + 1}",
+                "type": kind,
+                "maximum_marks": maximum_marks,
+                "term": label,
+                "subject_id": subject_start + n,
+                "date": day,
+            }
+            for n in range(classes * subjects_per_class)
+            for idx, (_, label, kind, k, maximum_marks, day) in enumerate(schedule)
+        ],
+    )
+
+    shape = (students_per_class, subjects_per_class, per_subject)
+    month_counts = in_month.sum(0).tolist()
+    marks, term_rollups, month_rollups = [], [], []
+    for c in range(classes):
+        ability = rng.normal(65, 12, students_per_class)
+        # Each period is a little harder or easier for each student, so trends have a direction.
+        drift = rng.normal(0, 1.5, students_per_class)
+        subject_bias = rng.normal(0, 6, shape[:2])
+        noise = rng.normal(0, 8, shape)
+        percentage = np.clip(
+            ability[:, None, None] + subject_bias[:, :, None] + drift[:, None, None] * period + noise, 0, 100
+        )
+        scores = np.round(percentage / 100 * maximum * 2) / 2
+
+        student_ids = (student_start + c * students_per_class + np.arange(students_per_class)).tolist()
+        subject_ids = (subject_start + c * subjects_per_class + np.arange(subjects_per_class)).tolist()
+        first_assessment = assessment_start + c * subjects_per_class * per_subject
+        marks += zip(
+            range(mark_start + c * scores.size, mark_start + (c + 1) * scores.size),
+            np.repeat(student_ids, subjects_per_class * per_subject).tolist(),
+            np.tile(first_assessment + np.arange(subjects_per_class * per_subject), students_per_class).tolist(),
+            scores.ravel().tolist(),
+        )
+
+        # Rollups with the same per-mark rounding as services.aggregates.
+        mark_percentages = percentages(scores.ravel(), np.tile(maximum, scores.size // per_subject)).reshape(shape)
+        hundredths = np.rint(mark_percentages * 100).astype(np.int64)
+        passed = (mark_percentages >= PASS_PERCENTAGE).astype(np.int64)
+        per_term = (*shape[:2], -1, assessments_per_term)
+        term_sums = hundredths.reshape(per_term).sum(-1).tolist()
+        term_passes = passed.reshape(per_term).sum(-1).tolist()
+        month_sums = (hundredths @ in_month).tolist()
+        month_passes = (passed @ in_month).tolist()
+        for s, student_id in enumerate(student_ids):
+            for j, subject_id in enumerate(subject_ids):
+                term_rollups += [
+                    (student_id, subject_id, label, total, assessments_per_term, passes)
+                    for label, total, passes in zip(terms_of, term_sums[s][j], term_passes[s][j])
+                ]
+                month_rollups += [
+                    (student_id, subject_id, terms_of[t], month, total, count, passes)
+                    for (t, month), total, count, passes in zip(
+                        months, month_sums[s][j], month_counts, month_passes[s][j]
+                    )
+                ]
+        if len(marks) >= SYNTHETIC_BATCH_SIZE or c == classes - 1:
+            _insert_tuples(db, models.Mark.__table__, MARK_COLUMNS, marks)
+            _insert_tuples(db, models.StudentSubjectTermAggregate.__table__, TERM_ROLLUP_COLUMNS, term_rollups)
+            _insert_tuples(db, models.StudentSubjectMonthAggregate.__table__, MONTH_ROLLUP_COLUMNS, month_rollups)
+            marks, term_rollups, month_rollups = [], [], []
+
+    aggregates.mark_rebuilt(db)
+    conditional.bump(db, conditional.ALL_TABLES)
+    db.commit()
+    return {
+        "classes": classes,
+        "students": classes * students_per_class,
+        "subjects": classes * subjects_per_class,
+        "assessments": classes * subjects_per_class * per_subject,
+        "marks": classes * students_per_class * subjects_per_class * per_subject,
+    }
+
+
+def _has_data(db) -> bool:
+    """Whether any school rows, or any account besides the default admin, exist."""
+    if db.query(models.User.id).filter(models.User.email != DEFAULT_ADMIN_EMAIL).first() is not None:
+        return True
+    school = (models.Class, models.Subject, models.Assessment, models.Student, models.Mark)
+    return any(db.query(model.id).first() is not None for model in school)
+
+
 def seed(reset: bool = False):
     """Populate the SQLite database with rich demo data.
 
@@ -201,31 +404,21 @@ def seed(reset: bool = False):
 
     if reset:
         Base.metadata.drop_all(bind=engine)
-        Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
 
     db = SessionLocal()
     try:
-        if not reset and db.query(models.User).count() > 0:
+        # Only an empty database is seeded; existing rows are never deleted.
+        if not reset and _has_data(db):
             ensure_default_admin(db)
             return
 
-        # Clean existing rows when not doing a full drop to avoid duplicates
-        if not reset:
-            db.query(models.Mark).delete()
-            db.query(models.Assessment).delete()
-            db.query(models.Subject).delete()
-            db.query(models.Student).delete()
-            db.query(models.Class).delete()
-            db.query(models.User).delete()
-            db.commit()
-
-        admin_user = _create_users(db)
+        admin_user = ensure_default_admin(db)
         classes = _create_classes(db, admin_user)
         students = _create_students(db, classes)
         subjects = _create_subjects(db, classes)
         assessments = _create_assessments(db, subjects)
         _create_marks(db, students, assessments)
-        ensure_default_admin(db)
     finally:
         db.close()
 
@@ -235,6 +428,49 @@ def ensure_seed_data():
     seed(reset=False)
 
 
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Seed demo data, or generate a large synthetic school.")
+    parser.add_argument("--synthetic", action="store_true", help="generate synthetic data instead of the demo set")
+    parser.add_argument("--classes", type=int, default=100)
+    parser.add_argument("--students-per-class", type=int, default=40)
+    parser.add_argument("--subjects-per-class", type=int, default=8)
+    parser.add_argument("--assessments-per-term", type=int, default=3)
+    parser.add_argument("--terms", type=int, default=3)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="add to the existing data instead of starting over")
+    args = parser.parse_args(argv)
+
+    if not args.synthetic:
+        seed(reset=True)
+        print("Demo database seeded with sample data.")
+        return
+
+    if not args.keep:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    marks_indexes = list(models.Mark.__table__.indexes)
+    if not args.keep:
+        # Filling an unindexed table and indexing once afterwards is faster.
+        for index in marks_indexes:
+            index.drop(bind=engine)
+    with SessionLocal() as db:
+        ensure_default_admin(db)
+        started = time.perf_counter()
+        counts = generate(
+            db,
+            classes=args.classes,
+            students_per_class=args.students_per_class,
+            subjects_per_class=args.subjects_per_class,
+            assessments_per_term=args.assessments_per_term,
+            terms=args.terms,
+            years=args.years,
+            seed=args.seed,
+        )
+        ensure_indexes(engine)
+    summary = ", ".join(f"{count:,} {name}" for name, count in counts.items())
+    print(f"Generated {summary} in {time.perf_counter() - started:.1f}s.")
+
+
 if __name__ == "__main__":
-    seed(reset=True)
-    print("Demo database seeded with sample data.")
+    main()
@@ -0,0 +1,3 @@
+# Importing these modules registers the session hooks that keep rollups and
+# table versions current for every writer, not just the routers.
+from . import aggregates, conditional  # noqa: F401
@@ -0,0 +1,221 @@
+"""Maintain per-student/subject/term (and month) rollups of mark percentages.
+
+The rollup rows in ``student_subject_term_aggregates`` and
+``student_subject_month_aggregates`` are rewritten for every student touched by
+a flush, inside the same transaction as the write itself, so routers (and
+anything else using the ORM) keep them current without extra code. Bulk inserts
+that bypass the unit of work should call :func:`refresh_students`.
+
+Other caches derived from marks can subscribe with :func:`on_students_changed`
+(or :func:`on_classes_changed` for per-class figures); listeners run after the
+transaction that touched those students commits.
+"""
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .analytics import PASS_PERCENTAGE, calculate_percentage, percentage_hundredths
+
+Totals = Tuple[int, int, int]
+
+_ROLLUP = models.StudentSubjectTermAggregate.__table__
+_MONTH_ROLLUP = models.StudentSubjectMonthAggregate.__table__
+# Bulk deletes of these tables can orphan or invalidate rollup rows.
+_SOURCE_MODELS = (models.Mark, models.Assessment, models.Subject, models.Student, models.Class)
+_CHANGED_STUDENTS = "aggregates.changed_students"
+_CHANGED_CLASSES = "aggregates.changed_classes"
+_REBUILT = "aggregates.rebuilt"
+
+# Called with the set of changed student ids, or ``None`` after a full rebuild.
+StudentsChangedListener = Callable[[Optional[Set[int]]], None]
+_listeners: List[StudentsChangedListener] = []
+# Same contract, called with the classes those students belong to.
+_class_listeners: List[StudentsChangedListener] = []
+
+
+def on_students_changed(listener: StudentsChangedListener) -> StudentsChangedListener:
+    """Register ``listener`` to run after commits that changed students' marks."""
+    _listeners.append(listener)
+    return listener
+
+
+def on_classes_changed(listener: StudentsChangedListener) -> StudentsChangedListener:
+    """Register ``listener`` to run after commits that changed marks in a class."""
+    _class_listeners.append(listener)
+    return listener
+
+
+def percentage_totals(db, keys, *criteria) -> Dict[tuple, Totals]:
+    """Sum mark percentages per ``keys`` with a single grouped statement.
+
+    Returns ``{key_tuple: (percentage_sum, mark_count, pass_count)}`` with the sum in
+    hundredths. Marks are grouped by ``(*keys, marks_obtained, maximum_marks)`` so
+    each distinct score goes through :func:`calculate_percentage` once, keeping the
+    per-mark rounding identical to walking the ORM objects one by one.
+    """
+    stmt = (
+        select(*keys, models.Mark.marks_obtained, models.Assessment.maximum_marks, func.count(models.Mark.id))
+        .join(models.Assessment, models.Mark.assessment_id == models.Assessment.id)
+        .where(*criteria)
+        .group_by(*keys, models.Mark.marks_obtained, models.Assessment.maximum_marks)
+    )
+    totals: Dict[tuple, Totals] = {}
+    for row in db.execute(stmt):
+        key, (obtained, maximum, count) = tuple(row[: len(keys)]), row[len(keys):]
+        percentage = calculate_percentage(obtained, maximum)
+        total, mark_count, pass_count = totals.get(key, (0, 0, 0))
+        totals[key] = (
+            total + percentage_hundredths(percentage) * count,
+            mark_count + count,
+            pass_count + (count if percentage >= PASS_PERCENTAGE else 0),
+        )
+    return totals
+
+
+def _write_rollups(db, *criteria) -> None:
+    totals = percentage_totals(
+        db,
+        (models.Mark.student_id, models.Assessment.subject_id, models.Assessment.term, models.Assessment.date),
+        *criteria,
+    )
+    by_term: Dict[tuple, Totals] = {}
+    by_month: Dict[tuple, Totals] = {}
+    for (student_id, subject_id, term, day), values in totals.items():
+        if student_id is None or subject_id is None:
+            continue
+        month = day.strftime("%Y-%m") if day is not None else None
+        for rollup, key in ((by_term, (student_id, subject_id, term)), (by_month, (student_id, subject_id, term, month))):
+            rollup[key] = tuple(a + b for a, b in zip(rollup.get(key, (0, 0, 0)), values))
+    if by_term:
+        db.execute(insert(_ROLLUP), [_rollup_row(("student_id", "subject_id", "term"), *item) for item in by_term.items()])
+        db.execute(
+            insert(_MONTH_ROLLUP),
+            [_rollup_row(("student_id", "subject_id", "term", "month"), *item) for item in by_month.items()],
+        )
+
+
+def _rollup_row(names: Tuple[str, ...], key: tuple, totals: Totals) -> dict:
+    total, mark_count, pass_count = totals
+    return dict(zip(names, key), percentage_sum=total, mark_count=mark_count, pass_count=pass_count)
+
+
+def refresh_students(db, student_ids: Iterable[int]) -> None:
+    """Recompute the rollup rows of the given students from their marks."""
+    ids = {student_id for student_id in student_ids if student_id is not None}
+    if not ids:
+        return
+    db.info.setdefault(_CHANGED_STUDENTS, set()).update(ids)
+    db.info.setdefault(_CHANGED_CLASSES, set()).update(
+        class_id
+        for class_id in db.execute(
+            select(models.Student.class_id).where(models.Student.id.in_(ids)).distinct()
+        ).scalars()
+        if class_id is not None
+    )
+    db.execute(delete(_ROLLUP).where(_ROLLUP.c.student_id.in_(ids)))
+    db.execute(delete(_MONTH_ROLLUP).where(_MONTH_ROLLUP.c.student_id.in_(ids)))
+    _write_rollups(db, models.Mark.student_id.in_(ids))
+
+
+def rebuild(db) -> None:
+    """Recompute every rollup row from scratch."""
+    mark_rebuilt(db)
+    db.execute(delete(_ROLLUP))
+    db.execute(delete(_MONTH_ROLLUP))
+    _write_rollups(db)
+
+
+def mark_rebuilt(db) -> None:
+    """Record that rollups were written wholesale (e.g. by a bulk loader) in this transaction.
+
+    Listeners are told after the commit, exactly as after :func:`rebuild`.
+    """
+    db.info[_REBUILT] = True
+
+
+def ensure_aggregates(db: Session) -> None:
+    """Backfill rollups for databases created before the table existed."""
+    has_rollups = all(db.execute(select(table.c.id).limit(1)).first() for table in (_ROLLUP, _MONTH_ROLLUP))
+    has_marks = db.execute(select(models.Mark.id).limit(1)).first()
+    if has_marks and not has_rollups:
+        rebuild(db)
+        db.commit()
+
+
+def _changed(obj, *attributes: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, "before_flush")
+def _drop_rollups_before_delete(session: Session, flush_context, instances) -> None:
+    # Rollups reference students and subjects, so their rows must go before the
+    # flush deletes the parents on databases that enforce foreign keys.
+    students = {obj.id for obj in session.deleted if isinstance(obj, models.Student)}
+    subjects = {obj.id for obj in session.deleted if isinstance(obj, models.Subject)}
+    for table in (_ROLLUP, _MONTH_ROLLUP):
+        if students:
+            session.execute(delete(table).where(table.c.student_id.in_(students)))
+        if subjects:
+            session.execute(delete(table).where(table.c.subject_id.in_(subjects)))
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_after_flush(session: Session, flush_context) -> None:
+    student_ids = set()
+    assessment_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, models.Mark):
+            student_ids.add(obj.student_id)
+            student_ids.update(inspect(obj).attrs.student_id.history.deleted)
+        elif isinstance(obj, models.Assessment) and obj in session.dirty:
+            if _changed(obj, "maximum_marks", "term", "subject_id", "date"):
+                assessment_ids.add(obj.id)
+        elif isinstance(obj, models.Student) and obj in session.deleted:
+            student_ids.add(obj.id)
+    if assessment_ids:
+        student_ids.update(
+            session.execute(
+                select(models.Mark.student_id).where(models.Mark.assessment_id.in_(assessment_ids)).distinct()
+            ).scalars()
+        )
+    refresh_students(session, student_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _rebuild_after_bulk_delete(orm_execute_state):
+    mapper = orm_execute_state.bind_mapper
+    if orm_execute_state.is_delete and mapper is not None and issubclass(mapper.class_, _SOURCE_MODELS):
+        session = orm_execute_state.session
+        # Clear the rollups first so deleting students or subjects cannot trip their foreign keys.
+        mark_rebuilt(session)
+        session.execute(delete(_ROLLUP))
+        session.execute(delete(_MONTH_ROLLUP))
+        result = orm_execute_state.invoke_statement()
+        _write_rollups(session)
+        return result
+    return None
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session) -> None:
+    students = session.info.pop(_CHANGED_STUDENTS, None)
+    classes = session.info.pop(_CHANGED_CLASSES, None)
+    if session.info.pop(_REBUILT, False):
+        students = classes = None
+    elif not students:
+        return
+    for listener in _listeners:
+        listener(students)
+    for listener in _class_listeners:
+        listener(classes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_STUDENTS, None)
+    session.info.pop(_CHANGED_CLASSES, None)
+    session.info.pop(_REBUILT, None)
@@ -1,31 +1,95 @@
-from typing import List
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, func, select, true
 from sqlalchemy.orm import Session
 
 from .. import models
+from .student_history import load_student_history
+
+
+PASS_PERCENTAGE = 40
+# Lower bound of each grade above "E"; GRADE_LABELS[i] covers [BOUNDARIES[i-1], BOUNDARIES[i]).
+GRADE_BOUNDARIES = (40, 55, 70, 85)
+GRADE_LABELS = ("E", "D", "C", "B", "A")
 
 
 def calculate_percentage(mark: float, maximum: float) -> float:
     return round((mark / maximum) * 100, 2) if maximum else 0.0
 
 
+def percentage_hundredths(percentage: float) -> int:
+    return int(round(percentage * 100))
+
+
+def mean_percentage(percentages: Iterable[float]) -> float:
+    """Average percentages as the app always has: a float sum in the given order, rounded."""
+    values = list(percentages)
+    return round(sum(values) / len(values), 2) if values else 0
+
+
+def _on_half_hundredth(total: int, count: int) -> bool:
+    """Whether ``total`` hundredths over ``count`` marks averages to exactly x.xx5."""
+    return (2 * total) % count == 0 and (2 * total // count) % 2 == 1
+
+
+def rollup_means(db: Session, totals: Dict, mark_key, order_by, *criteria) -> Dict:
+    """Average percentage per group from rollup ``(total, count)`` sums.
+
+    ``round(total / (count * 100), 2)`` equals the float ``mean_percentage`` of the
+    group's marks except when the mean sits exactly on a half hundredth; there the
+    float sum's last bit picks the direction. Those rare groups are re-read from
+    ``marks`` (grouped by ``mark_key``, restricted by ``criteria``) in ``order_by``
+    order, the order the per-object code summed them in.
+    """
+    means = {}
+    ties = []
+    for group, (total, count) in totals.items():
+        if not count:
+            continue
+        if _on_half_hundredth(total, count):
+            ties.append(group)
+        else:
+            means[group] = round(total / (count * 100), 2)
+    if ties:
+        percentages: Dict = {}
+        for group, obtained, maximum in db.execute(
+            select(mark_key, models.Mark.marks_obtained, models.Assessment.maximum_marks)
+            .join(models.Assessment, models.Mark.assessment_id == models.Assessment.id)
+            .where(mark_key.in_(ties), *criteria)
+            .order_by(*order_by)
+        ):
+            percentages.setdefault(group, []).append(calculate_percentage(obtained, maximum))
+        for group in ties:
+            means[group] = mean_percentage(percentages.get(group, []))
+    return means
+
+
+# Orders the per-object code read marks in: a student's by id, a subject's by assessment.
+STUDENT_MARK_ORDER = (models.Mark.id,)
+SUBJECT_MARK_ORDER = (models.Assessment.id, models.Mark.id)
+
+
 def grade_from_percentage(pct: float) -> str:
-    if pct >= 85:
-        return "A"
-    if pct >= 70:
-        return "B"
-    if pct >= 55:
-        return "C"
-    if pct >= 40:
-        return "D"
-    return "E"
+    return GRADE_LABELS[bisect_right(GRADE_BOUNDARIES, pct)]
 
 
 def student_trend(db: Session, student_id: int):
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    student = load_student_history(db, student_id)
     if not student:
         return None
+    return trend_from_history(student)
+
+
+def trend_from_history(student: models.Student) -> dict:
+    """Build the trend payload from a student loaded by ``load_student_history``."""
     trend = []
-    for mark in student.marks:
+    # Chronological order; undated assessments go last.
+    marks = sorted(
+        student.marks,
+        key=lambda mark: (mark.assessment.date is None, mark.assessment.date or date.min, mark.assessment.id),
+    )
+    for mark in marks:
         maximum = mark.assessment.maximum_marks
         percentage = calculate_percentage(mark.marks_obtained, maximum)
         trend.append({
@@ -36,39 +100,71 @@ def student_trend(db: Session, student_id: int):
     return {"student_id": student.id, "student_name": student.name, "trend": trend}
 
 
+def _rollup_averages(db: Session, key, mark_key, order_by, *criteria) -> Dict[int, float]:
+    """Average percentage per ``key`` read from the maintained rollup table."""
+    rollup = models.StudentSubjectTermAggregate
+    rows = (
+        db.query(key, func.sum(rollup.percentage_sum), func.sum(rollup.mark_count))
+        .filter(*criteria)
+        .group_by(key)
+        .all()
+    )
+    return rollup_means(db, {group: (total, count) for group, total, count in rows}, mark_key, order_by)
+
+
+def _class_student_averages(db: Session, class_id: int) -> Dict[int, float]:
+    rollup = models.StudentSubjectTermAggregate
+    class_students = select(models.Student.id).where(models.Student.class_id == class_id)
+    return _rollup_averages(
+        db, rollup.student_id, models.Mark.student_id, STUDENT_MARK_ORDER, rollup.student_id.in_(class_students)
+    )
+
+
 def class_subject_summary(db: Session, class_id: int):
-    subjects = db.query(models.Subject).filter(models.Subject.class_id == class_id).all()
-    results = []
-    for subject in subjects:
-        marks = [m for a in subject.assessments for m in a.marks]
-        if marks:
-            averages = [calculate_percentage(m.marks_obtained, m.assessment.maximum_marks) for m in marks]
-            avg = round(sum(averages) / len(averages), 2)
-            results.append({"subject": subject.name, "average": avg})
-    return results
+    subjects = (
+        db.query(models.Subject.id, models.Subject.name)
+        .filter(models.Subject.class_id == class_id)
+        .order_by(models.Subject.id)
+        .all()
+    )
+    rollup = models.StudentSubjectTermAggregate
+    class_subjects = select(models.Subject.id).where(models.Subject.class_id == class_id)
+    averages = _rollup_averages(
+        db, rollup.subject_id, models.Assessment.subject_id, SUBJECT_MARK_ORDER, rollup.subject_id.in_(class_subjects)
+    )
+    return [
+        {"subject": name, "average": averages[subject_id]} for subject_id, name in subjects if subject_id in averages
+    ]
 
 
 def class_overview(db: Session, class_id: int):
-    students = db.query(models.Student).filter(models.Student.class_id == class_id).all()
+    students = (
+        db.query(models.Student.id, models.Student.name, models.Class.name)
+        .outerjoin(models.Class, models.Student.class_id == models.Class.id)
+        .filter(models.Student.class_id == class_id)
+        .order_by(models.Student.id)
+        .all()
+    )
     if not students:
         return None
-    averages = []
-    top_students: List[dict] = []
-    for student in students:
-        percentages = [
-            calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks) for mark in student.marks
-        ]
-        avg = round(sum(percentages) / len(percentages), 2) if percentages else 0
-        averages.append(avg)
-        top_students.append({"student_name": student.name, "average": avg})
-    average = round(sum(averages) / len(averages), 2) if averages else 0
+    student_averages = _class_student_averages(db, class_id)
+    return _overview_payload(
+        students[0][2], [(student_name, student_averages.get(student_id, 0)) for student_id, student_name, _ in students]
+    )
+
+
+def _overview_payload(class_name: str, students: List[Tuple[str, float]]) -> dict:
+    """Overview of a class from ``(student_name, average)`` pairs; students without marks count as 0."""
+    averages = [avg for _, avg in students]
+    average = mean_percentage(averages)
     minimum = min(averages) if averages else 0
     maximum = max(averages) if averages else 0
-    pass_rate = round(len([a for a in averages if a >= 40]) / len(averages) * 100, 2) if averages else 0
+    pass_rate = round(len([a for a in averages if a >= PASS_PERCENTAGE]) / len(averages) * 100, 2) if averages else 0
+    top_students = [{"student_name": name, "average": avg} for name, avg in students]
     top_students_sorted = sorted(top_students, key=lambda x: x["average"], reverse=True)[:5]
     return {
         "overview": {
-            "class_name": students[0].class_obj.name,
+            "class_name": class_name,
             "average": average,
             "minimum": minimum,
             "maximum": maximum,
@@ -79,15 +175,13 @@ def class_overview(db: Session, class_id: int):
 
 
 def class_grade_distribution(db: Session, class_id: int):
-    students = db.query(models.Student).filter(models.Student.class_id == class_id).all()
+    return _grade_distribution(_class_student_averages(db, class_id).values())
+
+
+def _grade_distribution(averages: Iterable[float]) -> List[dict]:
     distribution = {"A": 0, "B": 0, "C": 0, "D": 0, "E": 0}
-    for student in students:
-        percentages = [
-            calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks) for mark in student.marks
-        ]
-        if not percentages:
-            continue
-        grade = grade_from_percentage(round(sum(percentages) / len(percentages), 2))
+    for avg in averages:
+        grade = grade_from_percentage(avg)
         distribution[grade] = distribution.get(grade, 0) + 1
 
     total = sum(distribution.values()) or 1
@@ -97,16 +191,109 @@ def class_grade_distribution(db: Session, class_id: int):
     ]
 
 
+def school_cohorts(db: Session, term: Optional[str] = None, subject_code: Optional[str] = None) -> List[dict]:
+    """Overview, grade distribution and subject averages for every class in one statement.
+
+    Every student is outer-joined to their rollups (restricted to ``term`` and
+    subjects with ``subject_code``), so students without matching marks still
+    count, exactly as the per-class endpoints report them. Classes without
+    students are left out, as ``class_overview`` has nothing to report for them.
+    """
+    rollup = models.StudentSubjectTermAggregate
+    join_on = [rollup.student_id == models.Student.id]
+    mark_criteria = []
+    if term is not None:
+        join_on.append(rollup.term == term)
+        mark_criteria.append(models.Assessment.term == term)
+    if subject_code is not None:
+        coded = select(models.Subject.id).where(models.Subject.code == subject_code)
+        join_on.append(rollup.subject_id.in_(coded))
+        mark_criteria.append(models.Assessment.subject_id.in_(coded))
+    rows = db.execute(
+        select(
+            models.Student.class_id,
+            models.Class.name,
+            models.Student.id,
+            models.Student.name,
+            models.Subject.id,
+            models.Subject.name,
+            func.sum(rollup.percentage_sum),
+            func.sum(rollup.mark_count),
+        )
+        .join(models.Class, models.Class.id == models.Student.class_id)
+        .outerjoin(rollup, and_(*join_on))
+        .outerjoin(models.Subject, models.Subject.id == rollup.subject_id)
+        .group_by(models.Student.class_id, models.Student.id, models.Subject.id)
+        .order_by(models.Student.class_id, models.Student.id, models.Subject.id)
+    ).all()
+
+    cohorts: Dict[int, dict] = {}
+    for class_id, class_name, student_id, student_name, subject_id, subject_name, total, count in rows:
+        cohort = cohorts.setdefault(class_id, {"class_name": class_name, "students": {}, "subjects": {}})
+        student = cohort["students"].setdefault(student_id, [student_name, 0, 0])
+        if subject_id is None or not count:
+            continue
+        student[1] += total
+        student[2] += count
+        subject = cohort["subjects"].setdefault(subject_id, [subject_name, 0, 0])
+        subject[1] += total
+        subject[2] += count
+
+    student_means = rollup_means(
+        db,
+        {key: (total, count) for cohort in cohorts.values() for key, (_, total, count) in cohort["students"].items()},
+        models.Mark.student_id,
+        STUDENT_MARK_ORDER,
+        *mark_criteria,
+    )
+    subject_means = rollup_means(
+        db,
+        {key: (total, count) for cohort in cohorts.values() for key, (_, total, count) in cohort["subjects"].items()},
+        models.Assessment.subject_id,
+        SUBJECT_MARK_ORDER,
+        *mark_criteria,
+    )
+
+    result = []
+    for class_id, cohort in cohorts.items():
+        students = [(name, student_means.get(key, 0)) for key, (name, _, _) in cohort["students"].items()]
+        with_marks = [student_means[key] for key in cohort["students"] if key in student_means]
+        result.append(
+            {
+                "class_id": class_id,
+                **_overview_payload(cohort["class_name"], students),
+                "grades": _grade_distribution(with_marks),
+                "subjects": [
+                    {"subject": name, "average": subject_means[key]} for key, (name, _, _) in cohort["subjects"].items()
+                ],
+            }
+        )
+    return result
+
+
 def dashboard_summary(db: Session):
-    total_students = db.query(models.Student).count()
-    total_classes = db.query(models.Class).count()
-    total_subjects = db.query(models.Subject).count()
-    total_assessments = db.query(models.Assessment).count()
-
-    marks = db.query(models.Mark).all()
-    percentages = [calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks) for mark in marks]
-    average_score = round(sum(percentages) / len(percentages), 2) if percentages else 0.0
-    pass_rate = round(len([p for p in percentages if p >= 40]) / len(percentages) * 100, 2) if percentages else 0.0
+    rollup = models.StudentSubjectTermAggregate
+    mark_totals = select(
+        func.coalesce(func.sum(rollup.percentage_sum), 0).label("percentage_sum"),
+        func.coalesce(func.sum(rollup.mark_count), 0).label("mark_count"),
+        func.coalesce(func.sum(rollup.pass_count), 0).label("pass_count"),
+    ).subquery()
+    totals = db.execute(
+        select(
+            select(func.count(models.Student.id)).scalar_subquery(),
+            select(func.count(models.Class.id)).scalar_subquery(),
+            select(func.count(models.Subject.id)).scalar_subquery(),
+            select(func.count(models.Assessment.id)).scalar_subquery(),
+            mark_totals.c.percentage_sum,
+            mark_totals.c.mark_count,
+            mark_totals.c.pass_count,
+        )
+    ).one()
+    total_students, total_classes, total_subjects, total_assessments, percentage_sum, mark_count, pass_count = totals
+    average_score = (
+        rollup_means(db, {True: (percentage_sum, mark_count)}, true(), STUDENT_MARK_ORDER)[True] if mark_count else 0.0
+    )
+    pass_rate = round(pass_count / mark_count * 100, 2) if mark_count else 0.0
 
     recent_assessments = (
         db.query(models.Assessment)
@@ -0,0 +1,208 @@
+"""TTL/LRU cache for analytics results with write-driven invalidation.
+
+Entries are keyed by function, arguments and a generation counter for the
+scope they depend on: one counter per class for the class endpoints and one for
+the school-wide dashboard. A commit that changes marks, students, subjects or
+classes bumps the counters it touched, so stale entries are never read again
+and simply age out of the LRU. A result computed while a write lands is stored
+under the generation read before the computation, which is already obsolete.
+
+``ANALYTICS_CACHE_URL=redis://...`` shares entries and counters between worker
+processes; otherwise each process keeps its own in-memory store.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import aggregates
+
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "60"))
+ANALYTICS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "1024"))
+ANALYTICS_CACHE_URL = os.getenv("ANALYTICS_CACHE_URL", "")
+
+_SCHOOL = "school"
+_EPOCH = "epoch"
+_CHANGED_CLASSES = "analytics_cache.changed_classes"
+_CHANGED_SCHOOL = "analytics_cache.changed_school"
+
+
+class MemoryBackend:
+    """Per-process LRU store; generation counters are kept outside the LRU."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def counters(self, names: List[str]) -> List[int]:
+        with self._lock:
+            return [self._counters.get(name, 0) for name in names]
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared store for multi-worker deployments; values are stored as JSON."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "srt:analytics:"):
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("ANALYTICS_CACHE_URL requires the redis package") from exc
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    def counters(self, names: List[str]) -> List[int]:
+        return [int(raw or 0) for raw in self.client.mget([self.prefix + "gen:" + name for name in names])]
+
+    def incr(self, name: str) -> None:
+        self.client.incr(self.prefix + "gen:" + name)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class AnalyticsCache:
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, fn: Callable, args: tuple, class_id: Optional[int]) -> str:
+        scopes = [_EPOCH, _SCHOOL if class_id is None else f"class:{class_id}"]
+        generations = ":".join(str(value) for value in self.backend.counters(scopes))
+        return f"{generations}:{fn.__module__}.{fn.__name__}:{json.dumps(args)}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    async def fetch(self, db, fn: Callable, *args, class_id: Optional[int] = None):
+        """Return ``fn(db, *args)`` through the cache; ``db`` is a ReadSession.
+
+        ``class_id`` names the class the result depends on; without it the
+        result is treated as school-wide and dropped on any change.
+        """
+        if self.ttl <= 0:
+            return await db.run(fn, *args)
+        key = self._key(fn, args, class_id)
+        value = self.backend.get(key)
+        self._count(value is not None)
+        if value is None:
+            value = await db.run(fn, *args)
+            if value is not None:
+                self.backend.set(key, value, self.ttl)
+        return value
+
+    def invalidate_classes(self, class_ids: Optional[Iterable[int]]) -> None:
+        """Drop results for ``class_ids`` (and the school-wide ones), or everything for ``None``."""
+        if class_ids is None:
+            self.backend.incr(_EPOCH)
+            return
+        for class_id in set(class_ids):
+            self.backend.incr(f"class:{class_id}")
+        self.backend.incr(_SCHOOL)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "ttl_seconds": self.ttl,
+            "entries": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 2) if total else 0.0,
+        }
+
+
+def _history_values(obj, attribute: str) -> set:
+    history = inspect(obj).attrs[attribute].history
+    return {value for value in chain(history.added, history.unchanged, history.deleted) if value is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changes(session: Session, flush_context) -> None:
+    classes = set()
+    school = False
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (models.Student, models.Subject)):
+            classes.update(_history_values(obj, "class_id"))
+        elif isinstance(obj, models.Class):
+            classes.add(obj.id)
+        elif not isinstance(obj, (models.Assessment, models.Mark)):
+            continue
+        # Mark edits reach class entries through the rollup refresh in aggregates.
+        school = True
+    if classes:
+        session.info.setdefault(_CHANGED_CLASSES, set()).update(classes)
+    if school:
+        session.info[_CHANGED_SCHOOL] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    classes = session.info.pop(_CHANGED_CLASSES, set())
+    if session.info.pop(_CHANGED_SCHOOL, False) or classes:
+        cache.invalidate_classes(classes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_CLASSES, None)
+    session.info.pop(_CHANGED_SCHOOL, None)
+
+
+cache = AnalyticsCache(
+    RedisBackend(ANALYTICS_CACHE_URL) if ANALYTICS_CACHE_URL else MemoryBackend(ANALYTICS_CACHE_MAX_ENTRIES),
+    ANALYTICS_CACHE_TTL,
+)
+aggregates.on_classes_changed(cache.invalidate_classes)
@@ -0,0 +1,101 @@
+"""Conditional GET support: per-table change versions and ETag helpers.
+
+Every flush or bulk statement that writes one of the tracked tables bumps that
+table's row in ``table_versions`` inside the same transaction, so the counters
+are shared by every worker process. A response's ETag hashes the request URL
+with the versions of the tables it reads; checking ``If-None-Match`` therefore
+costs one primary-key lookup instead of the endpoint's real query.
+"""
+import hashlib
+from itertools import chain
+from typing import Dict, Iterable, Optional, Set
+
+from fastapi import Request, Response
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+
+_VERSIONS = models.TableVersion.__table__
+TRACKED_MODELS = (models.Class, models.Student, models.Subject, models.Assessment, models.Mark)
+# Analytics results read all of the tracked tables.
+ALL_TABLES = tuple(model.__tablename__ for model in TRACKED_MODELS)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def bump(db, tables: Iterable[str]) -> None:
+    """Increment the version of ``tables``, creating missing rows."""
+    names = set(tables)
+    if not names:
+        return
+    result = db.execute(
+        update(_VERSIONS).where(_VERSIONS.c.name.in_(names)).values(version=_VERSIONS.c.version + 1)
+    )
+    if result.rowcount < len(names):
+        existing = set(db.execute(select(_VERSIONS.c.name).where(_VERSIONS.c.name.in_(names))).scalars())
+        db.execute(insert(_VERSIONS), [{"name": name, "version": 1} for name in names - existing])
+
+
+def current_versions(db, tables: Iterable[str]) -> Dict[str, int]:
+    names = sorted(set(tables))
+    versions = dict(db.execute(select(_VERSIONS.c.name, _VERSIONS.c.version).where(_VERSIONS.c.name.in_(names))).all())
+    return {name: versions.get(name, 0) for name in names}
+
+
+def ensure_versions(db: Session) -> None:
+    """Create the version rows up front so writers only ever UPDATE them."""
+    existing = set(db.execute(select(_VERSIONS.c.name)).scalars())
+    missing = [{"name": name, "version": 0} for name in ALL_TABLES if name not in existing]
+    if missing:
+        db.execute(insert(_VERSIONS), missing)
+        db.commit()
+
+
+async def not_modified(request: Request, response: Response, db, tables: Iterable[str]) -> Optional[Response]:
+    """Set the ETag for ``request``; return a 304 response when the client's copy is current.
+
+    ``db`` is a ``ReadSession``. Callers return the 304 as-is, otherwise they build
+    the body as usual and the ETag travels on ``response``.
+    """
+    versions = await db.run(current_versions, tables)
+    fingerprint = f"{request.url.path}?{request.url.query}|{sorted(versions.items())}"
+    etag = f'"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _table_of(mapper) -> Optional[str]:
+    if mapper is not None and issubclass(mapper.class_, TRACKED_MODELS):
+        return mapper.class_.__tablename__
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session: Session, flush_context) -> None:
+    tables: Set[str] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, TRACKED_MODELS) and (obj not in session.dirty or session.is_modified(obj)):
+            tables.add(obj.__tablename__)
+    bump(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_after_bulk_statement(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements never pass through the flush.
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    table = _table_of(orm_execute_state.bind_mapper)
+    if table is None:
+        return None
+    result = orm_execute_state.invoke_statement()
+    bump(orm_execute_state.session, [table])
+    return result
@@ -0,0 +1,189 @@
+"""Stream mark spreadsheets (CSV or XLSX) into the database in fixed-size batches.
+
+Rows are read lazily, resolved against lookup maps built once per import and
+handed to :func:`services.marks.upsert_marks` one batch at a time, so memory
+depends on the batch size and school size, never on the file size.
+
+Expected columns (header names are case-insensitive):
+``roll_number``, ``assessment`` (name) or ``assessment_id``, and
+``marks_obtained`` (or ``marks``).
+"""
+import codecs
+import csv
+import zipfile
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .marks import upsert_marks
+
+DEFAULT_BATCH_SIZE = 1000
+# Only the first errors are kept in the summary; the count is always exact.
+MAX_REPORTED_ERRORS = 200
+
+
+class ImportFileError(RuntimeError):
+    """Raised when an uploaded file cannot be decoded or parsed."""
+
+
+def iter_csv_rows(fileobj) -> Iterator[dict]:
+    """Yield CSV rows from a binary file object as dicts keyed by lowercase header."""
+    reader = csv.reader(codecs.iterdecode(fileobj, "utf-8-sig"))
+    try:
+        header = [name.strip().lower() for name in next(reader, [])]
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield dict(zip(header, values))
+    except UnicodeDecodeError:
+        raise ImportFileError(f"Line {reader.line_num + 1}: file is not UTF-8 encoded text") from None
+    except csv.Error as exc:
+        raise ImportFileError(f"Line {reader.line_num}: {exc}") from None
+
+
+def iter_xlsx_rows(fileobj) -> Iterator[dict]:
+    """Yield rows of the first worksheet, reading the workbook in read-only mode."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("XLSX imports require the openpyxl package") from exc
+
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError):
+        raise ImportFileError("File is not a valid XLSX workbook") from None
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(name or "").strip().lower() for name in next(rows, ())]
+        for values in rows:
+            if any(value not in (None, "") for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+class _Resolver:
+    """Lookup maps from spreadsheet identifiers to database ids, built once."""
+
+    def __init__(self, db: Session):
+        self.students: Dict[str, Tuple[int, Optional[int]]] = {
+            roll_number: (student_id, class_id)
+            for student_id, roll_number, class_id in db.execute(
+                select(models.Student.id, models.Student.roll_number, models.Student.class_id)
+            )
+        }
+        self.by_class: Dict[Tuple[Optional[int], str], int] = {}
+        self.by_name: Dict[str, List[int]] = {}
+        for assessment_id, name, class_id in db.execute(
+            select(models.Assessment.id, models.Assessment.name, models.Subject.class_id).outerjoin(
+                models.Subject, models.Assessment.subject_id == models.Subject.id
+            )
+        ):
+            key = name.strip().lower()
+            self.by_class[(class_id, key)] = assessment_id
+            self.by_name.setdefault(key, []).append(assessment_id)
+
+    def resolve(self, row: dict) -> dict:
+        roll_number = str(row.get("roll_number") or "").strip()
+        if roll_number not in self.students:
+            raise ValueError(f"Unknown roll number {roll_number!r}")
+        student_id, class_id = self.students[roll_number]
+
+        if row.get("assessment_id") not in (None, ""):
+            # Spreadsheets hand ids over as floats (``3.0``), so accept any whole number.
+            try:
+                number = float(row["assessment_id"])
+                assessment_id = int(number)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"Invalid assessment id {row['assessment_id']!r}") from None
+            if assessment_id != number:
+                raise ValueError(f"Invalid assessment id {row['assessment_id']!r}")
+        else:
+            name = str(row.get("assessment") or "").strip().lower()
+            # Assessment names repeat across classes, so prefer the student's class.
+            assessment_id = self.by_class.get((class_id, name))
+            if assessment_id is None:
+                candidates = self.by_name.get(name, [])
+                if len(candidates) != 1:
+                    raise ValueError(f"Cannot resolve assessment {row.get('assessment')!r}")
+                assessment_id = candidates[0]
+
+        score = row.get("marks_obtained", row.get("marks"))
+        try:
+            marks_obtained = float(score)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid marks value {score!r}") from None
+        return {"student_id": student_id, "assessment_id": assessment_id, "marks_obtained": marks_obtained}
+
+
+def import_marks(
+    db: Session, rows: Iterable[dict], batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False
+) -> Iterator[dict]:
+    """Import ``rows`` batch by batch, yielding progress after each batch.
+
+    Each event carries running totals plus the errors found in that batch. Every
+    batch is committed on its own (or rolled back in ``dry_run`` mode), so a
+    failure part-way through keeps the batches already written. Row numbers in
+    errors count data rows from 1, excluding the header.
+    """
+    resolver = _Resolver(db)
+    # A dry run writes nothing, so pairs "created" by earlier batches are tracked
+    # here to count a repeat in a later batch as the update a real run would make.
+    staged = set() if dry_run else None
+    totals = {"processed": 0, "created": 0, "updated": 0, "error_count": 0}
+    iterator = iter(rows)
+    row_number = 0
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        entries, entry_rows, errors = [], [], []
+        for row in batch:
+            row_number += 1
+            try:
+                entries.append(resolver.resolve(row))
+                entry_rows.append(row_number)
+            except ValueError as exc:
+                errors.append({"row": row_number, "detail": str(exc)})
+
+        result = upsert_marks(db, entries, dry_run=dry_run, staged=staged)
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        errors.extend({"row": entry_rows[e["index"]], "detail": e["detail"]} for e in result["errors"])
+
+        totals["processed"] += len(batch)
+        totals["created"] += result["created"]
+        totals["updated"] += result["updated"]
+        totals["error_count"] += len(errors)
+        yield dict(totals, dry_run=dry_run, errors=sorted(errors, key=lambda e: e["row"])[:MAX_REPORTED_ERRORS])
+
+
+def run_import(db: Session, rows: Iterable[dict], **options) -> dict:
+    """Drain :func:`import_marks` and return the final totals and first errors."""
+    summary = {"processed": 0, "created": 0, "updated": 0, "error_count": 0, "dry_run": options.get("dry_run", False)}
+    errors: List[dict] = []
+    for event in import_marks(db, rows, **options):
+        errors.extend(event.pop("errors")[: MAX_REPORTED_ERRORS - len(errors)])
+        summary = event
+    summary["errors"] = errors
+    return summary
+
+
+def open_rows(filename: str, fileobj) -> Iterator[dict]:
+    """Pick the row reader from the uploaded file's extension.
+
+    The first row is read straight away so an unreadable file raises
+    :class:`ImportFileError` here rather than part-way through a stream.
+    """
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        rows = iter_xlsx_rows(fileobj)
+    else:
+        rows = iter_csv_rows(fileobj)
+    first = next(rows, None)
+    return rows if first is None else chain([first], rows)
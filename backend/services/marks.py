@@ -0,0 +1,76 @@
+"""Set-based mark writes shared by the bulk entry endpoint and importers."""
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import aggregates
+
+
+def upsert_marks(
+    db: Session, entries: Sequence[dict], dry_run: bool = False, staged: Optional[Set[Tuple[int, int]]] = None
+) -> dict:
+    """Validate and upsert ``entries`` on ``(student_id, assessment_id)``.
+
+    Each entry is a dict with ``student_id``, ``assessment_id`` and
+    ``marks_obtained``. Students, assessments and existing marks are looked up
+    with one query each, then valid rows are written with two executemany
+    statements. Invalid rows are reported by index and skipped; nothing is
+    committed here so callers decide the transaction boundary. With ``dry_run``
+    the rows are validated and counted but not written; ``staged`` then holds
+    the ``(student_id, assessment_id)`` pairs earlier dry-run calls would have
+    created, which count as updates and are extended with this call's inserts.
+    """
+    student_ids = {entry["student_id"] for entry in entries}
+    assessment_ids = {entry["assessment_id"] for entry in entries if entry["assessment_id"] is not None}
+    known_students = set(db.execute(select(models.Student.id).where(models.Student.id.in_(student_ids))).scalars())
+    maximums: Dict[int, int] = dict(
+        db.execute(
+            select(models.Assessment.id, models.Assessment.maximum_marks).where(
+                models.Assessment.id.in_(assessment_ids)
+            )
+        ).all()
+    )
+    existing: Dict[Tuple[int, int], int] = {
+        (student_id, assessment_id): mark_id
+        for mark_id, student_id, assessment_id in db.execute(
+            select(models.Mark.id, models.Mark.student_id, models.Mark.assessment_id).where(
+                models.Mark.student_id.in_(known_students), models.Mark.assessment_id.in_(maximums)
+            )
+        )
+    }
+
+    inserts: List[dict] = []
+    updates: List[dict] = []
+    errors: List[dict] = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        student_id, assessment_id, score = entry["student_id"], entry["assessment_id"], entry["marks_obtained"]
+        key = (student_id, assessment_id)
+        if student_id not in known_students:
+            errors.append({"index": index, "detail": f"Unknown student {student_id}"})
+        elif assessment_id not in maximums:
+            errors.append({"index": index, "detail": f"Unknown assessment {assessment_id}"})
+        elif not 0 <= score <= maximums[assessment_id]:
+            errors.append({"index": index, "detail": f"Marks must be between 0 and {maximums[assessment_id]}"})
+        elif key in seen:
+            errors.append({"index": index, "detail": "Duplicate student and assessment in request"})
+        else:
+            seen.add(key)
+            if key in existing or (staged is not None and key in staged):
+                updates.append({"id": existing.get(key), "marks_obtained": score})
+            else:
+                inserts.append({"student_id": student_id, "assessment_id": assessment_id, "marks_obtained": score})
+
+    if dry_run:
+        if staged is not None:
+            staged.update((entry["student_id"], entry["assessment_id"]) for entry in inserts)
+        return {"created": len(inserts), "updated": len(updates), "errors": errors}
+    if inserts:
+        db.execute(insert(models.Mark), inserts)
+    if updates:
+        db.execute(update(models.Mark), updates)
+    # Core-style bulk writes skip the flush hooks, so refresh rollups explicitly.
+    aggregates.refresh_students(db, {student_id for student_id, _ in seen})
+    return {"created": len(inserts), "updated": len(updates), "errors": errors}
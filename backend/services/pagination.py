@@ -0,0 +1,66 @@
+"""Keyset pagination and column projection shared by the list endpoints."""
+from typing import List, Optional
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters accepted by every paginated list endpoint.
+
+    ``cursor`` is the ``id`` of the last row already seen; the next page starts
+    after it. ``fields`` is a comma-separated list of columns to return.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: Optional[int] = Query(None, ge=0),
+        fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,name"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+
+    def columns(self, model) -> Optional[List[str]]:
+        if not self.fields:
+            return None
+        requested = [name.strip() for name in self.fields.split(",") if name.strip()]
+        allowed = model.__table__.columns.keys()
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # The cursor is keyed on ``id`` so it is always part of the projection.
+        return ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+
+
+def paginate(query, model, page: PageParams, response: Response):
+    """Return one page of ``query`` ordered by ``id``.
+
+    The ``id`` to pass as ``cursor`` for the following page is sent in the
+    ``X-Next-Cursor`` header; it is absent on the last page. With ``fields`` the
+    rows are returned as plain dicts, skipping the response model entirely.
+    """
+    columns = page.columns(model)
+    if columns:
+        query = query.with_entities(*(getattr(model, name) for name in columns))
+    if page.cursor is not None:
+        query = query.filter(model.id > page.cursor)
+    rows = query.order_by(model.id).limit(page.limit + 1).all()
+
+    headers = {}
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+
+    if columns:
+        content = jsonable_encoder([dict(zip(columns, row)) for row in rows])
+        # Keep headers already set on ``response`` (e.g. ETag) on the raw response.
+        return JSONResponse(content=content, headers={**response.headers, **headers})
+    response.headers.update(headers)
+    return rows
@@ -0,0 +1,30 @@
+"""Bounded process pool for password verification.
+
+PBKDF2 is deliberately slow and holds the GIL, so a burst of logins verified on
+request threads would stall every other endpoint. Logins hand verification to a
+few worker processes instead; attempts beyond ``workers + queue_depth`` are
+refused straight away with a retry hint. The bounding and the queue statistics
+come from :class:`~.process_pool.BoundedProcessPool`, shared with report rendering.
+"""
+import os
+
+from ..auth import verify_password
+from .process_pool import BoundedProcessPool, QueueFull
+
+PASSWORD_VERIFY_WORKERS = int(os.getenv("PASSWORD_VERIFY_WORKERS", "2"))
+PASSWORD_VERIFY_QUEUE = int(os.getenv("PASSWORD_VERIFY_QUEUE", "32"))
+PASSWORD_VERIFY_RETRY_AFTER = int(os.getenv("PASSWORD_VERIFY_RETRY_AFTER", "2"))
+
+
+class VerifyQueueFull(QueueFull):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class PasswordPool(BoundedProcessPool):
+    queue_full = VerifyQueueFull
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+
+pool = PasswordPool(PASSWORD_VERIFY_WORKERS, PASSWORD_VERIFY_QUEUE)
@@ -0,0 +1,73 @@
+"""Bounded process pool for CPU-bound work that would otherwise hold the GIL.
+
+Work goes to a few worker processes, started on first use. Callers beyond
+``workers + queue_depth`` are refused straight away with the pool's
+``queue_full`` exception instead of piling up behind it, and the current and
+peak queue depth are reported by :meth:`BoundedProcessPool.stats`.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Optional, Type
+
+
+class QueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class BoundedProcessPool:
+    queue_full: Type[QueueFull] = QueueFull
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = max(workers, 1)
+        self.queue_depth = max(queue_depth, 0)
+        self.pending = 0
+        self.peak = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" avoids forking a multi-threaded server process.
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+        return self._executor
+
+    def reserve(self) -> None:
+        """Take a queue slot or raise ``queue_full``; pair with :meth:`release`."""
+        # Only the event loop thread touches the counters, so no lock is needed.
+        if self.pending >= self.workers + self.queue_depth:
+            self.rejected += 1
+            raise self.queue_full()
+        self.pending += 1
+        self.peak = max(self.peak, self.pending)
+
+    def release(self) -> None:
+        self.pending -= 1
+        self.completed += 1
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` in a worker process, holding a slot while it runs or waits."""
+        self.reserve()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_depth,
+            # Jobs running or waiting for a worker right now.
+            "pending": self.pending,
+            "queued": max(self.pending - self.workers, 0),
+            "peak_pending": self.peak,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
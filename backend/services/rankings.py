@@ -0,0 +1,154 @@
+"""Class leaderboards and per-student ranks computed with SQL window functions.
+
+Averages come from the maintained rollups, so ranking a class reads one row per
+student/subject/term instead of every mark. The database assigns ``RANK``,
+``DENSE_RANK`` and ``PERCENT_RANK`` over the whole class, and only the requested
+page of the leaderboard is returned to Python.
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .analytics import STUDENT_MARK_ORDER, rollup_means
+
+_ROLLUP = models.StudentSubjectTermAggregate
+
+
+def _ranked(class_id: int, partition=None, term: Optional[str] = None, subject_id: Optional[int] = None):
+    """Subquery ranking the students of ``class_id`` by average, optionally per ``partition``."""
+    keys = [partition] if partition is not None else []
+    criteria = [_ROLLUP.student_id.in_(select(models.Student.id).where(models.Student.class_id == class_id))]
+    if term is not None:
+        criteria.append(_ROLLUP.term == term)
+    if subject_id is not None:
+        criteria.append(_ROLLUP.subject_id == subject_id)
+
+    totals = (
+        select(
+            *keys,
+            _ROLLUP.student_id,
+            func.sum(_ROLLUP.percentage_sum).label("percentage_sum"),
+            func.sum(_ROLLUP.mark_count).label("mark_count"),
+        )
+        .where(*criteria)
+        .group_by(*keys, _ROLLUP.student_id)
+        .having(func.sum(_ROLLUP.mark_count) > 0)
+        .subquery()
+    )
+    # Equal ratios divide to the same float, so ties rank together.
+    score = totals.c.percentage_sum * 1.0 / totals.c.mark_count
+    group_columns = [totals.c[key.key] for key in keys]
+    partition_by = group_columns or None
+    return select(
+        *group_columns,
+        totals.c.student_id,
+        totals.c.percentage_sum,
+        totals.c.mark_count,
+        func.rank().over(partition_by=partition_by, order_by=score.desc()).label("rank"),
+        func.dense_rank().over(partition_by=partition_by, order_by=score.desc()).label("dense_rank"),
+        func.percent_rank().over(partition_by=partition_by, order_by=score).label("percent_rank"),
+        func.count().over(partition_by=partition_by).label("ranked"),
+        func.row_number().over(partition_by=partition_by, order_by=(score.desc(), totals.c.student_id)).label("position"),
+    ).subquery()
+
+
+def _averages(db: Session, rows, key: str, mark_key, *criteria) -> dict:
+    """Average per ``row.<key>``, rounded like the per-class endpoints round it."""
+    totals = {getattr(row, key): (row.percentage_sum, row.mark_count) for row in rows}
+    return rollup_means(db, totals, mark_key, STUDENT_MARK_ORDER, *criteria)
+
+
+def _entry(row, average: float) -> dict:
+    return {
+        "average": average,
+        "rank": row.rank,
+        "dense_rank": row.dense_rank,
+        # Share of ranked students with a strictly lower average.
+        "percentile": round(row.percent_rank * 100, 2),
+        "out_of": row.ranked,
+    }
+
+
+def class_rankings(
+    db: Session,
+    class_id: int,
+    term: Optional[str] = None,
+    subject_id: Optional[int] = None,
+    limit: int = 10,
+    cursor: Optional[int] = None,
+) -> Tuple[List[dict], Optional[int]]:
+    """One page of the class leaderboard and the cursor for the next page.
+
+    ``cursor`` is the leaderboard position of the last entry already seen.
+    """
+    ranked = _ranked(class_id, term=term, subject_id=subject_id)
+    rows = db.execute(
+        select(ranked, models.Student.name)
+        .join(models.Student, models.Student.id == ranked.c.student_id)
+        .where(ranked.c.position > (cursor or 0))
+        .order_by(ranked.c.position)
+        .limit(limit + 1)
+    ).all()
+    next_cursor = rows[limit - 1].position if len(rows) > limit else None
+    rows = rows[:limit]
+    mark_criteria = []
+    if term is not None:
+        mark_criteria.append(models.Assessment.term == term)
+    if subject_id is not None:
+        mark_criteria.append(models.Assessment.subject_id == subject_id)
+    averages = _averages(db, rows, "student_id", models.Mark.student_id, *mark_criteria)
+    return [
+        dict(
+            student_id=row.student_id,
+            student_name=row.name,
+            position=row.position,
+            **_entry(row, averages[row.student_id]),
+        )
+        for row in rows
+    ], next_cursor
+
+
+def student_rank(db: Session, student_id: int) -> Optional[dict]:
+    """The student's standing in their class overall, per term and per subject."""
+    student = db.execute(
+        select(models.Student.id, models.Student.name, models.Student.class_id).where(models.Student.id == student_id)
+    ).first()
+    if student is None:
+        return None
+    result = {
+        "student_id": student.id,
+        "student_name": student.name,
+        "class_id": student.class_id,
+        "overall": None,
+        "terms": [],
+        "subjects": [],
+    }
+    if student.class_id is None:
+        return result
+
+    overall = _ranked(student.class_id)
+    standing = db.execute(select(overall).where(overall.c.student_id == student_id)).first()
+    if standing:
+        average = _averages(db, [standing], "student_id", models.Mark.student_id)[student_id]
+        result["overall"] = _entry(standing, average)
+
+    own_marks = models.Mark.student_id == student_id
+    by_term = _ranked(student.class_id, partition=_ROLLUP.term)
+    rows = db.execute(select(by_term).where(by_term.c.student_id == student_id).order_by(by_term.c.term)).all()
+    averages = _averages(db, rows, "term", models.Assessment.term, own_marks)
+    result["terms"] = [dict(term=row.term, **_entry(row, averages[row.term])) for row in rows]
+
+    by_subject = _ranked(student.class_id, partition=_ROLLUP.subject_id)
+    rows = db.execute(
+        select(by_subject, models.Subject.name)
+        .join(models.Subject, models.Subject.id == by_subject.c.subject_id)
+        .where(by_subject.c.student_id == student_id)
+        .order_by(models.Subject.id)
+    ).all()
+    averages = _averages(db, rows, "subject_id", models.Assessment.subject_id, own_marks)
+    result["subjects"] = [
+        dict(subject_id=row.subject_id, subject=row.name, **_entry(row, averages[row.subject_id])) for row in rows
+    ]
+    return result
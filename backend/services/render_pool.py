@@ -0,0 +1,56 @@
+"""Bounded process pool for report rendering.
+
+PDF drawing is CPU-bound Python, so running it on request threads would compete
+with the CRUD endpoints for the GIL. Renders go to a small pool of worker
+processes instead, and requests beyond ``workers + queue_depth`` are refused
+straight away so a burst of downloads cannot pile up behind the pool. A class
+batch holds one slot for its whole run and keeps at most ``workers`` renders in
+flight, so batch downloads share the same processes as single reports.
+"""
+import asyncio
+import os
+from collections import deque
+from typing import AsyncIterator, List, Tuple
+
+from .process_pool import BoundedProcessPool, QueueFull
+from .report_cards import render_report_card, render_report_file
+
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+REPORT_RENDER_QUEUE = int(os.getenv("REPORT_RENDER_QUEUE", "8"))
+REPORT_RENDER_RETRY_AFTER = int(os.getenv("REPORT_RENDER_RETRY_AFTER", "5"))
+
+
+class RenderQueueFull(QueueFull):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class RenderPool(BoundedProcessPool):
+    queue_full = RenderQueueFull
+
+    async def render_to_file(self, report: dict, path: str) -> str:
+        return await self.run(render_report_file, report, path)
+
+    async def render_batch(self, reports: List[dict]) -> AsyncIterator[Tuple[dict, bytes]]:
+        """Yield ``(report, pdf)`` in order.
+
+        The caller must ``reserve()`` a slot first and ``release()`` it once the
+        batch is done with, including when iteration never starts.
+        """
+        in_flight: deque = deque()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            for report in reports:
+                in_flight.append((report, loop.run_in_executor(executor, render_report_card, report)))
+                if len(in_flight) >= self.workers:
+                    report, future = in_flight.popleft()
+                    yield report, await future
+            while in_flight:
+                report, future = in_flight.popleft()
+                yield report, await future
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+
+
+pool = RenderPool(REPORT_RENDER_WORKERS, REPORT_RENDER_QUEUE)
@@ -0,0 +1,121 @@
+"""On-disk, content-addressed cache of rendered report card PDFs.
+
+The cache key is a hash of everything the renderer reads (student row, term
+marks, assessment metadata, generation date) plus the template version, so a
+changed mark can never be served a stale PDF. Files live under
+``<dir>/<student_id>/<key>.pdf``; a student's PDFs are deleted when their
+marks change, and the least recently used files are evicted once the store
+grows past its byte budget.
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Iterable, Optional
+
+from . import aggregates
+
+# Bump whenever render_report_card changes what it draws.
+TEMPLATE_VERSION = "1"
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "srt-report-cache"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def report_key(report: dict) -> str:
+    payload = json.dumps({"template": TEMPLATE_VERSION, "report": report}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, student_id: int, key: str) -> str:
+        return os.path.join(self.directory, str(student_id), f"{key}.pdf")
+
+    def open(self, student_id: int, key: str) -> Optional[BinaryIO]:
+        """Open a cached PDF for reading; the handle survives a concurrent eviction."""
+        path = self._path(student_id, key)
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # mtime doubles as the LRU clock
+        except FileNotFoundError:
+            pass
+        return handle
+
+    def temp_path(self, student_id: int) -> str:
+        """Reserve a scratch file next to where the student's PDFs are stored."""
+        directory = os.path.dirname(self._path(student_id, "x"))
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        return path
+
+    def store(self, tmp_path: str, student_id: int, key: str) -> BinaryIO:
+        """Move a rendered scratch file into the cache and open it for reading."""
+        path = self._path(student_id, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        handle = open(path, "rb")
+        with self._lock:
+            if self._size is not None:
+                self._size += os.fstat(handle.fileno()).st_size
+            if self._size is None or self._size > self.max_bytes:
+                self._evict()
+        return handle
+
+    def invalidate_students(self, student_ids: Optional[Iterable[int]]) -> None:
+        """Drop cached reports for ``student_ids``, or everything when ``None``."""
+        targets = [os.path.join(self.directory, "*")] if student_ids is None else [
+            os.path.join(self.directory, str(student_id)) for student_id in student_ids
+        ]
+        # Only finished PDFs are removed: a render in flight keeps its scratch
+        # file and directory, so its os.replace into the cache still succeeds.
+        removed = 0
+        for target in targets:
+            for path in glob.glob(os.path.join(target, "*.pdf")):
+                try:
+                    size = os.stat(path).st_size
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                removed += size
+        # Keep the running total instead of forcing the next store to walk the tree.
+        with self._lock:
+            if self._size is not None:
+                self._size = max(self._size - removed, 0)
+
+    def _evict(self) -> None:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pdf"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                size -= file_size
+            except FileNotFoundError:
+                pass
+        self._size = size
+
+
+cache = ReportCache(REPORT_CACHE_DIR, REPORT_CACHE_MAX_BYTES)
+aggregates.on_students_changed(lambda student_ids: cache.invalidate_students(student_ids))
@@ -0,0 +1,371 @@
+"""Render student report cards as PDF bytes from plain, picklable data.
+
+Rendering is kept separate from database access so the same function can run
+inside the request, in a process pool for whole-class batches, or from the CLI.
+"""
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from io import BytesIO
+from multiprocessing import get_context
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from .analytics import calculate_percentage, grade_from_percentage, mean_percentage
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def _report_marks(db: Session, term: str, *criteria) -> Dict[int, List[dict]]:
+    """Term marks per student in report order (assessment date, then name)."""
+    rows = (
+        db.query(
+            models.Mark.student_id,
+            models.Mark.marks_obtained,
+            models.Assessment.name,
+            models.Assessment.maximum_marks,
+            models.Assessment.date,
+            models.Subject.name,
+        )
+        .join(models.Assessment, models.Mark.assessment_id == models.Assessment.id)
+        .outerjoin(models.Subject, models.Assessment.subject_id == models.Subject.id)
+        .filter(models.Assessment.term == term, *criteria)
+        .order_by(models.Mark.id)
+        .all()
+    )
+    # A stable sort keeps marks of the same date and name in id order, the order
+    # the overall percentage has always been summed in.
+    rows.sort(key=lambda r: (r[4] or date.min, r[2]))
+    marks: Dict[int, List[dict]] = {}
+    for student_id, score, assessment, maximum, _, subject in rows:
+        marks.setdefault(student_id, []).append(
+            {"assessment": assessment, "subject": subject or "", "score": score, "maximum": maximum}
+        )
+    return marks
+
+
+def _report_data(student_id: int, name: str, roll_number: str, class_name: Optional[str], term: str, marks) -> dict:
+    return {
+        "term": term,
+        "generated_on": date.today().isoformat(),
+        "student": {"id": student_id, "name": name, "roll_number": roll_number, "class_name": class_name},
+        "marks": marks,
+    }
+
+
+def _student_rows(db: Session, *criteria):
+    return (
+        db.query(models.Student.id, models.Student.name, models.Student.roll_number, models.Class.name)
+        .outerjoin(models.Class, models.Student.class_id == models.Class.id)
+        .filter(*criteria)
+        .order_by(models.Student.id)
+        .all()
+    )
+
+
+def student_report_data(db: Session, student_id: int, term: str) -> Optional[dict]:
+    students = _student_rows(db, models.Student.id == student_id)
+    if not students:
+        return None
+    marks = _report_marks(db, term, models.Mark.student_id == student_id)
+    return _report_data(*students[0], term, marks.get(student_id, []))
+
+
+def class_report_data(db: Session, class_id: int, term: str) -> List[dict]:
+    """Report data for every student in a class using two queries in total."""
+    students = _student_rows(db, models.Student.class_id == class_id)
+    class_students = db.query(models.Student.id).filter(models.Student.class_id == class_id)
+    marks = _report_marks(db, term, models.Mark.student_id.in_(class_students.scalar_subquery()))
+    return [_report_data(*student, term, marks.get(student[0], [])) for student in students]
+
+
+def report_filename(report: dict) -> str:
+    return f"report_{report['student']['roll_number']}.pdf"
+
+
+def render_report_card(report: dict) -> bytes:
+    """Draw one report card and return the PDF document."""
+    buffer = BytesIO()
+    _draw_report_card(report, buffer)
+    return buffer.getvalue()
+
+
+def render_report_file(report: dict, path: str) -> str:
+    """Draw one report card straight to ``path`` so the PDF never sits in memory."""
+    _draw_report_card(report, path)
+    return path
+
+
+def _draw_report_card(report: dict, target) -> None:
+    # ReportLab is only needed to draw, so importing the API (or a worker) does not pay for it.
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    term = report["term"]
+    generated_on = date.fromisoformat(report["generated_on"])
+    student = report["student"]
+    term_marks = report["marks"]
+
+    p = canvas.Canvas(target, pagesize=letter)
+    width, height = letter
+
+    margin = 42
+    midnight = colors.HexColor("#0b1021")
+    deep_blue = colors.HexColor("#1e3a8a")
+    cyan = colors.HexColor("#22d3ee")
+    soft_bg = colors.HexColor("#f8fafc")
+    border = colors.HexColor("#e2e8f0")
+    muted = colors.HexColor("#475569")
+
+    def paint_canvas_backdrop() -> None:
+        p.setFillColor(soft_bg)
+        p.rect(0, 0, width, height, fill=1, stroke=0)
+        p.setFillColor(midnight)
+        p.roundRect(margin - 6, height - 170, width - 2 * (margin - 6), 140, 16, fill=1, stroke=0)
+        p.setFillColor(deep_blue)
+        p.roundRect(margin - 6, height - 210, width / 2.6, 60, 16, fill=1, stroke=0)
+
+    def header_block() -> None:
+        p.setFillColor(colors.white)
+        p.setFont("Helvetica-Bold", 18)
+        p.drawString(margin + 8, height - 90, "Sajana Analytics • Student Performance")
+        p.setFont("Helvetica", 11)
+        p.drawString(margin + 8, height - 108, "Modern summary of grades, momentum, and insights")
+        p.setFont("Helvetica-Bold", 10)
+        p.setFillColor(cyan)
+        p.drawString(width - margin - 140, height - 96, term.upper())
+        p.setFillColor(colors.white)
+        p.setFont("Helvetica", 9)
+        p.drawString(width - margin - 140, height - 112, "Generated on: " + generated_on.strftime("%b %d, %Y"))
+
+    def student_identity_card(start_y: float) -> float:
+        card_height = 86
+        p.setFillColor(colors.white)
+        p.roundRect(margin, start_y - card_height, width - 2 * margin, card_height, 12, fill=1, stroke=0)
+        p.setStrokeColor(border)
+        p.roundRect(margin, start_y - card_height, width - 2 * margin, card_height, 12, fill=0, stroke=1)
+
+        p.setFillColor(midnight)
+        p.setFont("Helvetica-Bold", 14)
+        p.drawString(margin + 16, start_y - 18, student["name"])
+        p.setFont("Helvetica", 10.5)
+        p.setFillColor(muted)
+        class_name = student["class_name"] or "N/A"
+        p.drawString(margin + 16, start_y - 34, f"Roll #{student['roll_number']}  •  Class {class_name}")
+        p.drawString(margin + 16, start_y - 50, "Report powered by Sajana Insights")
+
+        p.setFillColor(deep_blue)
+        p.roundRect(width - margin - 120, start_y - 46, 110, 34, 10, fill=1, stroke=0)
+        p.setFillColor(colors.white)
+        p.setFont("Helvetica-Bold", 11)
+        p.drawString(width - margin - 108, start_y - 24, "Student Profile")
+        return start_y - card_height - 16
+
+    def stat_chip(x_pos: float, y_pos: float, title: str, value: str, highlight: colors.Color) -> None:
+        chip_width = (width - 2 * margin - 24) / 3
+        p.setFillColor(colors.white)
+        p.roundRect(x_pos, y_pos - 66, chip_width, 66, 10, fill=1, stroke=0)
+        p.setStrokeColor(border)
+        p.roundRect(x_pos, y_pos - 66, chip_width, 66, 10, fill=0, stroke=1)
+        p.setFillColor(muted)
+        p.setFont("Helvetica", 10)
+        p.drawString(x_pos + 14, y_pos - 20, title)
+        p.setFillColor(highlight)
+        p.setFont("Helvetica-Bold", 16)
+        p.drawString(x_pos + 14, y_pos - 38, value)
+
+    column_config = [
+        {"title": "Assessment", "width": 0.30, "align": "left"},
+        {"title": "Subject", "width": 0.24, "align": "left"},
+        {"title": "Score", "width": 0.18, "align": "right"},
+        {"title": "Percent", "width": 0.14, "align": "right"},
+        {"title": "Grade", "width": 0.14, "align": "center"},
+    ]
+
+    def column_layout():
+        table_width = width - 2 * margin
+        inner_width = table_width - 24  # padding inside the table band
+        x_start = margin + 12
+        positions = []
+        cursor = x_start
+        for col in column_config:
+            col_width = inner_width * col["width"]
+            positions.append((cursor, col_width))
+            cursor += col_width
+        return positions
+
+    def table_header(y_pos: float) -> None:
+        p.setFillColor(deep_blue)
+        p.roundRect(margin, y_pos - 18, width - 2 * margin, 32, 10, fill=1, stroke=0)
+        p.setFillColor(colors.white)
+        p.setFont("Helvetica-Bold", 11)
+        for (x_pos, col_width), col in zip(column_layout(), column_config):
+            if col["align"] == "right":
+                p.drawRightString(x_pos + col_width - 2, y_pos, col["title"])
+            elif col["align"] == "center":
+                p.drawCentredString(x_pos + (col_width / 2), y_pos, col["title"])
+            else:
+                p.drawString(x_pos, y_pos, col["title"])
+
+    def ensure_row_space(current_y: float) -> float:
+        if current_y < 110:
+            p.showPage()
+            paint_canvas_backdrop()
+            header_block()
+            after_header = student_identity_card(height - 200)
+            summary_band(after_header)
+            new_y = after_header - 120
+            table_header(new_y)
+            return new_y - 28
+        return current_y
+
+    def summary_band(start_y: float) -> float:
+        metrics_y = start_y - 12
+        stat_chip(margin, metrics_y, "Overall Percentage", f"{overall}%", cyan)
+        stat_chip(margin + ((width - 2 * margin - 24) / 3) + 12, metrics_y, "Overall Grade", overall_grade, deep_blue)
+        stat_chip(margin + 2 * ((width - 2 * margin - 24) / 3) + 24, metrics_y, "Assessments", str(len(term_marks)), midnight)
+        return metrics_y - 78
+
+    def narrative_block(start_y: float) -> None:
+        p.setFillColor(colors.white)
+        p.roundRect(margin, start_y - 86, width - 2 * margin, 86, 12, fill=1, stroke=0)
+        p.setStrokeColor(border)
+        p.roundRect(margin, start_y - 86, width - 2 * margin, 86, 12, fill=0, stroke=1)
+        p.setFillColor(midnight)
+        p.setFont("Helvetica-Bold", 11)
+        p.drawString(margin + 14, start_y - 22, "Coach Notes")
+        p.setFillColor(muted)
+        p.setFont("Helvetica", 10.5)
+        p.drawString(margin + 14, start_y - 42, comment)
+        p.setFillColor(cyan)
+        p.setFont("Helvetica", 9)
+        p.drawString(margin + 14, start_y - 62, "Shareable, printer ready, and aligned to Sajana's new visual system")
+
+    paint_canvas_backdrop()
+    header_block()
+
+    total_pct = [calculate_percentage(m["score"], m["maximum"]) for m in term_marks]
+    overall = mean_percentage(total_pct)
+    overall_grade = grade_from_percentage(overall)
+
+    comment = "Building foundation — add more practice sessions"
+    if overall >= 90:
+        comment = "Outstanding mastery — keep challenging with advanced material"
+    elif overall >= 75:
+        comment = "Great momentum — maintain consistency and stretch goals"
+    elif overall >= 60:
+        comment = "Solid progress — focus on weak topics for next term"
+
+    y_position = student_identity_card(height - 200)
+    y_position = summary_band(y_position)
+
+    table_header(y_position)
+    y_position -= 28
+
+    if not term_marks:
+        p.setFillColor(muted)
+        p.setFont("Helvetica", 11)
+        p.drawString(margin, y_position, "No assessments available for this term.")
+        y_position -= 24
+    else:
+        for index, mark in enumerate(term_marks):
+            pct = calculate_percentage(mark["score"], mark["maximum"])
+            grade = grade_from_percentage(pct)
+            row_color = colors.HexColor("#e0f2fe") if index % 2 == 0 else colors.white
+            p.setFillColor(row_color)
+            p.roundRect(margin, y_position - 14, width - 2 * margin, 28, 8, fill=1, stroke=0)
+
+            positions = column_layout()
+            p.setFillColor(midnight)
+            p.setFont("Helvetica-Bold", 10.5)
+            p.drawString(positions[0][0], y_position + 2, mark["assessment"])
+
+            p.setFillColor(muted)
+            p.setFont("Helvetica", 10.5)
+            p.drawString(positions[1][0], y_position + 2, mark["subject"])
+            p.drawRightString(
+                positions[2][0] + positions[2][1] - 4,
+                y_position + 2,
+                f"{mark['score']}/{mark['maximum']}",
+            )
+
+            p.setFillColor(deep_blue)
+            p.drawRightString(
+                positions[3][0] + positions[3][1] - 4, y_position + 2, f"{pct:.1f}%"
+            )
+
+            p.setFillColor(cyan)
+            p.drawCentredString(
+                positions[4][0] + (positions[4][1] / 2), y_position + 2, grade
+            )
+
+            y_position -= 28
+            y_position = ensure_row_space(y_position)
+
+    narrative_block(y_position)
+
+    p.showPage()
+    p.save()
+
+
+def render_many(reports: Iterable[dict], workers: int = REPORT_WORKERS) -> Iterator[Tuple[dict, bytes]]:
+    """Render ``reports`` in a process pool, yielding each one as soon as it is done."""
+    reports = list(reports)
+    if workers <= 1 or len(reports) <= 1:
+        for report in reports:
+            yield report, render_report_card(report)
+        return
+    # "spawn" avoids forking a multi-threaded server process.
+    with ProcessPoolExecutor(max_workers=min(workers, len(reports)), mp_context=get_context("spawn")) as pool:
+        futures = {pool.submit(render_report_card, report): report for report in reports}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+class _ChunkWriter:
+    """Non-seekable sink that lets a generator hand out what ZipFile wrote so far."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Yield a ZIP archive of ``(name, data)`` pairs, one member at a time."""
+    sink = _ChunkWriter()
+    # PDFs are already compressed, so members are stored as-is.
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def astream_zip(files: AsyncIterable[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """``stream_zip`` for members produced by an async iterator."""
+    sink = _ChunkWriter()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, data in files:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
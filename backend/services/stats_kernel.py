@@ -0,0 +1,233 @@
+"""Vectorised statistics over marks loaded as NumPy columns.
+
+:func:`load_mark_columns` reads ``(class_id, student_id, subject_id, term,
+obtained, maximum)`` for every mark in one statement into parallel arrays; the
+functions below then compute percentages, grouped means, grade buckets,
+percentiles and spreads without a Python loop per mark or per student.
+
+Percentages and means are rounded exactly as ``calculate_percentage`` and
+``mean_percentage`` round them, marks are read in id order and means are taken
+over integer hundredths (falling back to the ordered float sum on half-hundredth
+ties), so the results match the rollup-based endpoints to the cent. NumPy is imported inside
+the functions so loading the API does not pay for it until a statistic is asked for.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .analytics import GRADE_BOUNDARIES, GRADE_LABELS, PASS_PERCENTAGE, mean_percentage
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SCHOOL_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class MarkColumns:
+    """Parallel arrays with one entry per mark; ``term`` holds codes into ``terms``."""
+
+    def __init__(self, class_id, student_id, subject_id, term, terms, obtained, maximum):
+        self.class_id = class_id
+        self.student_id = student_id
+        self.subject_id = subject_id
+        self.term = term
+        self.terms = terms
+        self.obtained = obtained
+        self.maximum = maximum
+
+    def __len__(self) -> int:
+        return len(self.student_id)
+
+
+def load_mark_columns(db: Session, *criteria) -> MarkColumns:
+    import numpy as np
+
+    rows = db.execute(
+        select(
+            models.Student.class_id,
+            models.Mark.student_id,
+            models.Assessment.subject_id,
+            models.Assessment.term,
+            models.Mark.marks_obtained,
+            models.Assessment.maximum_marks,
+        )
+        .join(models.Student, models.Mark.student_id == models.Student.id)
+        .join(models.Assessment, models.Mark.assessment_id == models.Assessment.id)
+        .where(*criteria)
+        .order_by(models.Mark.id)
+    ).all()
+    class_id, student_id, subject_id, term, obtained, maximum = zip(*rows) if rows else ((),) * 6
+    terms, term_codes = np.unique(np.array(term, dtype=object).astype(str), return_inverse=True)
+    return MarkColumns(
+        # -1 stands in for a missing class or subject.
+        class_id=np.array([-1 if value is None else value for value in class_id], dtype=np.int64),
+        student_id=np.array(student_id, dtype=np.int64),
+        subject_id=np.array([-1 if value is None else value for value in subject_id], dtype=np.int64),
+        term=term_codes.astype(np.int64),
+        terms=terms,
+        obtained=np.array(obtained, dtype=np.float64),
+        maximum=np.array(maximum, dtype=np.float64),
+    )
+
+
+def percentages(obtained: np.ndarray, maximum: np.ndarray) -> np.ndarray:
+    """Per-mark percentage, rounded exactly like ``calculate_percentage``."""
+    import numpy as np
+
+    raw = np.divide(obtained, maximum, out=np.zeros_like(obtained), where=maximum != 0) * 100
+    return _round2(raw)
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """Round to two decimals with the same result as Python's ``round(value, 2)``.
+
+    np.round scales by 100 first, which can tip a value sitting just below a half
+    hundredth (50.595 is stored as 50.59499...) onto the other side. Only values
+    that close to a half are re-rounded in Python.
+    """
+    import numpy as np
+
+    scaled = values * 100
+    result = np.rint(scaled) / 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        result[near_half] = [round(value, 2) for value in values[near_half].tolist()]
+    return result
+
+
+def group_means(keys: np.ndarray, values: np.ndarray):
+    """Mean of ``values`` (two-decimal percentages) per distinct key.
+
+    Returns ``(unique_keys, means, counts)``; sums are taken over integer
+    hundredths so the result does not depend on row order.
+    """
+    import numpy as np
+
+    unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    hundredths = np.rint(values * 100)
+    sums = np.bincount(inverse, weights=hundredths, minlength=len(unique_keys))
+    means = _round2(sums / (counts * 100))
+    for index in np.flatnonzero(_half_hundredth(sums, counts)):
+        means[index] = mean_percentage(values[inverse == index].tolist())
+    return unique_keys, means, counts
+
+
+def _half_hundredth(sums: np.ndarray, counts) -> np.ndarray:
+    """Which ``sums`` of hundredths average to exactly x.xx5 over ``counts`` values.
+
+    Those means are rounded from the float sum in row order instead, the way
+    ``mean_percentage`` rounds them.
+    """
+    import numpy as np
+
+    doubled = (2 * sums).astype(np.int64)
+    return (doubled % counts == 0) & ((doubled // counts) % 2 == 1)
+
+
+def _mean(values: np.ndarray) -> float:
+    import numpy as np
+
+    hundredths = np.rint(values * 100).sum()
+    if _half_hundredth(np.array([hundredths]), len(values))[0]:
+        return mean_percentage(values.tolist())
+    return round(float(hundredths) / (len(values) * 100), 2)
+
+
+def grade_buckets(values: np.ndarray, boundaries: Sequence[float] = GRADE_BOUNDARIES) -> np.ndarray:
+    """Index into the grade labels for each value (0 is the lowest grade)."""
+    import numpy as np
+
+    return np.searchsorted(np.asarray(boundaries, dtype=np.float64), values, side="right")
+
+
+def grade_distribution(
+    values: np.ndarray, boundaries: Sequence[float] = GRADE_BOUNDARIES, labels=GRADE_LABELS, weights=None
+):
+    """Count ``values`` per grade; ``weights`` counts each value that many times."""
+    import numpy as np
+
+    counts = np.bincount(grade_buckets(values, boundaries), weights=weights, minlength=len(labels)).astype(np.int64)
+    total = int(counts.sum()) or 1
+    # Highest grade first, matching class_grade_distribution.
+    return [
+        {"grade": label, "count": int(count), "percentage": round(int(count) / total * 100, 2)}
+        for label, count in reversed(list(zip(labels, counts)))
+    ]
+
+
+def describe(values: np.ndarray, percentiles: Sequence[int] = SCHOOL_PERCENTILES) -> dict:
+    import numpy as np
+
+    if not len(values):
+        return {
+            "count": 0,
+            "average": 0.0,
+            "std_dev": 0.0,
+            "minimum": 0.0,
+            "maximum": 0.0,
+            "pass_rate": 0.0,
+            "percentiles": {f"p{p}": 0.0 for p in percentiles},
+        }
+    points = np.percentile(values, percentiles)
+    return {
+        "count": int(len(values)),
+        "average": _mean(values),
+        "std_dev": round(float(values.std()), 2),
+        "minimum": float(values.min()),
+        "maximum": float(values.max()),
+        "pass_rate": round(float((values >= PASS_PERCENTAGE).mean()) * 100, 2),
+        "percentiles": {f"p{p}": round(float(point), 2) for p, point in zip(percentiles, points)},
+    }
+
+
+def student_averages(columns: MarkColumns, mark_percentages: np.ndarray):
+    """``(student_ids, averages, class_ids)`` with one entry per student that has marks."""
+    import numpy as np
+
+    student_ids, averages, _ = group_means(columns.student_id, mark_percentages)
+    # np.unique sorts the same way in both calls, so the entries line up.
+    _, first_rows = np.unique(columns.student_id, return_index=True)
+    return student_ids, averages, columns.class_id[first_rows]
+
+
+def school_statistics(db: Session, term: Optional[str] = None) -> dict:
+    """School-wide and per-class statistics over student averages.
+
+    Only students with at least one mark (in ``term``, when given) are counted.
+    """
+    import numpy as np
+
+    columns = load_mark_columns(db, *([models.Assessment.term == term] if term else []))
+    mark_percentages = percentages(columns.obtained, columns.maximum)
+    _, averages, class_ids = student_averages(columns, mark_percentages)
+
+    class_names: Dict[int, str] = dict(db.execute(select(models.Class.id, models.Class.name)).all())
+    classes = []
+    for class_id in np.unique(class_ids[class_ids >= 0]):
+        in_class = averages[class_ids == class_id]
+        summary = describe(in_class, percentiles=(50,))
+        classes.append(
+            {
+                "class_id": int(class_id),
+                "class_name": class_names.get(int(class_id), ""),
+                "students": summary["count"],
+                "average": summary["average"],
+                "median": summary["percentiles"]["p50"],
+                "std_dev": summary["std_dev"],
+                "minimum": summary["minimum"],
+                "maximum": summary["maximum"],
+                "pass_rate": summary["pass_rate"],
+            }
+        )
+    return {
+        "term": term,
+        "marks": describe(mark_percentages),
+        "students": describe(averages),
+        "grade_distribution": grade_distribution(averages),
+        "classes": classes,
+    }
@@ -0,0 +1,25 @@
+"""Load a student's complete mark history in one statement."""
+from typing import Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from .. import models
+
+
+def load_student_history(db: Session, student_id: int) -> Optional[models.Student]:
+    """Return the student with class, marks, assessments and subjects already loaded.
+
+    Everything is fetched with a single joined SELECT, so walking
+    ``student.marks[i].assessment.subject`` afterwards issues no further queries.
+    """
+    return (
+        db.query(models.Student)
+        .options(
+            joinedload(models.Student.class_obj),
+            joinedload(models.Student.marks)
+            .joinedload(models.Mark.assessment)
+            .joinedload(models.Assessment.subject),
+        )
+        .filter(models.Student.id == student_id)
+        .one_or_none()
+    )
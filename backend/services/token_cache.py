@@ -0,0 +1,108 @@
+"""Per-process cache of verified access tokens.
+
+A token is decoded and its signature checked once; later requests carrying the
+same token read the claims (and, once a request has looked it up, the user
+behind them) from an LRU keyed by a digest of the token. An entry never
+outlives the token's ``exp`` nor ``TOKEN_CACHE_TTL``. Committing any change to
+``users`` bumps a generation counter that is part of every key, so identities
+cached before the change are never served again; other worker processes catch
+up within the TTL.
+"""
+import hashlib
+import os
+import time
+from itertools import chain
+from typing import Any, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .. import models
+from .analytics_cache import MemoryBackend
+
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "4096"))
+
+_USERS = "users"
+_CHANGED_USERS = "token_cache.changed_users"
+
+
+class CurrentUser(NamedTuple):
+    """The identity behind a verified token, detached from any session."""
+
+    id: int
+    email: str
+    name: str
+    role: str
+
+
+class TokenEntry(NamedTuple):
+    claims: dict
+    user: Optional[CurrentUser] = None
+
+
+class TokenCache:
+    def __init__(self, backend: MemoryBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, token: str) -> str:
+        (generation,) = self.backend.counters([_USERS])
+        return f"{generation}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+    def lookup(self, token: str) -> Tuple[str, Optional[TokenEntry]]:
+        """Return the key to store under and the cached entry, if any.
+
+        The key is taken before the caller verifies the token or loads the user,
+        so an identity read while a user change commits is stored under the
+        generation that change has already retired.
+        """
+        key = self._key(token)
+        entry: Any = self.backend.get(key) if self.ttl > 0 else None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return key, entry
+
+    def store(self, key: str, entry: TokenEntry) -> None:
+        ttl = min(self.ttl, entry.claims.get("exp", 0) - time.time())
+        if ttl > 0:
+            self.backend.set(key, entry, ttl)
+
+    def invalidate_users(self) -> None:
+        self.backend.incr(_USERS)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": self.backend.size(), "ttl": self.ttl}
+
+
+cache = TokenCache(MemoryBackend(TOKEN_CACHE_MAX_ENTRIES), TOKEN_CACHE_TTL)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_user_changes(session: Session, flush_context) -> None:
+    if any(isinstance(obj, models.User) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info[_CHANGED_USERS] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_user_changes(orm_execute_state):
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and mapper is not None:
+        if issubclass(mapper.class_, models.User):
+            orm_execute_state.session.info[_CHANGED_USERS] = True
+    return None
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_USERS, False):
+        cache.invalidate_users()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,137 @@
+"""Term-over-term and month-over-month trends read from the time-bucket rollups.
+
+A class's trends come from ``student_subject_month_aggregates`` in one grouped
+statement: per term (or calendar month) the class, each subject and each
+student get an average, a trailing moving average, the least-squares slope
+across periods and the change since the previous period. Averages within a
+period are taken over marks, exactly like the term rollups.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .analytics import mean_percentage
+
+PERIODS = ("term", "month")
+DEFAULT_WINDOW = 3
+# Percentage points gained or lost per period before a series counts as moving.
+TREND_THRESHOLD = 1.0
+
+_ROLLUP = models.StudentSubjectMonthAggregate
+Buckets = Dict[str, Tuple[int, int]]
+
+
+def moving_averages(values: Sequence[float], window: int = DEFAULT_WINDOW) -> List[float]:
+    """Trailing mean of up to ``window`` values ending at each position."""
+    return [mean_percentage(values[max(0, idx - window + 1) : idx + 1]) for idx in range(len(values))]
+
+
+def slope(positions: Sequence[int], values: Sequence[float]) -> float:
+    """Least-squares slope of ``values`` against ``positions``, per period."""
+    if len(values) < 2:
+        return 0.0
+    mean_x = sum(positions) / len(positions)
+    mean_y = sum(values) / len(values)
+    spread = sum((x - mean_x) ** 2 for x in positions)
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in zip(positions, values)) / spread, 2)
+
+
+def direction(change: float, threshold: float = TREND_THRESHOLD) -> str:
+    if change >= threshold:
+        return "improving"
+    if change <= -threshold:
+        return "declining"
+    return "steady"
+
+
+def summarise(buckets: Buckets, periods: Sequence[str], window: int = DEFAULT_WINDOW) -> dict:
+    """Series and trend metrics for one student, subject or class.
+
+    ``buckets`` maps a period to ``(percentage_sum, mark_count)``; periods without
+    marks are skipped, but positions still follow ``periods`` so gaps stretch the
+    slope the way they should.
+    """
+    present = [(idx, period) for idx, period in enumerate(periods) if buckets.get(period, (0, 0))[1]]
+    averages = [round(buckets[period][0] / (buckets[period][1] * 100), 2) for _, period in present]
+    moving = moving_averages(averages, window)
+    trend_slope = slope([idx for idx, _ in present], averages)
+    return {
+        "series": [
+            {"period": period, "average": average, "marks": buckets[period][1], "moving_average": smoothed}
+            for (_, period), average, smoothed in zip(present, averages, moving)
+        ],
+        "slope": trend_slope,
+        "delta": round(averages[-1] - averages[-2], 2) if len(averages) > 1 else 0.0,
+        "direction": direction(trend_slope),
+    }
+
+
+def _add(buckets: Buckets, period: str, total: int, count: int) -> None:
+    current_total, current_count = buckets.get(period, (0, 0))
+    buckets[period] = (current_total + total, current_count + count)
+
+
+def class_trends(
+    db: Session, class_id: int, period: str = "term", window: int = DEFAULT_WINDOW
+) -> Optional[dict]:
+    """Trend series for a class, each of its subjects and each of its students."""
+    rows = db.execute(
+        select(
+            models.Student.id,
+            models.Student.name,
+            models.Subject.id,
+            models.Subject.name,
+            _ROLLUP.term,
+            _ROLLUP.month,
+            func.sum(_ROLLUP.percentage_sum),
+            func.sum(_ROLLUP.mark_count),
+        )
+        .outerjoin(_ROLLUP, _ROLLUP.student_id == models.Student.id)
+        .outerjoin(models.Subject, models.Subject.id == _ROLLUP.subject_id)
+        .where(models.Student.class_id == class_id)
+        .group_by(models.Student.id, models.Subject.id, _ROLLUP.term, _ROLLUP.month)
+        .order_by(models.Student.id, models.Subject.id)
+    ).all()
+    if not rows:
+        return None
+
+    overall: Buckets = {}
+    subjects: Dict[int, Tuple[str, Buckets]] = {}
+    students: Dict[int, Tuple[str, Buckets]] = {}
+    first_month: Dict[str, Optional[str]] = {}
+    for student_id, student_name, subject_id, subject_name, term, month, total, count in rows:
+        student = students.setdefault(student_id, (student_name, {}))
+        if subject_id is None or not count:
+            continue
+        if term not in first_month or (month and (first_month[term] is None or month < first_month[term])):
+            first_month[term] = month
+        key = term if period == "term" else month
+        if key is None:
+            # Undated assessments have no month to go in.
+            continue
+        _add(overall, key, total, count)
+        _add(student[1], key, total, count)
+        _add(subjects.setdefault(subject_id, (subject_name, {}))[1], key, total, count)
+
+    if period == "term":
+        # Terms are labels, so order them by when their first assessment took place.
+        periods = sorted(overall, key=lambda term: (first_month[term] is None, first_month[term] or "", term))
+    else:
+        periods = sorted(overall)
+    return {
+        "class_id": class_id,
+        "period": period,
+        "window": window,
+        "periods": periods,
+        "overall": summarise(overall, periods, window),
+        "subjects": [
+            dict(subject_id=subject_id, subject=name, **summarise(buckets, periods, window))
+            for subject_id, (name, buckets) in sorted(subjects.items())
+        ],
+        "students": [
+            dict(student_id=student_id, student_name=name, **summarise(buckets, periods, window))
+            for student_id, (name, buckets) in students.items()
+        ],
+    }
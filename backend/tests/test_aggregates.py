@@ -0,0 +1,138 @@
+from datetime import date
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.auth import create_access_token
+from backend.database import Base, SessionLocal
+from backend import models
+from backend.seed_data import ensure_default_admin
+from backend.services import aggregates
+
+client = TestClient(app)
+HEADERS = {}
+IDS = {}
+
+
+def setup_module(module):
+    db = SessionLocal()
+    db.query(models.Mark).delete()
+    db.query(models.Assessment).delete()
+    db.query(models.Subject).delete()
+    db.query(models.Student).delete()
+    db.query(models.Class).delete()
+    db.query(models.User).delete()
+    db.commit()
+    admin = ensure_default_admin(db)
+    HEADERS["Authorization"] = "Bearer " + create_access_token({"sub": admin.email, "role": admin.role})
+
+    cls = models.Class(name="Rollup Class")
+    db.add(cls)
+    db.commit()
+    students = [models.Student(name=f"Rollup {i}", roll_number=f"RU{i}", class_id=cls.id) for i in range(2)]
+    subject = models.Subject(name="Math", code="MATH", class_id=cls.id)
+    db.add_all(students + [subject])
+    db.commit()
+    assessment = models.Assessment(
+        name="Quiz", type="Quiz", maximum_marks=20, term="Term 1", subject_id=subject.id, date=date.today()
+    )
+    db.add(assessment)
+    db.commit()
+    IDS.update(students=[s.id for s in students], assessment=assessment.id, subject=subject.id, cls=cls.id)
+    db.close()
+
+
+def _rollups():
+    db = SessionLocal()
+    try:
+        rows = db.query(models.StudentSubjectTermAggregate).all()
+        return sorted(
+            (r.student_id, r.subject_id, r.term, r.percentage_sum, r.mark_count, r.pass_count) for r in rows
+        )
+    finally:
+        db.close()
+
+
+def _rebuilt_rollups():
+    db = SessionLocal()
+    try:
+        aggregates.rebuild(db)
+        rows = db.query(models.StudentSubjectTermAggregate).all()
+        return sorted(
+            (r.student_id, r.subject_id, r.term, r.percentage_sum, r.mark_count, r.pass_count) for r in rows
+        )
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_rollups_follow_router_writes():
+    first, second = IDS["students"]
+    created = client.post(
+        "/marks/", json={"student_id": first, "assessment_id": IDS["assessment"], "marks_obtained": 15}, headers=HEADERS
+    )
+    assert created.status_code == 200
+    client.post(
+        "/marks/", json={"student_id": second, "assessment_id": IDS["assessment"], "marks_obtained": 6}, headers=HEADERS
+    )
+    assert _rollups() == [
+        (first, IDS["subject"], "Term 1", 7500, 1, 1),
+        (second, IDS["subject"], "Term 1", 3000, 1, 0),
+    ]
+
+    mark_id = created.json()["id"]
+    client.put(
+        f"/marks/{mark_id}",
+        json={"student_id": first, "assessment_id": IDS["assessment"], "marks_obtained": 19},
+        headers=HEADERS,
+    )
+    client.put(
+        f"/assessments/{IDS['assessment']}",
+        json={"name": "Quiz", "type": "Quiz", "maximum_marks": 40, "term": "Term 2", "subject_id": IDS["subject"]},
+        headers=HEADERS,
+    )
+    assert _rollups() == _rebuilt_rollups()
+    assert (first, IDS["subject"], "Term 2", 4750, 1, 1) in _rollups()
+
+    client.delete(f"/marks/{mark_id}", headers=HEADERS)
+    assert [row[0] for row in _rollups()] == [second]
+
+    overview = client.get(f"/analytics/class/{IDS['cls']}/overview").json()
+    assert overview["overview"]["maximum"] == 15.0
+
+
+def test_deleting_students_and_subjects_with_foreign_keys_enforced(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fk.db'}")
+    event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        cls = models.Class(name="FK Class")
+        students = [models.Student(name=f"FK {i}", roll_number=f"FK{i}", class_obj=cls) for i in range(3)]
+        subjects = [models.Subject(name=name, code=name, class_obj=cls) for name in ("Math", "Art")]
+        assessments = [
+            models.Assessment(name="Quiz", type="Quiz", maximum_marks=20, term="Term 1", subject=subject)
+            for subject in subjects
+        ]
+        db.add_all(
+            [models.Mark(student=student, assessment=a, marks_obtained=10) for student in students for a in assessments]
+        )
+        db.commit()
+        assert db.query(models.StudentSubjectTermAggregate).count() == 6
+
+        db.delete(students[0])
+        db.delete(subjects[0])
+        db.commit()
+        assert db.query(models.StudentSubjectTermAggregate).count() == 2
+        assert db.query(models.StudentSubjectMonthAggregate).count() == 2
+
+        db.query(models.Mark).delete()
+        db.query(models.Student).delete()
+        db.commit()
+        assert db.query(models.StudentSubjectTermAggregate).count() == 0
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,98 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.auth import create_access_token
+from backend.database import SessionLocal
+from backend import models
+from backend.seed_data import ensure_default_admin
+from backend.services.analytics_cache import cache
+
+client = TestClient(app)
+IDS = {}
+HEADERS = {}
+
+
+def setup_module(module):
+    db = SessionLocal()
+    db.query(models.Mark).delete()
+    db.query(models.Assessment).delete()
+    db.query(models.Subject).delete()
+    db.query(models.Student).delete()
+    db.query(models.Class).delete()
+    db.commit()
+    admin = ensure_default_admin(db)
+    HEADERS["Authorization"] = "Bearer " + create_access_token({"sub": admin.email, "role": admin.role})
+
+    classes = [models.Class(name="Cache A"), models.Class(name="Cache B")]
+    db.add_all(classes)
+    db.commit()
+    students = [models.Student(name=f"Cached {i}", roll_number=f"CA{i}", class_id=classes[i % 2].id) for i in range(4)]
+    subjects = [models.Subject(name="Math", code=f"M{c.id}", class_id=c.id) for c in classes]
+    db.add_all(students + subjects)
+    db.commit()
+    assessments = [
+        models.Assessment(name="Quiz", type="Quiz", maximum_marks=20, term="Term 1", subject_id=s.id, date=date.today())
+        for s in subjects
+    ]
+    db.add_all(assessments)
+    db.commit()
+    db.add_all(
+        models.Mark(student_id=student.id, assessment_id=assessments[i % 2].id, marks_obtained=10)
+        for i, student in enumerate(students)
+    )
+    db.commit()
+    IDS.update(
+        class_a=classes[0].id,
+        class_b=classes[1].id,
+        student_a=students[0].id,
+        student_b=students[1].id,
+        assessment_a=assessments[0].id,
+    )
+    db.close()
+
+
+def _overview(class_key):
+    before = cache.stats()
+    resp = client.get(f"/analytics/class/{IDS[class_key]}/overview")
+    assert resp.status_code == 200
+    after = cache.stats()
+    return resp.json()["overview"], after["hits"] - before["hits"] == 1
+
+
+def test_repeat_reads_hit_and_mark_writes_invalidate_only_their_class():
+    first, _ = _overview("class_a")
+    assert first["average"] == 50.0
+    assert _overview("class_a") == (first, True)
+    _overview("class_b")
+
+    mark = client.get(f"/marks/?student_id={IDS['student_a']}&assessment_id={IDS['assessment_a']}").json()[0]
+    resp = client.put(f"/marks/{mark['id']}", json=dict(mark, marks_obtained=20), headers=HEADERS)
+    assert resp.status_code == 200
+
+    updated, hit = _overview("class_a")
+    assert not hit and updated["average"] == 75.0
+    assert _overview("class_b")[1]
+
+
+def test_moving_a_student_invalidates_both_classes():
+    _overview("class_a")
+    _overview("class_b")
+    db = SessionLocal()
+    student = db.get(models.Student, IDS["student_b"])
+    student.class_id = IDS["class_a"]
+    db.commit()
+    db.close()
+
+    overview_a, hit_a = _overview("class_a")
+    _, hit_b = _overview("class_b")
+    assert not hit_a and not hit_b
+    assert overview_a["average"] == 66.67
+
+
+def test_cache_stats_endpoint():
+    assert client.get("/analytics/cache-stats").status_code == 401
+    stats = client.get("/analytics/cache-stats", headers=HEADERS).json()
+    assert stats["backend"] == "memory"
+    assert stats["hits"] >= 2 and stats["misses"] >= 2
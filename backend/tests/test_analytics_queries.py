@@ -0,0 +1,339 @@
+import math
+import statistics
+from contextlib import contextmanager
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.main import app
+from backend.auth import create_access_token
+from backend.database import SessionLocal, engine
+from backend import models
+from backend.seed_data import ensure_default_admin
+from backend.services.analytics import calculate_percentage, grade_from_percentage, mean_percentage
+
+client = TestClient(app)
+CLASS_ID = None
+HEADERS = {}
+
+
+def setup_module(module):
+    global CLASS_ID
+    db = SessionLocal()
+    db.query(models.Mark).delete()
+    db.query(models.Assessment).delete()
+    db.query(models.Subject).delete()
+    db.query(models.Student).delete()
+    db.query(models.Class).delete()
+    db.query(models.User).delete()
+    db.commit()
+    admin = ensure_default_admin(db)
+    HEADERS["Authorization"] = "Bearer " + create_access_token({"sub": admin.email, "role": admin.role})
+
+    cls = models.Class(name="Query Class")
+    db.add(cls)
+    db.commit()
+    CLASS_ID = cls.id
+
+    students = [models.Student(name=f"Student {i}", roll_number=f"Q{i}", class_id=cls.id) for i in range(6)]
+    subjects = [models.Subject(name=name, code=name.upper(), class_id=cls.id) for name in ("Math", "Art")]
+    db.add_all(students + subjects)
+    db.commit()
+
+    assessments = []
+    for subject in subjects:
+        for idx, maximum in enumerate((25, 30, 100)):
+            assessments.append(
+                models.Assessment(
+                    name=f"{subject.name} {idx}",
+                    type="Exam",
+                    maximum_marks=maximum,
+                    term="Term 1" if idx < 2 else "Term 2",
+                    subject_id=subject.id,
+                    date=date(2024, 1 + idx, 10),
+                )
+            )
+    db.add_all(assessments)
+    db.commit()
+
+    # The last student has no marks so both "missing" and "present" paths are covered.
+    for s_idx, student in enumerate(students[:-1]):
+        for a_idx, assessment in enumerate(assessments):
+            score = round(((s_idx * 7 + a_idx * 13) % 23 + 3) * assessment.maximum_marks / 27, 1)
+            db.add(models.Mark(student_id=student.id, assessment_id=assessment.id, marks_obtained=score))
+    db.commit()
+    db.close()
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # The ETag version lookup is a fixed primary-key read, not part of the computation.
+        if "table_versions" not in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _baseline_mean(values):
+    """The float average the per-object code used: ``round(sum / len, 2)``."""
+    return round(sum(values) / len(values), 2) if values else 0
+
+
+def _reference_student_averages(db):
+    averages = {}
+    for student in db.query(models.Student).filter(models.Student.class_id == CLASS_ID).all():
+        percentages = [
+            calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks) for mark in student.marks
+        ]
+        averages[student.name] = _baseline_mean(percentages) if percentages else None
+    # Student 4 averages exactly 50.595, a tie the float sum rounds up; the rollup
+    # averages have to round it the same way.
+    assert averages["Student 4"] == 50.6
+    return averages
+
+
+def test_class_analytics_match_per_object_computation():
+    db = SessionLocal()
+    averages = _reference_student_averages(db)
+    subject_averages = []
+    for subject in db.query(models.Subject).filter(models.Subject.class_id == CLASS_ID).all():
+        percentages = [
+            calculate_percentage(m.marks_obtained, a.maximum_marks) for a in subject.assessments for m in a.marks
+        ]
+        subject_averages.append({"subject": subject.name, "average": _baseline_mean(percentages)})
+    db.close()
+
+    overview = client.get(f"/analytics/class/{CLASS_ID}/overview").json()
+    top = sorted(averages.items(), key=lambda item: item[1] or 0, reverse=True)[:5]
+    assert overview["top_students"] == [{"student_name": name, "average": avg or 0} for name, avg in top]
+    assert overview["overview"]["average"] == _baseline_mean([avg or 0 for avg in averages.values()])
+
+    grades = {row["grade"]: row["count"] for row in client.get(f"/analytics/class/{CLASS_ID}/grades").json()}
+    expected = {"A": 0, "B": 0, "C": 0, "D": 0, "E": 0}
+    for avg in averages.values():
+        if avg is not None:
+            expected[grade_from_percentage(avg)] += 1
+    assert grades == expected
+
+    assert client.get(f"/analytics/class/{CLASS_ID}/subjects-summary").json() == subject_averages
+
+
+def test_class_analytics_query_count_is_constant():
+    for path in ("overview", "grades", "subjects-summary"):
+        with count_queries() as statements:
+            resp = client.get(f"/analytics/class/{CLASS_ID}/{path}")
+        assert resp.status_code == 200
+        assert len(statements) <= 3, (path, statements)
+
+
+def test_dashboard_summary_matches_marks_in_two_statements():
+    db = SessionLocal()
+    percentages = [
+        calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks) for mark in db.query(models.Mark).all()
+    ]
+    db.close()
+
+    with count_queries() as statements:
+        data = client.get("/analytics/dashboard-summary").json()
+    assert len(statements) <= 2, statements
+    assert data["total_students"] == 6
+    assert data["total_assessments"] == 6
+    assert data["average_score"] == _baseline_mean(percentages)
+    assert data["pass_rate"] == round(len([p for p in percentages if p >= 40]) / len(percentages) * 100, 2)
+
+
+def test_student_detail_loads_history_in_one_statement():
+    db = SessionLocal()
+    student = db.query(models.Student).filter(models.Student.class_id == CLASS_ID).order_by(models.Student.id).first()
+    student_id = student.id
+    db.close()
+
+    with count_queries() as statements:
+        resp = client.get(f"/students/{student_id}/detail", headers=HEADERS)
+    assert resp.status_code == 200
+    # One statement authenticates the user, one loads the whole history.
+    assert len(statements) == 2, statements
+    data = resp.json()
+    assert len(data["profile"]["marks"]) == len(data["trend"]["trend"]) == 6
+    assert client.get(f"/analytics/student/{student_id}/trend").json() == data["trend"]
+
+
+def test_school_statistics_kernel_matches_class_analytics():
+    overview = client.get(f"/analytics/class/{CLASS_ID}/overview").json()["overview"]
+    grades = client.get(f"/analytics/class/{CLASS_ID}/grades").json()
+    stats = client.get("/analytics/school/statistics").json()
+
+    db = SessionLocal()
+    reference = [avg for avg in _reference_student_averages(db).values() if avg is not None]
+    db.close()
+    (class_stats,) = stats["classes"]
+    assert class_stats["class_id"] == CLASS_ID
+    assert class_stats["students"] == len(reference) == 5
+    assert class_stats["average"] == _baseline_mean(reference)
+    assert class_stats["minimum"] == min(reference)
+    assert class_stats["maximum"] == max(reference) == overview["maximum"]
+    assert stats["students"]["std_dev"] == round(statistics.pstdev(reference), 2)
+    assert stats["students"]["percentiles"]["p50"] == round(statistics.median(reference), 2)
+    assert stats["grade_distribution"] == grades
+    assert stats["marks"]["count"] == 30
+
+
+def test_class_rankings_pages_through_the_leaderboard_in_one_statement_each():
+    db = SessionLocal()
+    reference = sorted(
+        ((avg, name) for name, avg in _reference_student_averages(db).items() if avg is not None),
+        key=lambda item: -item[0],
+    )
+    db.close()
+
+    entries, cursor = [], None
+    while True:
+        with count_queries() as statements:
+            resp = client.get(
+                f"/analytics/class/{CLASS_ID}/rankings", params={"limit": 2, **({"cursor": cursor} if cursor else {})}
+            )
+        assert resp.status_code == 200
+        # The page holding Student 4 also re-reads the marks of its half-hundredth tie.
+        assert len(statements) <= 2
+        assert all("FROM marks" in statement for statement in statements[1:])
+        entries.extend(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert [(e["average"], e["student_name"]) for e in entries] == reference
+    assert [e["position"] for e in entries] == [1, 2, 3, 4, 5]
+    assert entries[0]["rank"] == 1 and entries[0]["percentile"] == 100.0
+    assert entries[-1]["percentile"] == 0.0 and all(e["out_of"] == 5 for e in entries)
+
+
+def test_student_rank_matches_the_leaderboard_per_scope():
+    leaderboard = client.get(f"/analytics/class/{CLASS_ID}/rankings").json()
+    top = leaderboard[0]
+    resp = client.get(f"/analytics/student/{top['student_id']}/rank")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["overall"] == {key: top[key] for key in ("average", "rank", "dense_rank", "percentile", "out_of")}
+    assert [t["term"] for t in data["terms"]] == ["Term 1", "Term 2"]
+    assert [s["subject"] for s in data["subjects"]] == ["Math", "Art"]
+
+    term_board = client.get(f"/analytics/class/{CLASS_ID}/rankings", params={"term": "Term 2"}).json()
+    term_entry = next(e for e in term_board if e["student_id"] == top["student_id"])
+    assert data["terms"][1]["rank"] == term_entry["rank"]
+    assert data["terms"][1]["average"] == term_entry["average"]
+    assert client.get("/analytics/student/999999/rank").status_code == 404
+
+
+def test_school_cohorts_match_class_endpoints_in_one_statement():
+    with count_queries() as statements:
+        cohorts = client.get("/analytics/school/cohorts").json()
+    # One statement for the rollups and one re-reading the marks of Student 4's tie.
+    assert len(statements) == 2, statements
+    assert "FROM marks" in statements[1] and "WHERE marks.student_id IN" in statements[1]
+
+    (cohort,) = cohorts
+    assert cohort["class_id"] == CLASS_ID
+    overview = client.get(f"/analytics/class/{CLASS_ID}/overview").json()
+    assert {"overview": cohort["overview"], "top_students": cohort["top_students"]} == overview
+    assert cohort["grades"] == client.get(f"/analytics/class/{CLASS_ID}/grades").json()
+    assert cohort["subjects"] == client.get(f"/analytics/class/{CLASS_ID}/subjects-summary").json()
+
+
+def test_school_cohorts_filter_by_term_and_subject_code():
+    db = SessionLocal()
+    averages = {}
+    for student in db.query(models.Student).filter(models.Student.class_id == CLASS_ID).all():
+        percentages = [
+            calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks)
+            for mark in student.marks
+            if mark.assessment.term == "Term 1" and mark.assessment.subject.code == "MATH"
+        ]
+        averages[student.name] = _baseline_mean(percentages) if percentages else 0
+    db.close()
+
+    (cohort,) = client.get("/analytics/school/cohorts?term=Term 1&subject_code=MATH").json()
+    assert cohort["overview"]["average"] == _baseline_mean(list(averages.values()))
+    assert cohort["overview"]["maximum"] == max(averages.values())
+    assert [row["subject"] for row in cohort["subjects"]] == ["Math"]
+    assert sum(row["count"] for row in cohort["grades"]) == 5
+
+
+def test_class_trends_bucket_by_term_and_month_in_one_statement():
+    db = SessionLocal()
+    by_term = {}
+    for student in db.query(models.Student).filter(models.Student.class_id == CLASS_ID).all():
+        for mark in student.marks:
+            percentage = calculate_percentage(mark.marks_obtained, mark.assessment.maximum_marks)
+            by_term.setdefault(student.id, {}).setdefault(mark.assessment.term, []).append(percentage)
+    db.close()
+
+    with count_queries() as statements:
+        resp = client.get(f"/analytics/class/{CLASS_ID}/trends")
+    assert resp.status_code == 200
+    assert len(statements) == 1, statements
+    trends = resp.json()
+    assert trends["periods"] == ["Term 1", "Term 2"]
+    assert len(trends["students"]) == 6
+    for student in trends["students"]:
+        expected = by_term.get(student["student_id"], {})
+        assert [(p["period"], p["average"]) for p in student["series"]] == [
+            (term, _baseline_mean(values)) for term, values in sorted(expected.items())
+        ]
+        if len(expected) == 2:
+            assert student["delta"] == round(student["series"][1]["average"] - student["series"][0]["average"], 2)
+            assert student["direction"] == (
+                "improving" if student["slope"] >= 1 else "declining" if student["slope"] <= -1 else "steady"
+            )
+    assert [s["subject"] for s in trends["subjects"]] == ["Math", "Art"]
+
+    monthly = client.get(f"/analytics/class/{CLASS_ID}/trends?period=month&window=2").json()
+    assert monthly["periods"] == ["2024-01", "2024-02", "2024-03"]
+    series = monthly["overall"]["series"]
+    assert series[1]["moving_average"] == _baseline_mean([series[0]["average"], series[1]["average"]])
+    assert sum(point["marks"] for point in series) == 30
+
+    assert client.get(f"/analytics/class/{CLASS_ID}/trends?period=week").status_code == 422
+    assert client.get("/analytics/class/999999/trends").status_code == 404
+
+
+def test_student_trend_is_in_date_order():
+    db = SessionLocal()
+    student = db.query(models.Student).filter(models.Student.class_id == CLASS_ID).first()
+    db.close()
+    trend = client.get(f"/analytics/student/{student.id}/trend").json()["trend"]
+    assert [point["term"] for point in trend] == ["Term 1"] * 4 + ["Term 2"] * 2
+
+
+def test_grade_what_if_matches_regrading_every_student():
+    histogram = client.get(f"/analytics/class/{CLASS_ID}/histogram").json()
+    assert histogram["students"] == sum(row["count"] for row in histogram["bins"]) == 5
+
+    base = f"/analytics/class/{CLASS_ID}/grades/what-if"
+    assert client.get(base).json() == client.get(f"/analytics/class/{CLASS_ID}/grades").json()
+
+    db = SessionLocal()
+    averages = [avg for avg in _reference_student_averages(db).values() if avg is not None]
+    db.close()
+    cut = math.floor(sorted(averages)[2] * 10) / 10
+    passed = len([avg for avg in averages if avg >= cut])
+    with count_queries() as statements:
+        resp = client.get(f"{base}?boundaries={cut}&labels=Fail&labels=Pass")
+    assert resp.status_code == 200
+    # The histogram is already cached, so regrading touches no tables.
+    assert statements == []
+    assert resp.json() == [
+        {"grade": "Pass", "count": passed, "percentage": round(passed / 5 * 100, 2)},
+        {"grade": "Fail", "count": 5 - passed, "percentage": round((5 - passed) / 5 * 100, 2)},
+    ]
+
+    assert client.get(f"{base}?boundaries=50&boundaries=40&labels=A&labels=B&labels=C").status_code == 400
+    assert client.get(f"{base}?boundaries=40.05&labels=A&labels=B").status_code == 400
+    assert client.get(f"{base}?boundaries=40").status_code == 400
@@ -1,8 +1,15 @@
+from datetime import timedelta
+
 from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+
 from backend.main import app
-from backend.database import SessionLocal
+from backend.auth import create_access_token
+from backend.database import SessionLocal, engine
 from backend import models
 from backend.seed_data import ensure_default_admin
+from backend.services import password_pool
 
 client = TestClient(app)
 
@@ -30,3 +37,94 @@ def test_register_and_login():
     data = login_resp.json()
     assert data.get("role") == "ADMIN"
     assert "access_token" in data
+
+
+def _user_lookups(path, headers):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get(path, headers=headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+def test_verified_tokens_skip_the_user_lookup_until_users_change():
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "admin@gmail.com", "role": "ADMIN"})}
+    assert _user_lookups("/students/", headers) == 1
+    assert _user_lookups("/students/", headers) == 0
+
+    db = SessionLocal()
+    admin = db.query(models.User).filter(models.User.email == "admin@gmail.com").one()
+    admin.name = "Renamed Admin"
+    db.commit()
+    db.close()
+    assert _user_lookups("/students/", headers) == 1
+
+
+def test_role_checks_follow_the_user_row_not_the_token_claims():
+    db = SessionLocal()
+    staff = models.User(name="Staff", email="staff@example.com", hashed_password="x", role="ADMIN")
+    db.add(staff)
+    db.commit()
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": staff.email, "role": "ADMIN"})}
+    # An unknown class id answers 404 once the role check has passed.
+    assert client.put("/classes/0", json={"name": "Nope"}, headers=headers).status_code == 404
+    assert _user_lookups("/students/", headers) == 0
+
+    staff.role = "TEACHER"
+    db.commit()
+    assert client.put("/classes/0", json={"name": "Nope"}, headers=headers).status_code == 403
+    db.delete(staff)
+    db.commit()
+    db.close()
+    assert client.put("/classes/0", json={"name": "Nope"}, headers=headers).status_code == 401
+
+
+def test_expired_and_forged_tokens_are_rejected():
+    expired = create_access_token({"sub": "admin@gmail.com", "role": "ADMIN"}, expires_delta=timedelta(seconds=-1))
+    assert client.get("/students/", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+    assert client.get("/students/", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+    forged = jwt.encode({"sub": "admin@gmail.com", "role": "ADMIN"}, "not-the-secret", algorithm="HS256")
+    assert client.post("/classes/", json={"name": "Nope"}, headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+
+
+def test_ensure_default_admin_keeps_a_current_hash():
+    db = SessionLocal()
+    before = ensure_default_admin(db).hashed_password
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert ensure_default_admin(db).hashed_password == before
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        db.close()
+    assert not [statement for statement in statements if statement.startswith("UPDATE users")]
+
+
+def test_login_is_refused_with_retry_after_when_the_verify_queue_is_full():
+    form = {"username": "admin@gmail.com", "password": "admin123"}
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    saved = password_pool.pool.pending
+    password_pool.pool.pending = password_pool.pool.workers + password_pool.pool.queue_depth
+    try:
+        resp = client.post("/auth/login", data=form, headers=headers)
+    finally:
+        password_pool.pool.pending = saved
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(password_pool.PASSWORD_VERIFY_RETRY_AFTER)
+    assert client.get("/auth/pool-stats").status_code == 401
+    admin = {"Authorization": "Bearer " + create_access_token({"sub": "admin@gmail.com", "role": "ADMIN"})}
+    assert client.get("/auth/pool-stats", headers=admin).json()["rejected"] >= 1
+
+    assert client.post("/auth/login", data=dict(form, password="wrong"), headers=headers).status_code == 401
+    assert client.post("/auth/login", data=form, headers=headers).status_code == 200
@@ -0,0 +1,86 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.main import app
+from backend.auth import create_access_token
+from backend.database import SessionLocal, engine
+from backend import models
+from backend.seed_data import ensure_default_admin
+
+client = TestClient(app)
+IDS = {}
+HEADERS = {}
+
+
+def setup_module(module):
+    db = SessionLocal()
+    db.query(models.Mark).delete()
+    db.query(models.Assessment).delete()
+    db.query(models.Subject).delete()
+    db.query(models.Student).delete()
+    db.query(models.Class).delete()
+    db.commit()
+    admin = ensure_default_admin(db)
+    HEADERS["Authorization"] = "Bearer " + create_access_token({"sub": admin.email, "role": admin.role})
+
+    school_class = models.Class(name="Etag A")
+    db.add(school_class)
+    db.commit()
+    student = models.Student(name="Etag Student", roll_number="ET1", class_id=school_class.id)
+    subject = models.Subject(name="Math", code="MATH", class_id=school_class.id)
+    db.add_all([student, subject])
+    db.commit()
+    assessment = models.Assessment(
+        name="Quiz", type="Quiz", maximum_marks=10, term="Term 1", subject_id=subject.id, date=date.today()
+    )
+    db.add(assessment)
+    db.commit()
+    IDS.update(student=student.id, assessment=assessment.id)
+    db.close()
+
+
+def test_unchanged_list_answers_304_with_only_the_version_lookup():
+    first = client.get("/classes/")
+    etag = first.headers["ETag"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = client.get("/classes/", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert len(statements) == 1 and "table_versions" in statements[0]
+
+
+def test_writes_change_only_the_etags_of_tables_they_touch():
+    classes_etag = client.get("/classes/").headers["ETag"]
+    marks_etag = client.get("/marks/").headers["ETag"]
+    dashboard_etag = client.get("/analytics/dashboard-summary").headers["ETag"]
+
+    payload = {"assessment_id": IDS["assessment"], "marks": [{"student_id": IDS["student"], "marks_obtained": 7}]}
+    assert client.post("/marks/bulk", json=payload, headers=HEADERS).status_code == 200
+
+    assert client.get("/classes/", headers={"If-None-Match": classes_etag}).status_code == 304
+    resp = client.get("/marks/", headers={"If-None-Match": marks_etag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != marks_etag
+    assert len(resp.json()) == 1
+    assert client.get("/analytics/dashboard-summary", headers={"If-None-Match": dashboard_etag}).status_code == 200
+
+    resp = client.post("/classes/", json={"name": "Etag B"}, headers=HEADERS)
+    assert resp.status_code == 200
+    assert client.get("/classes/", headers={"If-None-Match": classes_etag}).status_code == 200
+
+
+def test_projected_lists_carry_the_etag():
+    resp = client.get("/classes/?fields=name")
+    assert resp.status_code == 200
+    assert client.get("/classes/?fields=name", headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+    assert resp.headers["ETag"] != client.get("/classes/").headers["ETag"]
@@ -0,0 +1,160 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.auth import create_access_token
+from backend.database import SessionLocal
+from backend import models
+from backend.seed_data import ensure_default_admin
+
+client = TestClient(app)
+HEADERS = {}
+IDS = {}
+
+
+def setup_module(module):
+    db = SessionLocal()
+    db.query(models.Mark).delete()
+    db.query(models.Assessment).delete()
+    db.query(models.Subject).delete()
+    db.query(models.Student).delete()
+    db.query(models.Class).delete()
+    db.query(models.User).delete()
+    db.commit()
+    admin = ensure_default_admin(db)
+    HEADERS["Authorization"] = "Bearer " + create_access_token({"sub": admin.email, "role": admin.role})
+
+    cls = models.Class(name="Bulk Class")
+    db.add(cls)
+    db.commit()
+    students = [models.Student(name=f"Bulk {i}", roll_number=f"B{i}", class_id=cls.id) for i in range(3)]
+    subject = models.Subject(name="Math", code="MATH", class_id=cls.id)
+    db.add_all(students + [subject])
+    db.commit()
+    assessment = models.Assessment(
+        name="Unit Test", type="Exam", maximum_marks=50, term="Term 1", subject_id=subject.id, date=date.today()
+    )
+    db.add(assessment)
+    db.commit()
+    IDS.update(students=[s.id for s in students], assessment=assessment.id, cls=cls.id)
+    db.close()
+
+
+def test_bulk_marks_upsert_with_per_row_errors():
+    first, second, third = IDS["students"]
+    payload = {
+        "assessment_id": IDS["assessment"],
+        "marks": [
+            {"student_id": first, "marks_obtained": 40},
+            {"student_id": second, "marks_obtained": 20},
+            {"student_id": 9999, "marks_obtained": 10},
+            {"student_id": third, "marks_obtained": 51},
+            {"student_id": first, "marks_obtained": 41},
+        ],
+    }
+    resp = client.post("/marks/bulk", json=payload, headers=HEADERS)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["created"], data["updated"]) == (2, 0)
+    assert [error["index"] for error in data["errors"]] == [2, 3, 4]
+
+    resp = client.post(
+        "/marks/bulk",
+        json={"marks": [{"student_id": first, "assessment_id": IDS["assessment"], "marks_obtained": 45}]},
+        headers=HEADERS,
+    )
+    assert (resp.json()["created"], resp.json()["updated"]) == (0, 1)
+
+    marks = client.get("/marks/", params={"assessment_id": IDS["assessment"]}).json()
+    assert sorted(m["marks_obtained"] for m in marks) == [20, 45]
+    overview = client.get(f"/analytics/class/{IDS['cls']}/overview").json()
+    assert overview["overview"]["maximum"] == 90.0
+
+
+def test_csv_import_resolves_roll_numbers_and_reports_row_errors():
+    csv_body = (
+        "roll_number,assessment,marks_obtained\n"
+        "B0,Unit Test,30\n"
+        "B1,unit test,25\n"
+        "NOPE,Unit Test,10\n"
+        "B2,Unit Test,abc\n"
+    )
+    files = {"file": ("marks.csv", csv_body.encode(), "text/csv")}
+    dry = client.post("/marks/import", params={"dry_run": True}, files=files, headers=HEADERS).json()
+    assert (dry["processed"], dry["updated"], dry["error_count"]) == (4, 2, 2)
+    assert [error["row"] for error in dry["errors"]] == [3, 4]
+
+    files = {"file": ("marks.csv", csv_body.encode(), "text/csv")}
+    resp = client.post("/marks/import", params={"stream": True, "batch_size": 2}, files=files, headers=HEADERS)
+    events = [line for line in resp.text.splitlines() if line]
+    assert len(events) == 2
+    marks = client.get("/marks/", params={"assessment_id": IDS["assessment"]}).json()
+    assert sorted(m["marks_obtained"] for m in marks) == [25, 30]
+
+
+def test_reentering_a_mark_updates_it_and_moving_onto_an_existing_pair_conflicts():
+    first, second, _ = IDS["students"]
+    body = {"student_id": first, "assessment_id": IDS["assessment"], "marks_obtained": 12}
+    created = client.post("/marks/", json=body, headers=HEADERS)
+    again = client.post("/marks/", json={**body, "marks_obtained": 14}, headers=HEADERS)
+    assert created.status_code == again.status_code == 200
+    assert again.json()["id"] == created.json()["id"] and again.json()["marks_obtained"] == 14
+
+    other = client.post("/marks/", json={**body, "student_id": second}, headers=HEADERS).json()
+    resp = client.put(f"/marks/{other['id']}", json={**body, "marks_obtained": 9}, headers=HEADERS)
+    assert resp.status_code == 409
+    marks = client.get("/marks/", params={"assessment_id": IDS["assessment"]}).json()
+    assert sorted(m["marks_obtained"] for m in marks) == [12, 14]
+
+
+def test_create_and_update_reject_unknown_rows_and_out_of_range_marks():
+    first = IDS["students"][0]
+    body = {"student_id": first, "assessment_id": IDS["assessment"], "marks_obtained": 12}
+    mark = client.post("/marks/", json=body, headers=HEADERS).json()
+    for bad in ({"student_id": 9999}, {"assessment_id": 9999}):
+        resp = client.post("/marks/", json={**body, **bad}, headers=HEADERS)
+        assert resp.status_code == 400 and resp.json()["detail"] == "Invalid student or assessment"
+    for score in (-1, 51):
+        created = client.post("/marks/", json={**body, "marks_obtained": score}, headers=HEADERS)
+        updated = client.put(f"/marks/{mark['id']}", json={**body, "marks_obtained": score}, headers=HEADERS)
+        assert created.status_code == updated.status_code == 400
+        assert created.json()["detail"] == updated.json()["detail"] == "Marks must be between 0 and 50"
+    resp = client.put(f"/marks/{mark['id']}", json={**body, "assessment_id": 9999}, headers=HEADERS)
+    assert resp.status_code == 400
+    assert client.put(f"/marks/{mark['id']}", json={**body, "marks_obtained": 50}, headers=HEADERS).status_code == 200
+
+
+def test_import_rejects_unreadable_files_and_dry_run_tracks_pairs_across_batches():
+    latin1 = "roll_number,assessment,marks_obtained\nB2,Unit Test,5\nB2,Prüfung,5\n".encode("latin-1")
+    resp = client.post("/marks/import", files={"file": ("marks.csv", latin1, "text/csv")}, headers=HEADERS)
+    assert resp.status_code == 400 and "Line 3" in resp.json()["detail"]
+    xlsx = {"file": ("marks.xlsx", b"not a workbook", "application/octet-stream")}
+    corrupt = client.post("/marks/import", files=xlsx, headers=HEADERS)
+    assert corrupt.status_code == 400
+
+    csv_body = b"roll_number,assessment,marks_obtained\nB2,Unit Test,5\nB2,Unit Test,6\n"
+    dry = client.post(
+        "/marks/import",
+        params={"dry_run": True, "batch_size": 1},
+        files={"file": ("marks.csv", csv_body, "text/csv")},
+        headers=HEADERS,
+    ).json()
+    assert (dry["created"], dry["updated"], dry["error_count"]) == (1, 1, 0)
+
+
+def test_import_reports_non_integer_assessment_ids_as_row_errors():
+    assessment = IDS["assessment"]
+    csv_body = (
+        "roll_number,assessment_id,marks_obtained\n"
+        f"B2,{assessment}.0,5\n"
+        "B2,inf,5\n"
+        "B2,nan,5\n"
+        f"B2,{assessment}.5,5\n"
+    )
+    files = {"file": ("marks.csv", csv_body.encode(), "text/csv")}
+    resp = client.post("/marks/import", params={"dry_run": True}, files=files, headers=HEADERS)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["processed"] == 4 and data["error_count"] == 3
+    assert [error["row"] for error in data["errors"]] == [2, 3, 4]
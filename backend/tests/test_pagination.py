@@ -0,0 +1,72 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.database import SessionLocal
+from backend import models
+
+client = TestClient(app)
+IDS = {}
+
+
+def setup_module(module):
+    db = SessionLocal()
+    db.query(models.Mark).delete()
+    db.query(models.Assessment).delete()
+    db.query(models.Subject).delete()
+    db.query(models.Student).delete()
+    db.query(models.Class).delete()
+    db.commit()
+
+    classes = [models.Class(name="Page A"), models.Class(name="Page B")]
+    db.add_all(classes)
+    db.commit()
+    students = [
+        models.Student(name=f"Pager {i}", roll_number=f"P{i}", class_id=classes[i % 2].id) for i in range(5)
+    ]
+    subject = models.Subject(name="Math", code="MATH", class_id=classes[0].id)
+    db.add_all(students + [subject])
+    db.commit()
+    assessments = [
+        models.Assessment(name=f"Test {t}", type="Exam", maximum_marks=50, term=t, subject_id=subject.id, date=date.today())
+        for t in ("Term 1", "Term 2")
+    ]
+    db.add_all(assessments)
+    db.commit()
+    for student in students:
+        for assessment in assessments:
+            db.add(models.Mark(student_id=student.id, assessment_id=assessment.id, marks_obtained=30))
+    db.commit()
+    IDS.update(class_a=classes[0].id, term1=assessments[0].id)
+    db.close()
+
+
+def test_marks_keyset_pages_cover_every_row_once():
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/marks/", params=params)
+        assert resp.status_code == 200
+        assert len(resp.json()) <= 3
+        seen.extend(row["id"] for row in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 10
+    assert seen == sorted(set(seen))
+
+
+def test_marks_filters_and_field_projection():
+    resp = client.get("/marks/", params={"class_id": IDS["class_a"], "term": "Term 1", "fields": "student_id,marks_obtained"})
+    assert resp.status_code == 200
+    rows = resp.json()
+    assert len(rows) == 3
+    assert set(rows[0]) == {"id", "student_id", "marks_obtained"}
+
+    assert len(client.get("/marks/", params={"assessment_id": IDS["term1"]}).json()) == 5
+    assert client.get("/marks/", params={"fields": "password"}).status_code == 400
+    assert client.get("/marks/", params={"limit": 10_000}).status_code == 422
@@ -41,3 +41,146 @@ def test_report_pdf():
     assert resp.status_code == 200
     assert resp.headers["content-type"] == "application/pdf"
     assert resp.content[:4] == b"%PDF"
+
+
+def test_class_reports_zip():
+    import io
+    import zipfile
+
+    resp = client.get("/reports/class/1", params={"term": "Term 1"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(resp.content))
+    assert archive.namelist() == ["report_R1.pdf"]
+    assert archive.read("report_R1.pdf")[:4] == b"%PDF"
+
+
+def test_report_cache_etag_and_invalidation(tmp_path):
+    from backend.services import report_cache
+
+    original = report_cache.cache
+    report_cache.cache = report_cache.ReportCache(str(tmp_path), 10 * 1024 * 1024)
+    try:
+        first = client.get("/reports/student/1", params={"term": "Term 1"})
+        etag = first.headers["etag"]
+        assert list(tmp_path.glob("1/*.pdf"))
+
+        cached = client.get("/reports/student/1", params={"term": "Term 1"}, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+        db = SessionLocal()
+        db.query(models.Mark).filter(models.Mark.student_id == 1).first().marks_obtained = 60
+        db.commit()
+        db.close()
+        assert not list(tmp_path.glob("1/*.pdf"))
+
+        changed = client.get("/reports/student/1", params={"term": "Term 1"}, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+    finally:
+        report_cache.cache = original
+
+
+def test_report_render_queue_saturation_returns_503(tmp_path):
+    from backend.services import render_pool, report_cache
+
+    original_cache, original_pool = report_cache.cache, render_pool.pool
+    report_cache.cache = report_cache.ReportCache(str(tmp_path), 10 * 1024 * 1024)
+    render_pool.pool = render_pool.RenderPool(workers=1, queue_depth=0)
+    render_pool.pool.pending = 1
+    try:
+        resp = client.get("/reports/student/1", params={"term": "Term 1"})
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == str(render_pool.REPORT_RENDER_RETRY_AFTER)
+        assert not list(tmp_path.glob("1/*"))
+        batch = client.get("/reports/class/1", params={"term": "Term 1"})
+        assert batch.status_code == 503
+        assert batch.headers["retry-after"] == str(render_pool.REPORT_RENDER_RETRY_AFTER)
+        render_pool.pool.pending = 0
+        assert client.get("/reports/class/1", params={"term": "Term 1"}).status_code == 200
+        assert render_pool.pool.pending == 0
+    finally:
+        render_pool.pool.shutdown()
+        report_cache.cache, render_pool.pool = original_cache, original_pool
+
+
+def test_report_cache_invalidation_keeps_in_flight_renders(tmp_path):
+    from backend.services import report_cache
+
+    store = report_cache.ReportCache(str(tmp_path), 10 * 1024 * 1024)
+    store.store(store.temp_path(7), 7, "old").close()
+    scratch = store.temp_path(7)
+    with open(scratch, "wb") as handle:
+        handle.write(b"%PDF new")
+    store.invalidate_students([7])
+    assert not list(tmp_path.glob("7/*.pdf"))
+    with store.store(scratch, 7, "new") as handle:
+        assert handle.read() == b"%PDF new"
+    store.invalidate_students(None)
+    assert not list(tmp_path.glob("*/*.pdf"))
+
+
+def test_report_cache_invalidation_keeps_the_size_without_a_rescan(tmp_path, monkeypatch):
+    from backend.services import report_cache
+
+    store = report_cache.ReportCache(str(tmp_path), 10 * 1024 * 1024)
+    for student_id, body in ((7, b"%PDF seven"), (8, b"%PDF eight!")):
+        scratch = store.temp_path(student_id)
+        with open(scratch, "wb") as handle:
+            handle.write(body)
+        store.store(scratch, student_id, "key").close()
+    assert store._size == len(b"%PDF seven") + len(b"%PDF eight!")
+
+    store.invalidate_students([7])
+    assert store._size == len(b"%PDF eight!")
+
+    def no_walk():
+        raise AssertionError("store rescanned the cache directory")
+
+    monkeypatch.setattr(store, "_evict", no_walk)
+    scratch = store.temp_path(7)
+    with open(scratch, "wb") as handle:
+        handle.write(b"%PDF")
+    store.store(scratch, 7, "again").close()
+    assert store._size == len(b"%PDF eight!") + len(b"%PDF")
+
+
+def test_class_batch_slot_is_released_when_the_client_leaves_before_the_first_chunk():
+    import asyncio
+
+    from backend.services import render_pool
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/reports/class/1",
+        "raw_path": b"/reports/class/1",
+        "query_string": b"term=Term+1",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    started = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        started.append(message["type"])
+        # The connection is already gone when the response starts.
+        raise OSError("client disconnected")
+
+    async def request():
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            pass
+
+    before = render_pool.pool.pending
+    asyncio.run(request())
+    assert started == ["http.response.start"]
+    assert render_pool.pool.pending == before
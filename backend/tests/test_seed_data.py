@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.main import app
+from backend.database import SessionLocal
+from backend import models
+from backend.seed_data import ensure_seed_data, generate
+from backend.services import aggregates
+
+client = TestClient(app)
+SIZE = dict(classes=3, students_per_class=6, subjects_per_class=2, assessments_per_term=2, terms=3, years=2, seed=11)
+
+
+def _wipe(db):
+    db.query(models.Mark).delete()
+    db.query(models.Assessment).delete()
+    db.query(models.Subject).delete()
+    db.query(models.Student).delete()
+    db.query(models.Class).delete()
+    db.commit()
+
+
+def _snapshot(db):
+    rollup = models.StudentSubjectTermAggregate
+    monthly = models.StudentSubjectMonthAggregate
+    marks = select(models.Mark.student_id, models.Mark.assessment_id, models.Mark.marks_obtained)
+    return (
+        db.execute(marks.order_by(models.Mark.id)).all(),
+        sorted(db.execute(select(rollup.student_id, rollup.subject_id, rollup.term, rollup.percentage_sum, rollup.pass_count))),
+        sorted(db.execute(select(monthly.student_id, monthly.subject_id, monthly.month, monthly.percentage_sum, monthly.mark_count))),
+    )
+
+
+def setup_module(module):
+    db = SessionLocal()
+    _wipe(db)
+    db.close()
+
+
+def test_generate_is_deterministic_and_writes_matching_rollups():
+    db = SessionLocal()
+    counts = generate(db, **SIZE)
+    assert counts["marks"] == 3 * 6 * 2 * 2 * 3 * 2 == db.query(models.Mark).count()
+    first = _snapshot(db)
+
+    # The rollups written by the generator are exactly what a rebuild computes.
+    aggregates.rebuild(db)
+    db.commit()
+    assert _snapshot(db) == first
+
+    _wipe(db)
+    generate(db, **SIZE)
+    second = _snapshot(db)
+    class_id = db.query(models.Class.id).order_by(models.Class.id).first()[0]
+    db.close()
+    assert [row[2] for row in second[0]] == [row[2] for row in first[0]]
+    assert [row[3:] for row in second[1]] == [row[3:] for row in first[1]]
+
+    trends = client.get(f"/analytics/class/{class_id}/trends").json()
+    assert trends["periods"] == [f"{year} Term {term}" for year in (2024, 2025) for term in (1, 2, 3)]
+    assert len(trends["students"]) == 6
+
+
+def test_seeding_skips_a_database_that_already_has_school_rows():
+    db = SessionLocal()
+    _wipe(db)
+    db.add(models.Class(name="Real Class"))
+    db.commit()
+    ensure_seed_data()
+    assert [name for (name,) in db.query(models.Class.name)] == ["Real Class"]
+    assert db.query(models.Student).count() == 0
+    _wipe(db)
+    db.close()
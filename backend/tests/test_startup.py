@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+PROBE = """
+import sys
+from backend.database import SessionLocal, engine
+from backend.migrations import schema_current
+before = schema_current(engine)
+import backend.main
+from backend import models
+with SessionLocal() as db:
+    counts = (db.query(models.User).count(), db.query(models.Student).count())
+print(before, schema_current(engine), *counts, "reportlab" in sys.modules or "numpy" in sys.modules)
+"""
+
+
+def _start(database_url: str, **env) -> list:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=dict(os.environ, DATABASE_URL=database_url, **env),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.split()
+
+
+def test_bootstrap_runs_once_and_seeding_is_opt_in(tmp_path):
+    url = f"sqlite:///{tmp_path / 'startup.db'}"
+    # A new database gets its schema and the admin account, but no demo data, ReportLab or NumPy.
+    assert _start(url) == ["False", "True", "1", "0", "False"]
+    # The marker matches on the next start, so the bootstrap is skipped.
+    assert _start(url) == ["True", "True", "1", "0", "False"]
+    users, students = _start(url, SEED_ON_STARTUP="true")[2:4]
+    assert users == "1" and int(students) > 0
@@ -1,6 +1,6 @@
 "use client";
 import { useEffect, useState } from "react";
-import { apiFetch } from "../lib/api";
+import { apiFetch, apiFetchAll } from "../lib/api";
 import { Bar, Doughnut, Line } from "react-chartjs-2";
 import {
   Chart as ChartJS,
@@ -23,11 +23,11 @@ export default function AnalyticsPage() {
   const [subjectData, setSubjectData] = useState<any[]>([]);
   const [overview, setOverview] = useState<any>(null);
   const [grades, setGrades] = useState<any[]>([]);
-  const [studentTrend, setStudentTrend] = useState<any>(null);
+  const [classTrend, setClassTrend] = useState<any>(null);
   const [error, setError] = useState("");
 
   useEffect(() => {
-    apiFetch("/classes/")
+    apiFetchAll("/classes/")
       .then((data) => {
         setClasses(data);
         if (data[0]) setSelectedClass(String(data[0].id));
@@ -45,13 +45,9 @@ export default function AnalyticsPage() {
         setOverview(overviewResp);
         const gradeResp = await apiFetch(`/analytics/class/${selectedClass}/grades`);
         setGrades(gradeResp);
-        // pull a sample student trend from the first student in the class
-        const students = await apiFetch(`/students/`);
-        const classStudents = students.filter((s: any) => s.class_id === Number(selectedClass));
-        if (classStudents[0]) {
-          const trend = await apiFetch(`/analytics/student/${classStudents[0].id}/trend`);
-          setStudentTrend({ ...trend, studentName: classStudents[0].name });
-        }
+        // one request covers the class series and every student's direction
+        const trendResp = await apiFetch(`/analytics/class/${selectedClass}/trends`);
+        setClassTrend(trendResp);
       } catch (err: any) {
         setError(err.message);
       }
@@ -145,22 +141,32 @@ export default function AnalyticsPage() {
           </div>
         )}
 
-        {studentTrend && (
+        {classTrend && (
           <div className="card">
-            <h3>Trend for {studentTrend.studentName}</h3>
+            <h3>Term-over-term trend</h3>
             <Line
               data={{
-                labels: studentTrend.trend.map((p: any) => p.assessment),
+                labels: classTrend.overall.series.map((p: any) => p.period),
                 datasets: [
                   {
-                    label: "Percentage",
-                    data: studentTrend.trend.map((p: any) => p.percentage),
+                    label: "Class average",
+                    data: classTrend.overall.series.map((p: any) => p.average),
                     borderColor: "#1d4ed8",
                     backgroundColor: "rgba(29, 78, 216, 0.25)",
                   },
+                  {
+                    label: "Moving average",
+                    data: classTrend.overall.series.map((p: any) => p.moving_average),
+                    borderColor: "#94a3b8",
+                    borderDash: [6, 4],
+                  },
                 ],
               }}
             />
+            <p>
+              Improving: {classTrend.students.filter((s: any) => s.direction === "improving").length} · Declining:{" "}
+              {classTrend.students.filter((s: any) => s.direction === "declining").length}
+            </p>
           </div>
         )}
       </div>
@@ -13,7 +13,8 @@ export const API_BASE =
 
 async function performRequest(url: string, options: RequestInit) {
   const res = await fetch(url, options);
-  if (!res.ok) {
+  // 304 means the copy in responseCache is still current; callers handle it.
+  if (!res.ok && res.status !== 304) {
     let message = `Request failed (status ${res.status})`;
     const contentType = res.headers.get("content-type") || "";
 
@@ -38,10 +39,10 @@ async function performRequest(url: string, options: RequestInit) {
     (error as any).status = res.status;
     throw error;
   }
-  return res.json();
+  return res;
 }
 
-export async function apiFetch(path: string, options: RequestInit = {}) {
+async function apiRequest(path: string, options: RequestInit = {}): Promise<Response> {
   const token = typeof window !== "undefined" ? localStorage.getItem("token") : null;
   const headers: Record<string, string> = {
     "Content-Type": "application/json",
@@ -77,6 +78,51 @@ export async function apiFetch(path: string, options: RequestInit = {}) {
   throw new Error("Request failed");
 }
 
+type CachedResponse = { etag: string; body: any; nextCursor: string | null };
+
+// GET bodies keyed by path. The API sends an ETag that changes whenever the
+// underlying tables do, so polling re-sends it and reuses the body on a 304.
+const responseCache = new Map<string, CachedResponse>();
+
+async function cachedRequest(path: string, options: RequestInit = {}) {
+  const isGet = !options.method || options.method.toUpperCase() === "GET";
+  const cached = isGet ? responseCache.get(path) : undefined;
+  const headers = { ...((options.headers as Record<string, string>) || {}) };
+  if (cached) headers["If-None-Match"] = cached.etag;
+
+  const res = await apiRequest(path, { ...options, headers });
+  if (res.status === 304 && cached) {
+    return { body: cached.body, nextCursor: cached.nextCursor };
+  }
+  const body = await res.json();
+  const nextCursor = res.headers.get("X-Next-Cursor");
+  const etag = res.headers.get("ETag");
+  if (isGet && etag) {
+    responseCache.set(path, { etag, body, nextCursor });
+  } else if (!isGet) {
+    responseCache.clear();
+  }
+  return { body, nextCursor };
+}
+
+export async function apiFetch(path: string, options: RequestInit = {}) {
+  return (await cachedRequest(path, options)).body;
+}
+
+// List endpoints are paginated by id; follow the X-Next-Cursor header until the
+// last page so callers still receive the complete list.
+export async function apiFetchAll(path: string, options: RequestInit = {}) {
+  const items: any[] = [];
+  let cursor: string | null = null;
+  do {
+    const separator = path.includes("?") ? "&" : "?";
+    const page = await cachedRequest(cursor ? `${path}${separator}cursor=${cursor}` : path, options);
+    items.push(...page.body);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+}
+
 export function saveAuth(token: string, role: string, name: string) {
   if (typeof window === "undefined") return;
   localStorage.setItem("token", token);
@@ -85,6 +131,7 @@ export function saveAuth(token: string, role: string, name: string) {
 }
 
 export function clearAuth() {
+  responseCache.clear();
   if (typeof window === "undefined") return;
   localStorage.removeItem("token");
   localStorage.removeItem("role");
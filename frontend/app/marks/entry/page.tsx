@@ -1,6 +1,6 @@
 "use client";
 import { useCallback, useEffect, useMemo, useState } from "react";
-import { apiFetch, clearAuth } from "../../lib/api";
+import { apiFetch, apiFetchAll, clearAuth } from "../../lib/api";
 
 type Student = {
   id: number;
@@ -47,8 +47,8 @@ export default function MarksEntry() {
     setStatus("Syncing data...");
     try {
       const [studentData, assessmentData] = await Promise.all([
-        apiFetch("/students/"),
-        apiFetch("/assessments/"),
+        apiFetchAll("/students/?limit=500&fields=id,name,roll_number,class_id"),
+        apiFetchAll("/assessments/?limit=500&fields=id,name,term,maximum_marks"),
       ]);
 
       setStudents(studentData);
@@ -61,12 +61,9 @@ export default function StudentDetail() {
     if (!id) return;
     const load = async () => {
       try {
-        const [p, t] = await Promise.all([
-          apiFetch(`/students/${id}/profile`),
-          apiFetch(`/analytics/student/${id}/trend`),
-        ]);
-        setProfile(p);
-        setTrend(t);
+        const detail = await apiFetch(`/students/${id}/detail`);
+        setProfile(detail.profile);
+        setTrend(detail.trend);
       } catch (err: any) {
         setError(err.message);
       }
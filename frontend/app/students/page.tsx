@@ -1,7 +1,7 @@
 "use client";
 import Link from "next/link";
 import { useEffect, useMemo, useState } from "react";
-import { apiFetch } from "../lib/api";
+import { apiFetchAll } from "../lib/api";
 
 export default function StudentsPage() {
   const [students, setStudents] = useState<any[]>([]);
@@ -13,7 +13,7 @@ export default function StudentsPage() {
   useEffect(() => {
     const load = async () => {
       try {
-        const [studentData, classData] = await Promise.all([apiFetch("/students/"), apiFetch("/classes/")]);
+        const [studentData, classData] = await Promise.all([apiFetchAll("/students/"), apiFetchAll("/classes/")]);
         setStudents(studentData);
         setClasses(classData);
       } catch (err: any) {